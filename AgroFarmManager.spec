@@ -6,7 +6,10 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # Модулі MainWindow імпортуються за назвою (importlib) при першому
+    # переході, тож PyInstaller не знаходить їх сам
+    hiddenimports=['modules.fields', 'modules.crops', 'modules.expenses',
+                   'modules.harvest', 'modules.reports', 'modules.planning'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
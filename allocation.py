@@ -0,0 +1,179 @@
+from summaries import rebuild_summaries, check_summaries
+
+# Розподіл площі полів за сезонами для плану посівів.
+# field_allocation зберігає суму запланованої площі та кількість планів для
+# кожної пари сезон x поле і підтримується тригерами planting_plans, тож
+# перевірка вільної площі для нового плану - пошук за первинним ключем, а
+# огляд сезону - одне читання за ключем на кожне поле.
+# Скасовані плани площу не займають.
+# Тригери BEFORE INSERT/UPDATE не дозволяють запланувати більше площі, ніж
+# має поле: так обмеження діє і для записів не з форми.
+# Плани видаленого поля видаляються разом з ним (FIELD_DELETE_TRIGGER), а
+# їх тригери прибирають рядки field_allocation цього поля.
+
+ALLOCATION_TABLE = '''
+    CREATE TABLE IF NOT EXISTS field_allocation (
+        season_year TEXT NOT NULL,
+        field_id INTEGER NOT NULL,
+        allocated_area REAL NOT NULL DEFAULT 0,
+        plan_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (season_year, field_id)
+    ) WITHOUT ROWID
+    '''
+
+CANCELLED_STATUS = 'cancelled'
+# Повідомлення тригера при перевищенні площі поля
+OVER_CAPACITY_MESSAGE = "Запланована площа перевищує вільну площу поля в сезоні"
+# Допуск для порівняння сум площ REAL
+AREA_TOLERANCE = 1e-6
+
+
+def _keys(row):
+    return f"IFNULL({row}.season_year, ''), IFNULL({row}.field_id, 0)"
+
+
+def _allocates(row):
+    return f"{row}.status IS NOT '{CANCELLED_STATUS}'"
+
+
+def _allocation_add(row):
+    return f"""INSERT INTO field_allocation (season_year, field_id, allocated_area, plan_count)
+        SELECT {_keys(row)}, IFNULL({row}.planned_area, 0), 1 WHERE {_allocates(row)}
+        ON CONFLICT (season_year, field_id) DO UPDATE SET
+            allocated_area = allocated_area + excluded.allocated_area,
+            plan_count = plan_count + 1;"""
+
+
+def _allocation_remove(row):
+    return f"""UPDATE field_allocation SET
+            allocated_area = allocated_area - IFNULL({row}.planned_area, 0),
+            plan_count = plan_count - 1
+        WHERE (season_year, field_id) = ({_keys(row)}) AND {_allocates(row)};
+        DELETE FROM field_allocation
+        WHERE (season_year, field_id) = ({_keys(row)}) AND plan_count <= 0;"""
+
+
+def _free_area(row):
+    # Вільна площа поля в сезоні плану row (NULL, якщо поля немає)
+    return f"""(SELECT area FROM fields WHERE id = {row}.field_id)
+               - IFNULL((SELECT allocated_area FROM field_allocation
+                         WHERE (season_year, field_id) = ({_keys(row)})), 0)"""
+
+
+def _keeps_allocation():
+    # Зміна не збільшує площу, яку план займає на тому самому полі в тому
+    # самому сезоні (зокрема зміна лише культури чи дат) - такі зміни
+    # дозволені і на полях, вже перерозподілених до появи обмеження
+    return f"""({_allocates('OLD')} AND OLD.field_id IS NEW.field_id
+                AND OLD.season_year IS NEW.season_year
+                AND IFNULL(NEW.planned_area, 0) <= IFNULL(OLD.planned_area, 0) + {AREA_TOLERANCE})"""
+
+
+# Площа самого плану до зміни вже входить у розподілену, якщо сезон і
+# поле не змінилися
+CAPACITY_UPDATE_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS trg_planting_capacity_update
+    BEFORE UPDATE OF field_id, season_year, planned_area, status ON planting_plans
+    WHEN {_allocates('NEW')} AND NOT {_keeps_allocation()}
+         AND NEW.planned_area > {_free_area('NEW')} + {AREA_TOLERANCE}
+             + CASE WHEN {_allocates('OLD')} AND OLD.field_id IS NEW.field_id
+                         AND OLD.season_year IS NEW.season_year
+                    THEN IFNULL(OLD.planned_area, 0) ELSE 0 END
+    BEGIN
+        SELECT RAISE(ABORT, '{OVER_CAPACITY_MESSAGE}');
+    END"""
+
+ALLOCATION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_planting_allocation_insert AFTER INSERT ON planting_plans
+    BEGIN
+        {_allocation_add('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_planting_allocation_delete AFTER DELETE ON planting_plans
+    BEGIN
+        {_allocation_remove('OLD')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_planting_allocation_update
+    AFTER UPDATE OF field_id, season_year, planned_area, status ON planting_plans
+    BEGIN
+        {_allocation_remove('OLD')}
+        {_allocation_add('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_planting_capacity_insert BEFORE INSERT ON planting_plans
+    WHEN {_allocates('NEW')}
+         AND NEW.planned_area > {_free_area('NEW')} + {AREA_TOLERANCE}
+    BEGIN
+        SELECT RAISE(ABORT, '{OVER_CAPACITY_MESSAGE}');
+    END""",
+    CAPACITY_UPDATE_TRIGGER,
+]
+
+# Зовнішні ключі SQLite в цій базі не ввімкнені, тож каскад - тригером
+FIELD_DELETE_TRIGGER = """CREATE TRIGGER IF NOT EXISTS trg_fields_delete_plans
+    AFTER DELETE ON fields
+    BEGIN
+        DELETE FROM planting_plans WHERE field_id = OLD.id;
+    END"""
+
+# Плани полів, видалених до появи FIELD_DELETE_TRIGGER
+ORPHAN_PLANS_CLEANUP = """DELETE FROM planting_plans
+    WHERE field_id IS NOT NULL AND field_id NOT IN (SELECT id FROM fields)"""
+
+ALLOCATION_SOURCE = f"""
+    SELECT {_keys('planting_plans')}, SUM(IFNULL(planned_area, 0)), COUNT(*)
+    FROM planting_plans WHERE {_allocates('planting_plans')} GROUP BY 1, 2"""
+
+# У форматі summaries.SUMMARIES: перерахунок і перевірка узгодженості
+ALLOCATION_SUMMARIES = [
+    ("field_allocation", ("season_year", "field_id"),
+     ("allocated_area", "plan_count"), ALLOCATION_SOURCE),
+]
+
+
+def rebuild_allocation(cursor):
+    rebuild_summaries(cursor, ALLOCATION_SUMMARIES)
+
+
+def check_allocation(conn):
+    return check_summaries(conn, ALLOCATION_SUMMARIES)
+
+
+# (площа поля, розподілено, площа плану plan_id, якщо він уже займає площу
+# цього поля в цьому сезоні) - лише пошуки за первинними ключами
+CAPACITY_QUERY = f"""
+    SELECT f.area,
+           IFNULL((SELECT allocated_area FROM field_allocation
+                   WHERE season_year = ? AND field_id = f.id), 0),
+           IFNULL((SELECT planned_area FROM planting_plans p
+                   WHERE p.id = ? AND p.field_id = f.id AND p.season_year = ?
+                         AND {_allocates('p')}), 0)
+    FROM fields f WHERE f.id = ?"""
+
+# Огляд сезону: поле, площа, розподілено, вільно, кількість планів
+SEASON_OVERVIEW = """
+    SELECT f.id, f.name, f.area, IFNULL(a.allocated_area, 0),
+           f.area - IFNULL(a.allocated_area, 0), IFNULL(a.plan_count, 0)
+    FROM fields f
+    LEFT JOIN field_allocation a ON a.season_year = ? AND a.field_id = f.id
+    ORDER BY f.id"""
+
+# Усі сезони з планами, зокрема ті, де всі плани скасовані (їх немає в
+# field_allocation); індекс idx_planting_season
+SEASONS_QUERY = """SELECT DISTINCT season_year FROM planting_plans
+                   WHERE season_year != '' ORDER BY season_year DESC"""
+
+
+def free_area(database, field_id, season_year, plan_id=None):
+    # Вільна площа поля в сезоні; plan_id - план, що редагується (його
+    # поточна площа вважається вільною). None, якщо поля немає
+    row = database.fetch_one(CAPACITY_QUERY, (season_year, plan_id, season_year, field_id))
+    if row is None:
+        return None
+    area, allocated, own = row
+    return (area or 0) - allocated + own
+
+
+def season_overview(database, season_year):
+    return database.fetch_all(SEASON_OVERVIEW, (season_year,))
+
+
+def plan_seasons(database):
+    return [row[0] for row in database.fetch_all(SEASONS_QUERY)]
@@ -0,0 +1,171 @@
+from database import db
+
+# Аналітика собівартості та врожайності на гектар.
+# Таблиці завантажуються в колонкові DataFrame одним запитом кожна, а зведення
+# рахуються векторно в pandas. pandas імпортується лише при використанні,
+# щоб не сповільнювати запуск програми.
+
+# Орієнтовні ціни реалізації, грн/т, за категорією культури - для розрахунку
+# виручки й маржі, якщо ціни культур не передано явно
+DEFAULT_CATEGORY_PRICES = {"grain": 7500.0, "legume": 15000.0, "oil": 17000.0}
+
+# Сезон "2023-2024" триває з вересня 2023 по серпень 2024; рік сезону -
+# рік збору (2024). Витрати відносяться до сезону за датою, урожай - за
+# календарним роком збору, плани - за останнім роком сезону
+SEASON_START_MONTH = 9
+PLAN_SEASON_YEAR = "CAST(substr(season_year, -4) AS INTEGER)"
+
+
+def season_year_sql(date_column):
+    # Рік сезону для дати: з SEASON_START_MONTH - вже наступний сезон
+    return (f"(CAST(substr({date_column}, 1, 4) AS INTEGER)"
+            f" + (CAST(substr({date_column}, 6, 2) AS INTEGER) >= {SEASON_START_MONTH}))")
+
+
+# Витрати поле x культура x сезон; зведена таблиця витрат рахує календарні
+# роки, тому сезони - групуванням записів
+SEASON_COSTS = f"""SELECT field_id, crop_id, {season_year_sql('date')} AS year,
+                          SUM(total_cost) AS total_cost
+                   FROM expenses WHERE date IS NOT NULL
+                   GROUP BY field_id, crop_id, year"""
+
+# Площа поле x культура x сезон, врахована рівно один раз на поле за сезон:
+# запланована площа культур, якщо в сезоні є плани поля, інакше вся площа
+# поля - для основної культури сезону (найбільший урожай, далі витрати).
+# Решта рядків поле x культура x сезон площі не мають
+AREA_QUERY = f"""
+    WITH plans AS (
+        SELECT field_id, crop_id, {PLAN_SEASON_YEAR} AS year, SUM(planned_area) AS area
+        FROM planting_plans
+        WHERE status IS NOT 'cancelled' AND field_id IS NOT NULL AND planned_area > 0
+        GROUP BY 1, 2, 3),
+    activity AS (
+        SELECT field_id, crop_id, year, SUM(yield_t) AS yield_t, SUM(cost) AS cost
+        FROM (SELECT field_id, NULLIF(crop_id, 0) AS crop_id, year,
+                     total_yield AS yield_t, 0 AS cost
+              FROM harvest_summary WHERE field_id != 0 AND year != 0
+              UNION ALL
+              SELECT field_id, crop_id, year, 0, total_cost
+              FROM ({SEASON_COSTS}) WHERE field_id IS NOT NULL)
+        GROUP BY 1, 2, 3),
+    main AS (
+        SELECT field_id, crop_id, year,
+               ROW_NUMBER() OVER (PARTITION BY field_id, year
+                                  ORDER BY crop_id IS NULL, yield_t DESC, cost DESC,
+                                           crop_id) AS rank
+        FROM activity a
+        WHERE NOT EXISTS (SELECT 1 FROM plans p
+                          WHERE p.field_id = a.field_id AND p.year = a.year))
+    SELECT field_id, crop_id, year, area FROM plans
+    UNION ALL
+    SELECT m.field_id, m.crop_id, m.year, f.area
+    FROM main m JOIN fields f ON f.id = m.field_id
+    WHERE m.rank = 1 AND f.area > 0"""
+
+FRAME_QUERIES = {
+    "fields": "SELECT id AS field_id, name AS field_name FROM fields",
+    "crops": "SELECT id AS crop_id, name AS crop_name, category FROM crops",
+    "expenses": f"""SELECT field_id, crop_id, expense_type, SUM(total_cost) AS total_cost,
+                           {season_year_sql('date')} AS year
+                    FROM expenses WHERE date IS NOT NULL
+                    GROUP BY field_id, crop_id, expense_type, year""",
+    # Урожай - зі зведеної таблиці (summaries.py): рядків стільки, скільки
+    # груп поле x культура x рік, а не записів
+    "harvest": """SELECT NULLIF(field_id, 0) AS field_id, NULLIF(crop_id, 0) AS crop_id,
+                         total_yield AS actual_yield, NULLIF(year, 0) AS year
+                  FROM harvest_summary""",
+    "area": AREA_QUERY,
+}
+
+KEYS = ["field_id", "crop_id", "year"]
+SUM_COLUMNS = ["area", "cost", "yield_t", "revenue", "margin"]
+PER_HECTARE = {
+    "cost": "cost_per_ha",
+    "yield_t": "yield_per_ha",
+    "revenue": "revenue_per_ha",
+    "margin": "margin_per_ha",
+}
+
+
+def load_frames(database=db):
+    import pandas as pd
+
+    conn = database.get_connection()
+    frames = {name: pd.read_sql_query(query, conn) for name, query in FRAME_QUERIES.items()}
+    # Тип витрат - категорія: один байт на рядок замість рядка Python
+    frames["expenses"]["expense_type"] = frames["expenses"]["expense_type"].astype("category")
+    for name in ("expenses", "harvest", "area"):
+        frame = frames[name]
+        for column in KEYS:
+            frame[column] = pd.to_numeric(frame[column], downcast="integer")
+    return frames
+
+
+def per_hectare(table):
+    area = table["area"].where(table["area"] > 0)
+    for column, per_ha in PER_HECTARE.items():
+        table[per_ha] = table[column] / area
+    return table
+
+
+class FarmAnalytics:
+    def __init__(self, frames, prices=None):
+        self.frames = frames
+        # {crop_id: ціна, грн/т}; для решти культур - DEFAULT_CATEGORY_PRICES
+        self.prices = prices or {}
+        self._base = None
+
+    @classmethod
+    def load(cls, database=db, prices=None):
+        return cls(load_frames(database), prices)
+
+    def field_crop_season(self):
+        # Базова таблиця: поле x культура x рік з витратами, врожаєм,
+        # площею, виручкою, маржею та показниками на гектар
+        if self._base is not None:
+            return self._base.copy()
+
+        import pandas as pd
+
+        frames = self.frames
+        # Рядки без культури залишаються: їх витрати входять у підсумки поля
+        cost = (frames["expenses"].groupby(KEYS, dropna=False)["total_cost"].sum()
+                .rename("cost"))
+        harvest = (frames["harvest"].groupby(KEYS, dropna=False)["actual_yield"].sum()
+                   .rename("yield_t"))
+        # Площа вже врахована один раз на поле за сезон (AREA_QUERY)
+        area = frames["area"].set_index(KEYS)["area"]
+
+        table = pd.concat([cost, harvest, area], axis=1).reset_index()
+        table[["area", "cost", "yield_t"]] = table[["area", "cost", "yield_t"]].fillna(0.0)
+        table = (table.merge(frames["fields"], on="field_id", how="left")
+                      .merge(frames["crops"], on="crop_id", how="left"))
+
+        price = table["crop_id"].map(self.prices)
+        price = price.fillna(table["category"].map(DEFAULT_CATEGORY_PRICES))
+        table["revenue"] = table["yield_t"] * price
+        table["margin"] = table["revenue"] - table["cost"]
+
+        self._base = per_hectare(table)
+        return self._base.copy()
+
+    def rollup(self, keys):
+        base = self.field_crop_season()
+        sums = base.groupby(keys, dropna=False)[SUM_COLUMNS].sum().reset_index()
+        return per_hectare(sums)
+
+    def by_field(self):
+        return self.rollup(["field_id", "field_name"])
+
+    def by_crop(self):
+        return self.rollup(["crop_id", "crop_name"])
+
+    def by_season(self):
+        return self.rollup(["year"])
+
+    def cost_by_type(self, index=("field_id", "year")):
+        # Зведена таблиця витрат: рядки - index, колонки - типи витрат
+        expenses = self.frames["expenses"]
+        return expenses.pivot_table(values="total_cost", index=list(index),
+                                    columns="expense_type", aggfunc="sum",
+                                    fill_value=0.0, observed=True)
@@ -0,0 +1,83 @@
+"""Час колонкової аналітики (FarmAnalytics) на великій базі: завантаження
+таблиць у DataFrame і зведення витрат/врожаю на гектар по полях, культурах,
+сезонах та типах витрат.
+
+Запуск: python benchmarks/bench_analytics.py [кількість_витрат]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_analytics_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database
+from analytics import FarmAnalytics, load_frames
+
+FIELDS = 200
+
+
+def seed(database, expenses):
+    # Генерація даних рекурсивним CTE всередині SQLite - у рази швидше за
+    # вставку з Python, тож підготовка 1M рядків не спотворює заміри
+    with database.transaction():
+        database.insert_many(
+            "fields", ("name", "area", "soil_type"),
+            ((f"Поле {i}", 20.0 + i % 80, "чорнозем") for i in range(FIELDS)))
+        conn = database.get_connection()
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+               INSERT INTO expenses (field_id, crop_id, expense_type, amount, quantity,
+                                     unit, total_cost, date)
+               SELECT i % ? + 1, i % 8 + 1,
+                      CASE i % 7 WHEN 0 THEN 'seeds' WHEN 1 THEN 'fuel'
+                                 WHEN 2 THEN 'fertilizers' WHEN 3 THEN 'chemicals'
+                                 WHEN 4 THEN 'labor' WHEN 5 THEN 'equipment' ELSE 'other' END,
+                      100.0, 1.0, 'шт', 100.0 + i % 900,
+                      printf('%d-%02d-%02d', 2015 + i % 10, i % 12 + 1, i % 28 + 1)
+               FROM n""", (expenses, FIELDS))
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+               INSERT INTO harvest (field_id, crop_id, actual_yield, harvest_date, quality_rating)
+               SELECT i % ? + 1, i % 8 + 1, 3.0 + i % 5,
+                      printf('%d-08-%02d', 2015 + i % 10, i % 28 + 1), i % 5 + 1
+               FROM n""", (expenses // 50, FIELDS))
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+               INSERT INTO planting_plans (field_id, crop_id, season_year, planned_area, status)
+               SELECT i % ? + 1, i / ? % 8 + 1,
+                      printf('%d-%d', 2014 + i / ? % 10, 2015 + i / ? % 10), 15.0, 'planned'
+               FROM n""", (FIELDS * 10, FIELDS, FIELDS, FIELDS, FIELDS))
+
+
+def timed(name, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{name:<28}{(time.perf_counter() - start) * 1000:>10.1f} мс")
+    return result
+
+
+def main():
+    expenses = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    database = Database(os.path.join(TMP_DIR, "analytics.db"))
+    timed(f"генерація ({expenses} витрат)", lambda: seed(database, expenses))
+
+    frames = timed("load_frames", lambda: load_frames(database))
+    memory = sum(frame.memory_usage(deep=True).sum() for frame in frames.values())
+    print(f"{'пам`ять DataFrame':<28}{memory / 2 ** 20:>10.1f} МБ")
+
+    analytics = FarmAnalytics(frames)
+    base = timed("поле x культура x сезон", analytics.field_crop_season)
+    timed("по полях", analytics.by_field)
+    timed("по культурах", analytics.by_crop)
+    timed("по сезонах", analytics.by_season)
+    timed("витрати за типами", analytics.cost_by_type)
+    print(f"рядків у базовій таблиці: {len(base)}")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Швидкість запису витрат: по одному рядку з фіксацією проти пакетного запису.
+
+Запуск: python benchmarks/bench_bulk_insert.py [кількість_рядків]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_bench_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database, EXPENSE_COLUMNS
+
+EXPENSE_TYPES = ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')
+
+
+def make_rows(count):
+    for i in range(count):
+        amount = float(i % 500 + 1)
+        yield (i % 100 + 1, i % 8 + 1, EXPENSE_TYPES[i % len(EXPENSE_TYPES)],
+               amount, 2.0, 'л', amount * 2, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+               'Чек АЗС')
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    single_rows = min(rows, 2000)
+    database = Database(os.path.join(TMP_DIR, "bench.db"))
+    placeholders = ', '.join('?' * len(EXPENSE_COLUMNS))
+    query = f"INSERT INTO expenses ({', '.join(EXPENSE_COLUMNS)}) VALUES ({placeholders})"
+
+    start = time.perf_counter()
+    for values in make_rows(single_rows):
+        database.execute_query(query, values)
+    single = time.perf_counter() - start
+    print(f"По одному рядку:  {single_rows} рядків за {single:.2f} с "
+          f"({single_rows / single:,.0f} рядків/с)")
+
+    start = time.perf_counter()
+    database.insert_expenses(make_rows(rows))
+    bulk = time.perf_counter() - start
+    print(f"Пакетний запис:   {rows} рядків за {bulk:.2f} с "
+          f"({rows / bulk:,.0f} рядків/с)")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
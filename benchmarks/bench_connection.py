@@ -0,0 +1,66 @@
+"""Порівняння затримки запитів: з'єднання на кожен виклик проти постійного з'єднання.
+
+Запуск: python benchmarks/bench_connection.py [кількість_запитів]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_bench_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database
+
+
+def fetch_one_per_call(db_path, query, params=()):
+    # Стара поведінка: відкриття та закриття з'єднання на кожен запит
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    result = cursor.fetchone()
+    conn.close()
+    return result
+
+
+def seed(database, rows=10000):
+    conn = database.get_connection()
+    conn.executemany(
+        """INSERT INTO expenses (field_id, crop_id, expense_type, amount,
+           quantity, unit, total_cost, date, description)
+           VALUES (?, ?, 'fuel', ?, 1, 'л', ?, '2024-05-01', '')""",
+        ((i % 100 + 1, i % 8 + 1, float(i), float(i)) for i in range(rows))
+    )
+    conn.commit()
+
+
+def measure(label, func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1e6 / iterations:10.1f} мкс/запит")
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    database = Database(os.path.join(TMP_DIR, "bench.db"))
+    seed(database)
+    query = "SELECT * FROM expenses WHERE id = ?"
+
+    old = measure("з'єднання на кожен запит",
+                  lambda i: fetch_one_per_call(database.db_path, query, (i % 10000 + 1,)),
+                  iterations)
+    new = measure("постійне з'єднання",
+                  lambda i: database.fetch_one(query, (i % 10000 + 1,)),
+                  iterations)
+    print(f"Прискорення: x{old / new:.1f}")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Потоковий експорт великої таблиці витрат у CSV та Excel: швидкість і
+пікова пам'ять Python (tracemalloc) мають не залежати від кількості рядків.
+
+Запуск: python benchmarks/bench_export.py [кількість_рядків]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_export_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "export.db"))
+
+from database import db
+from export_engine import export_table
+
+EXPENSE_TYPES = ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')
+
+
+def run(path, trace):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for written, total in export_table("Витрати", path):
+        pass
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return written, elapsed, peak
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    db.insert_expenses(
+        (i % 50 + 1, i % 8 + 1, EXPENSE_TYPES[i % len(EXPENSE_TYPES)], 10.0, 1.0, 'шт',
+         10.0 + i % 100, f"20{20 + i % 5}-{i % 12 + 1:02d}-{i % 28 + 1:02d}", 'опис')
+        for i in range(rows))
+
+    for extension in ("csv", "xlsx"):
+        path = os.path.join(TMP_DIR, f"expenses.{extension}")
+        try:
+            written, elapsed, _ = run(path, trace=False)
+            # Окремий прохід з tracemalloc: трасування сповільнює запис
+            _, _, peak = run(path, trace=True)
+        except ImportError as e:
+            print(f"{extension}: пропущено ({e})")
+            continue
+        print(f"{extension}: {written} рядків за {elapsed:.2f} с "
+              f"({written / elapsed:,.0f} рядків/с), пік пам'яті {peak / 2 ** 20:.1f} МБ, "
+              f"файл {os.path.getsize(path) / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Затримки інтерфейсу на синтетичній базі (benchmarks/datagen.py): модулі
+Поля, Витрати, Урожайність і Звіти перезавантажуються кілька разів з
+увімкненим монітором ui.latency; виводяться p50/p95/p99 обробників load_*
+і show_* та затримки циклу подій. Результати додаються до
+benchmarks/results/gui_latency.jsonl, трасування - у benchmarks/results/ui_trace.json.
+
+Запуск: python benchmarks/bench_gui_latency.py [--scale 10k|100k|1m] [--repeats N] [--db шлях.db]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# (індекс модуля в MainWindow.MODULES, метод перезавантаження)
+MODULES = [(0, "load_fields"), (2, "load_expenses"), (3, "load_harvests")]
+REPORTS_INDEX = 4
+
+
+def wait_idle(app, runner, timeout=120):
+    # Обробка подій, доки не завершаться фонові запити та їх відображення
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        if not runner.is_busy():
+            app.processEvents()
+            return
+        time.sleep(0.001)
+    raise TimeoutError("Фонові запити не завершилися")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Затримки інтерфейсу AgroManager")
+    parser.add_argument("--scale", default="10k")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--db")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="agrofarm_gui_"), "gui.db")
+    generate_data = not os.path.exists(path)
+    os.environ["AGROFARM_DB"] = path
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from datagen import generate, scale_config
+    from database import db
+    if generate_data:
+        generate(db, **scale_config(args.scale))
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    from ui.main_window import MainWindow
+    from ui.query_runner import query_runner
+    from ui.latency import latency_monitor
+    latency_monitor.set_enabled(True)
+    window = MainWindow()
+    window.show()
+    wait_idle(app, query_runner)
+
+    for index, method in MODULES:
+        window.switch_module(index)
+        module = window.get_module(index)
+        wait_idle(app, query_runner)
+        for _ in range(args.repeats):
+            getattr(module, method)()
+            wait_idle(app, query_runner)
+
+    window.switch_module(REPORTS_INDEX)
+    reports = window.get_module(REPORTS_INDEX)
+    wait_idle(app, query_runner)
+    for _ in range(max(1, args.repeats // 5)):
+        for row in range(reports.report_combo.count()):
+            reports.report_combo.setCurrentIndex(row)
+            wait_idle(app, query_runner)
+
+    rows = latency_monitor.report()
+    print(f"{'серія':<52}{'n':>6}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}")
+    for name, count, p50, p95, p99, _ in rows:
+        print(f"{name:<52}{count:>6}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    latency_monitor.export_trace(os.path.join(RESULTS_DIR, "ui_trace.json"))
+    with open(os.path.join(RESULTS_DIR, "gui_latency.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "scale": args.scale,
+            "repeats": args.repeats,
+            "results": {name: {"count": count, "p50": p50, "p95": p95, "p99": p99}
+                        for name, count, p50, p95, p99, _ in rows},
+        }, ensure_ascii=False) + "\n")
+    query_runner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
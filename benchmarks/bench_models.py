@@ -0,0 +1,108 @@
+"""Пам'ять і час створення моделей (models.py) при читанні 1M рядків витрат:
+кортежі sqlite3, звичайні dataclass, dataclass зі slots, row_factory курсора
+та колонкова форма (кортеж на колонку).
+
+Запуск: python benchmarks/bench_models.py [кількість_рядків]
+"""
+import gc
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from itertools import starmap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Expense
+
+QUERY = """SELECT id, field_id, crop_id, expense_type, amount, quantity, unit,
+                  total_cost, date, description FROM expenses"""
+
+# Та сама модель без slots - для порівняння
+PlainExpense = make_dataclass(
+    "PlainExpense", [(f.name, f.type, field(default=f.default)) for f in fields(Expense)])
+
+
+def seed(conn, rows):
+    conn.execute("""CREATE TABLE expenses (id INTEGER PRIMARY KEY, field_id INTEGER,
+                    crop_id INTEGER, expense_type TEXT, amount REAL, quantity REAL,
+                    unit TEXT, total_cost REAL, date DATE, description TEXT)""")
+    conn.execute(
+        """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+           INSERT INTO expenses
+           SELECT i, i % 200 + 1, i % 8 + 1, 'fuel', 100.0 + i % 900, 1.0 + i % 7, 'л',
+                  (100.0 + i % 900) * (1.0 + i % 7),
+                  printf('20%02d-%02d-%02d', 15 + i % 10, i % 12 + 1, i % 28 + 1), ''
+           FROM n""", (rows,))
+
+
+def tuples(conn):
+    return conn.execute(QUERY).fetchall()
+
+
+def plain_dataclass(conn):
+    return list(starmap(PlainExpense, conn.execute(QUERY).fetchall()))
+
+
+def slotted_dataclass(conn):
+    return list(starmap(Expense, conn.execute(QUERY).fetchall()))
+
+
+def cursor_row_factory(conn):
+    # Модель створює сам курсор для кожного рядка
+    cursor = conn.cursor()
+    cursor.row_factory = lambda cursor, row: Expense(*row)
+    return cursor.execute(QUERY).fetchall()
+
+
+def columnar(conn):
+    # Кортеж значень на колонку замість запису на рядок
+    names = [f.name for f in fields(Expense)]
+    rows = conn.execute(QUERY).fetchall()
+    return dict(zip(names, zip(*rows))) if rows else {name: () for name in names}
+
+
+VARIANTS = [
+    ("кортежі sqlite3", tuples),
+    ("dataclass", plain_dataclass),
+    ("dataclass(slots)", slotted_dataclass),
+    ("row_factory(slots)", cursor_row_factory),
+    ("колонки", columnar),
+]
+
+
+def measure(conn, func):
+    # Час - найкращий з трьох запусків; пам'ять результату - окремим
+    # запуском під tracemalloc (він сповільнює виконання)
+    best = float("inf")
+    for _ in range(3):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(conn)
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = func(conn)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return best, size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    conn = sqlite3.connect(":memory:")
+    seed(conn, rows)
+    print(f"рядків: {rows}, slots: {not hasattr(Expense(), '__dict__')}")
+    print(f"{'':<22}{'час, с':>10}{'пам`ять, МБ':>14}{'байт/рядок':>12}")
+    for name, func in VARIANTS:
+        seconds, size = measure(conn, func)
+        print(f"{name:<22}{seconds:>10.2f}{size / 2 ** 20:>14.1f}{size / rows:>12.0f}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
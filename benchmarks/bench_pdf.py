@@ -0,0 +1,47 @@
+"""Пакетна генерація PDF-звітів по полях: послідовно (1 процес) і
+паралельно на всіх ядрах.
+
+Запуск: python benchmarks/bench_pdf.py [кількість_полів] [витрат_на_поле]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_pdf_")
+# Робочі процеси успадковують змінну середовища і відкривають ту саму базу
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "pdf.db"))
+
+from database import db
+from pdf_engine import render_field_reports
+
+EXPENSE_TYPES = ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')
+
+
+def seed(fields, expenses_per_field):
+    db.insert_many("fields", ("name", "area", "soil_type"),
+                   ((f"Поле {i}", 20.0 + i, "чорнозем") for i in range(fields)))
+    db.insert_expenses(
+        (i % fields + 1, i % 8 + 1, EXPENSE_TYPES[i % len(EXPENSE_TYPES)], 10.0, 1.0, 'шт',
+         10.0 + i % 100, f"20{20 + i % 5}-{i % 12 + 1:02d}-{i % 28 + 1:02d}", 'опис')
+        for i in range(fields * expenses_per_field))
+
+
+def main():
+    fields = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    per_field = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    seed(fields, per_field)
+
+    for workers in (1, os.cpu_count() or 1):
+        out_dir = os.path.join(TMP_DIR, f"workers_{workers}")
+        start = time.perf_counter()
+        paths = render_field_reports(out_dir, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"процесів: {workers:>2} | звітів: {len(paths)} | {elapsed:.2f} с "
+              f"({len(paths) / elapsed:.1f} звітів/с)")
+
+
+if __name__ == "__main__":
+    main()
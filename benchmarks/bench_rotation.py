@@ -0,0 +1,108 @@
+"""Час оптимізації сівозміни (RotationOptimizer) для сотень і тисяч полів:
+завантаження історії зі зведених таблиць і розв'язання на кілька сезонів,
+з перевіркою правил сівозміни в результаті.
+
+Запуск: python benchmarks/bench_rotation.py [кількість_полів] [сезонів]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_rotation_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database
+from rotation import (RotationOptimizer, LEGUME_BREAK, fixed_plans, next_seasons,
+                      rotation_allowed)
+
+HISTORY_YEARS = 10
+FIRST_SEASON = "2025-2026"
+
+
+def seed(database, fields):
+    # Історія: на кожному полі щороку одна з 8 культур, врожай і витрати
+    # залежать від поля й культури
+    with database.transaction():
+        database.insert_many(
+            "fields", ("name", "area", "soil_type"),
+            ((f"Поле {i}", 20.0 + i % 80, "чорнозем") for i in range(fields)))
+        conn = database.get_connection()
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+               INSERT INTO harvest (field_id, crop_id, actual_yield, harvest_date, quality_rating)
+               SELECT i % ? + 1, (i % ? * 3 + i / ?) % 8 + 1,
+                      (20.0 + i % ? % 80) * (2.0 + (i * 7) % 5),
+                      printf('%d-08-15', 2015 + i / ?), 4
+               FROM n""", (fields * HISTORY_YEARS, fields, fields, fields, fields, fields))
+        conn.execute(
+            """INSERT INTO expenses (field_id, crop_id, expense_type, amount, quantity,
+                                     total_cost, date)
+               SELECT field_id, crop_id, 'seeds', 1000.0, 1.0, (20.0 + (field_id - 1) % 80) * (8000.0 + (id * 13) % 6000),
+                      substr(harvest_date, 1, 4) || '-04-01'
+               FROM harvest""")
+        # Наявні плани першого сезону для кожного десятого поля
+        conn.execute(
+            """INSERT INTO planting_plans (field_id, crop_id, season_year, planned_area, status)
+               SELECT id, 4, ?, area, 'planned' FROM fields WHERE id % 10 = 0""",
+            (FIRST_SEASON,))
+
+
+def timed(name, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{name:<28}{(time.perf_counter() - start) * 1000:>10.1f} мс")
+    return result
+
+
+def check_rules(optimizer, assignments):
+    # Перевірка правил для нових призначень з урахуванням історії поля;
+    # повертає кількість порушень
+    category = {crop[0]: crop[1] for crop in optimizer.crops}
+    by_field = {}
+    for assignment in assignments:
+        by_field.setdefault(assignment.field_id, []).append(assignment)
+    violations = 0
+    for field_id, sequence in by_field.items():
+        first_year = int(sequence[0].season_year[-4:])
+        previous_index, since_legume = optimizer.initial_state(field_id, first_year)
+        previous = (optimizer.crop_ids[previous_index]
+                    if previous_index < len(optimizer.crop_ids) else None)
+        for current in sequence:
+            since_legume = 0 if category[current.crop_id] == "legume" else since_legume + 1
+            if not current.planned:
+                if since_legume >= LEGUME_BREAK:
+                    violations += 1
+                if previous is not None and not rotation_allowed(
+                        category[previous], previous,
+                        category[current.crop_id], current.crop_id):
+                    violations += 1
+            previous = current.crop_id
+    return violations
+
+
+def main():
+    fields = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    database = Database(os.path.join(TMP_DIR, "rotation.db"))
+    timed(f"генерація ({fields} полів)", lambda: seed(database, fields))
+
+    seasons = next_seasons(FIRST_SEASON, count)
+    optimizer = timed("завантаження історії", lambda: RotationOptimizer.load(database))
+    fixed = timed("наявні плани", lambda: fixed_plans(database, seasons))
+    assignments, infeasible = timed(f"розв'язання ({count} сезонів)",
+                                    lambda: optimizer.solve(seasons, fixed))
+
+    print(f"призначень: {len(assignments)}, без розв'язку: {len(infeasible)}, "
+          f"фіксованих: {sum(a.planned for a in assignments)}")
+    print(f"очікувана маржа: {sum(a.margin for a in assignments) / 1e6:.1f} млн грн")
+    violations = check_rules(optimizer, assignments)
+    print(f"порушень правил сівозміни: {violations}")
+    database.close()
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Час запуску програми до готовності (вікно створене, дані першого модуля
+завантажені). Холодний запуск - без скомпільованого байткоду, теплий -
+медіана кількох повторних запусків. Результати додаються до
+benchmarks/results/startup.jsonl для порівняння між версіями.
+
+Запуск: python benchmarks/bench_startup.py [кількість_теплих_запусків]
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, "benchmarks", "results", "startup.jsonl")
+
+
+def child():
+    # Виконується в окремому процесі: від старту інтерпретатора до готовності
+    sys.path.insert(0, ROOT)
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QEventLoop
+    app = QApplication(sys.argv)
+    from ui.main_window import MainWindow
+    from ui.query_runner import query_runner
+    from main import when_idle
+    window = MainWindow()
+    window.show()
+    loop = QEventLoop()
+    when_idle(query_runner, loop.quit)
+    loop.exec()
+    print(time.time() - float(os.environ["AGROFARM_BENCH_T0"]))
+    query_runner.shutdown()
+
+
+def run_once(env):
+    env = dict(env, AGROFARM_BENCH_T0=repr(time.time()))
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                            env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def clear_bytecode():
+    for directory, subdirs, _ in os.walk(ROOT):
+        if "__pycache__" in subdirs:
+            shutil.rmtree(os.path.join(directory, "__pycache__"))
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    warm_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    env.setdefault("AGROFARM_DB", os.path.join(tempfile.mkdtemp(prefix="agrofarm_bench_"),
+                                               "startup.db"))
+
+    clear_bytecode()
+    cold = run_once(env)
+    warm = [run_once(env) for _ in range(warm_runs)]
+    result = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "cold_s": round(cold, 3),
+        "warm_median_s": round(statistics.median(warm), 3),
+        "warm_min_s": round(min(warm), 3),
+    }
+    print(f"Холодний запуск: {cold:.3f} с")
+    print(f"Теплий запуск:   {result['warm_median_s']:.3f} с (медіана з {warm_runs})")
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
@@ -0,0 +1,95 @@
+"""Порівняння профілів зберігання: швидкість запису, затримка звіту та
+блокування читачів під час запису.
+
+Запуск: python benchmarks/bench_storage_profiles.py [рядків_для_звіту]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_bench_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database, STORAGE_PROFILES, EXPENSE_COLUMNS
+
+EXPENSE_TYPES = ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')
+SINGLE_WRITES = 500
+REPORT_QUERY = """SELECT field_id, expense_type, SUM(total_cost), COUNT(*)
+                  FROM expenses GROUP BY field_id, expense_type"""
+
+
+def make_row(i):
+    amount = float(i % 500 + 1)
+    return (i % 200 + 1, i % 8 + 1, EXPENSE_TYPES[i % len(EXPENSE_TYPES)],
+            amount, 1.0, 'шт', amount, f"20{20 + i % 5}-{i % 12 + 1:02d}-01", '')
+
+
+def bench_single_writes(database):
+    start = time.perf_counter()
+    for i in range(SINGLE_WRITES):
+        database.insert_expenses([make_row(i)])
+    return SINGLE_WRITES / (time.perf_counter() - start)
+
+
+def bench_report(database, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        database.fetch_all(REPORT_QUERY)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_reader_during_write(database):
+    # Читач тримає відкриту транзакцію (як довгий звіт), поки пише основний потік
+    ready = threading.Event()
+    done = threading.Event()
+
+    def reader():
+        conn = sqlite3.connect(database.db_path, timeout=0)
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM expenses").fetchone()
+        ready.set()
+        done.wait()
+        conn.rollback()
+        conn.close()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    ready.wait()
+    writer = sqlite3.connect(database.db_path, timeout=0)
+    try:
+        writer.execute(f"INSERT INTO expenses ({', '.join(EXPENSE_COLUMNS)}) "
+                       f"VALUES ({', '.join('?' * len(EXPENSE_COLUMNS))})", make_row(0))
+        writer.commit()
+        blocked = False
+    except sqlite3.OperationalError:
+        blocked = True
+    finally:
+        writer.close()
+        done.set()
+        thread.join()
+    return blocked
+
+
+def main():
+    report_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"{'Профіль':<10} {'запис, рядків/с':>16} {'звіт, мс':>10} {'запис блокується читачем':>26}")
+    for name in STORAGE_PROFILES:
+        database = Database(os.path.join(TMP_DIR, f"{name}.db"), profile=name)
+        database.insert_expenses(make_row(i) for i in range(report_rows))
+        writes = bench_single_writes(database)
+        report = bench_report(database)
+        blocked = bench_reader_during_write(database)
+        print(f"{name:<10} {writes:>16,.0f} {report * 1000:>10.1f} {'так' if blocked else 'ні':>26}")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
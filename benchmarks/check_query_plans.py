@@ -0,0 +1,85 @@
+"""Перевірка EXPLAIN QUERY PLAN для запитів списків модулів: кожен фільтр має
+використовувати індекс, а сортування за датою - обходитися без тимчасового B-дерева.
+
+Запуск: python benchmarks/check_query_plans.py (код виходу 1 при регресії)
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="agrofarm_plans_")
+os.environ.setdefault("AGROFARM_DB", os.path.join(TMP_DIR, "singleton.db"))
+
+from database import Database
+from queries import (expenses_query, harvests_query, expenses_stats_query,
+                     harvests_stats_query, plans_query)
+from allocation import CAPACITY_QUERY, SEASON_OVERVIEW
+
+# (назва, запит, параметри, індекс, що має використовуватись)
+CASES = [
+    ("витрати: всі",) + expenses_query() + ("idx_expenses_date",),
+    ("витрати: рік",) + expenses_query(year="2024") + ("idx_expenses_date",),
+    ("витрати: тип",) + expenses_query(expense_type="fuel") + ("idx_expenses_type_date",),
+    ("витрати: тип + рік",) + expenses_query("fuel", "2024") + ("idx_expenses_type_date",),
+    ("врожай: всі",) + harvests_query() + ("idx_harvest_date",),
+    ("врожай: рік",) + harvests_query(year="2024") + ("idx_harvest_date",),
+    ("статистика витрат: рік",) + expenses_stats_query(year="2024")
+    + ("expense_summary USING PRIMARY KEY",),
+    ("статистика витрат: тип + рік",) + expenses_stats_query("fuel", "2024")
+    + ("expense_summary USING PRIMARY KEY",),
+    ("статистика врожаю: рік",) + harvests_stats_query("2024")
+    + ("harvest_summary USING PRIMARY KEY",),
+    ("витрати по полю",
+     "SELECT SUM(total_cost) FROM expenses WHERE field_id = ? AND crop_id = ?", (1, 1),
+     "idx_expenses_field_crop"),
+    ("врожай по культурі",
+     "SELECT SUM(actual_yield) FROM harvest WHERE crop_id = ?", (1,),
+     "idx_harvest_crop"),
+    ("плани: сезон",) + plans_query("2024-2025") + ("idx_planting_season",),
+    ("вільна площа поля",
+     CAPACITY_QUERY, ("2024-2025", 1, "2024-2025", 1),
+     "field_allocation USING PRIMARY KEY"),
+    ("огляд сезону",
+     SEASON_OVERVIEW, ("2024-2025",), "USING PRIMARY KEY (season_year=? AND field_id=?)"),
+    ("культури: категорія",
+     "SELECT * FROM crops WHERE category='grain' ORDER BY name", (),
+     "idx_crops_category_name"),
+]
+
+
+EXPENSE_TYPES = ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')
+
+
+def seed(database, rows=20000):
+    # Статистика ANALYZE на заповнених таблицях, як у робочій базі
+    database.insert_expenses(
+        (i % 200 + 1, i % 8 + 1, EXPENSE_TYPES[i % len(EXPENSE_TYPES)], 10.0, 1.0, 'шт',
+         10.0, f"20{20 + i % 5}-{i % 12 + 1:02d}-{i % 28 + 1:02d}", '')
+        for i in range(rows))
+    database.insert_harvests(
+        (i % 200 + 1, i % 8 + 1, 5.0, f"20{20 + i % 5}-08-{i % 28 + 1:02d}", i % 5 + 1, 12.0, '')
+        for i in range(rows // 10))
+    database.execute_query("ANALYZE")
+
+
+def main():
+    database = Database(os.path.join(TMP_DIR, "plans.db"))
+    seed(database)
+    failures = 0
+    for name, query, params, index in CASES:
+        plan = database.explain(query, params)
+        uses_index = any(index in line for line in plan)
+        sorts = any("TEMP B-TREE" in line for line in plan)
+        ok = uses_index and not sorts
+        failures += not ok
+        print(f"[{'OK' if ok else 'FAIL'}] {name}")
+        for line in plan:
+            print(f"       {line}")
+    database.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Детермінований генератор синтетичних даних господарства: поля, плани
+посівів, витрати й урожай за кілька сезонів. Однакові параметри й seed
+завжди дають однакову базу, тож заміри різних версій порівнювані.
+
+Запуск: python benchmarks/datagen.py шлях.db [--scale 10k|100k|1m]
+        [--fields N] [--seasons N] [--expenses N] [--harvests N] [--seed N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("AGROFARM_DB", os.path.join(tempfile.mkdtemp(prefix="agrofarm_data_"),
+                                                  "singleton.db"))
+
+from database import Database, EXPENSE_COLUMNS, HARVEST_COLUMNS, PLAN_COLUMNS
+
+# Масштаби: загальна кількість рядків приблизно відповідає назві
+# (поля x сезони x (витрати + врожаї + план))
+SCALES = {
+    "10k": dict(fields=40, seasons=5, expenses=45, harvests=4),
+    "100k": dict(fields=400, seasons=5, expenses=45, harvests=4),
+    "1m": dict(fields=4000, seasons=5, expenses=45, harvests=4),
+}
+DEFAULT_SCALE = "10k"
+LAST_SEASON = 2025
+
+SOIL_TYPES = ("чорнозем", "сірозем", "каштановий", "дерново-підзолистий")
+# (тип витрат, одиниця, ціна за одиницю)
+EXPENSE_KINDS = (
+    ("seeds", "кг", 45.0), ("fuel", "л", 52.0), ("fertilizers", "кг", 28.0),
+    ("chemicals", "л", 640.0), ("labor", "год", 150.0), ("equipment", "год", 900.0),
+    ("other", "шт", 300.0),
+)
+DESCRIPTIONS = ("", "", "Чек АЗС", "Накладна постачальника", "Оренда техніки",
+                "Обробка від шкідників", "Підживлення", "Сезонні працівники")
+NOTES = ("", "", "Вологе зерно", "Після дощу", "Повне збирання", "Частина поля")
+
+
+def scale_config(scale=DEFAULT_SCALE, **overrides):
+    config = dict(SCALES[scale])
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+
+def row_count(config):
+    per_season = config["expenses"] + config["harvests"] + 1
+    return config["fields"] * (1 + config["seasons"] * per_season)
+
+
+def _seasons(count):
+    # Останні count сезонів до LAST_SEASON включно: [(рік сівби, рік збору)]
+    return [(year - 1, year) for year in range(LAST_SEASON - count + 1, LAST_SEASON + 1)]
+
+
+def _day(rng, year, first_month, last_month):
+    return f"{year}-{rng.randint(first_month, last_month):02d}-{rng.randint(1, 28):02d}"
+
+
+def generate(database, fields=40, seasons=5, expenses=45, harvests=4, seed=0):
+    # Заповнення порожньої бази; expenses і harvests - кількість записів на
+    # поле за сезон. Записи йдуть через пакетні методи бази, тож тригери
+    # (зведені таблиці, пошуковий індекс, розподіл площі) працюють як у програмі
+    rng = random.Random(seed)
+    crops = database.fetch_all("SELECT id, average_yield FROM crops ORDER BY id")
+    field_rows = [(f"Поле {i + 1}", round(rng.uniform(10.0, 250.0), 1),
+                   rng.choice(SOIL_TYPES), f"Ділянка {i % 50 + 1}") for i in range(fields)]
+    with database.transaction():
+        database.insert_many("fields", ("name", "area", "soil_type", "description"), field_rows)
+        field_ids = [row[0] for row in database.fetch_all("SELECT id FROM fields ORDER BY id")]
+        areas = dict(zip(field_ids, (row[1] for row in field_rows)))
+
+        # Одна культура на поле за сезон, сусідні сезони - різні культури
+        plans = []
+        for field_id in field_ids:
+            previous = None
+            for sowing_year, harvest_year in _seasons(seasons):
+                crop_id, average_yield = rng.choice([c for c in crops if c[0] != previous])
+                previous = crop_id
+                plans.append((field_id, crop_id, f"{sowing_year}-{harvest_year}",
+                              areas[field_id], f"{sowing_year}-{rng.randint(9, 10):02d}-15",
+                              f"{harvest_year}-08-01", "completed", average_yield))
+        database.insert_plans([plan[:len(PLAN_COLUMNS)] for plan in plans])
+
+        def expense_rows():
+            for field_id, crop_id, season, *_ in plans:
+                sowing_year = int(season[:4])
+                for _ in range(expenses):
+                    kind, unit, price = rng.choice(EXPENSE_KINDS)
+                    quantity = round(rng.uniform(1.0, 500.0), 1)
+                    amount = round(price * rng.uniform(0.8, 1.2), 2)
+                    # Витрати сезону - з вересня року сівби до серпня року збору
+                    month = rng.randint(9, 20)
+                    year = sowing_year + (month > 12)
+                    month = (month - 1) % 12 + 1
+                    yield (field_id, crop_id, kind, amount, quantity, unit,
+                           round(amount * quantity, 2), _day(rng, year, month, month),
+                           rng.choice(DESCRIPTIONS))
+
+        def harvest_rows():
+            for field_id, crop_id, season, area, _, _, _, average_yield in plans:
+                harvest_year = int(season[-4:])
+                total = area * (average_yield or 3.0) * rng.uniform(0.6, 1.3)
+                for _ in range(harvests):
+                    yield (field_id, crop_id, round(total / harvests, 2),
+                           _day(rng, harvest_year, 7, 9), rng.randint(1, 5),
+                           round(rng.uniform(9.0, 18.0), 1), rng.choice(NOTES))
+
+        database.insert_many("expenses", EXPENSE_COLUMNS, expense_rows())
+        database.insert_many("harvest", HARVEST_COLUMNS, harvest_rows())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерація синтетичної бази AgroManager")
+    parser.add_argument("path")
+    parser.add_argument("--scale", choices=SCALES, default=DEFAULT_SCALE)
+    for name in ("fields", "seasons", "expenses", "harvests"):
+        parser.add_argument(f"--{name}", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        sys.exit(f"Файл уже існує: {args.path}")
+    config = scale_config(args.scale, fields=args.fields, seasons=args.seasons,
+                          expenses=args.expenses, harvests=args.harvests)
+    start = time.perf_counter()
+    database = Database(args.path)
+    generate(database, seed=args.seed, **config)
+    database.close()
+    print(f"{row_count(config):,} рядків ({config}) за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
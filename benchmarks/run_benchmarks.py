@@ -0,0 +1,153 @@
+"""Набір замірів на синтетичній базі (benchmarks/datagen.py): CRUD бази,
+завантаження модулів, кожен звіт ReportsModule і запуск. Для кожного
+заміру - мінімум, медіана, середнє та розкид за кілька раундів; результати
+додаються до benchmarks/results/suite.jsonl і порівнюються з попереднім
+запуском того самого масштабу.
+
+Запуск: python benchmarks/run_benchmarks.py [--scale 10k|100k|1m] [--rounds N]
+        [--db шлях.db] [--filter текст] [--threshold 0.2] [--no-save]
+Код виходу 1, якщо медіана якогось заміру зросла більше ніж на threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, "benchmarks", "results", "suite.jsonl")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Мінімальна тривалість раунду: швидкі заміри повторюються в циклі
+MIN_ROUND_S = 0.01
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def measure(func, rounds):
+    # Розігрів і підбір кількості викликів на раунд; час - на один виклик
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, int(MIN_ROUND_S / once)) if once > 0 else 1000
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def previous_run(scale):
+    if not os.path.exists(RESULTS):
+        return None
+    previous = None
+    with open(RESULTS, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get("scale") == scale:
+                previous = run
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Набір замірів AgroManager")
+    parser.add_argument("--scale", default="10k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--db", help="база для замірів; створюється, якщо не існує")
+    parser.add_argument("--filter", default="", help="лише заміри з цим текстом у назві")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="agrofarm_suite_"), "suite.db")
+    generate_data = not os.path.exists(path)
+    # База вибирається до імпорту модулів програми: звіти й сервіси
+    # працюють зі спільним екземпляром database.db
+    os.environ["AGROFARM_DB"] = path
+    from datagen import SCALES, generate, scale_config, row_count
+    from database import db
+    if args.scale not in SCALES:
+        parser.error(f"масштаб: {', '.join(SCALES)}")
+
+    config = scale_config(args.scale)
+    if generate_data:
+        start = time.perf_counter()
+        generate(db, seed=args.seed, **config)
+        print(f"Генерація {row_count(config):,} рядків: {time.perf_counter() - start:.1f} с")
+
+    from suite_cases import CASES
+    previous = previous_run(args.scale)
+    previous_results = previous["results"] if previous else {}
+    results = {}
+    skipped = {}
+    regressions = []
+    print(f"{'замір':<48}{'медіана, мс':>13}{'мін, мс':>11}{'зміна':>9}")
+    for group, name, func in CASES:
+        key = f"{group}/{name}"
+        if args.filter not in key:
+            continue
+        try:
+            result = measure(func, args.rounds)
+        except ImportError as e:
+            # Необов'язкові залежності (pandas, PyQt6)
+            skipped[key] = str(e)
+            print(f"{key:<48}{'пропущено: ' + str(e):>33}")
+            continue
+        results[key] = result
+        change = ""
+        old = previous_results.get(key)
+        if old:
+            ratio = result["median"] / old["median"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > args.threshold:
+                regressions.append(key)
+                change += " !"
+        print(f"{key:<48}{result['median'] * 1000:>13.3f}{result['min'] * 1000:>11.3f}"
+              f"{change:>9}")
+
+    if previous:
+        print(f"\nПорівняння з {previous['date']} ({previous['revision'] or '-'})")
+    if regressions:
+        print(f"Повільніше більш ніж на {args.threshold:.0%}: {', '.join(regressions)}")
+
+    if not args.no_save:
+        run = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "config": config,
+            "python": sys.version.split()[0],
+            "results": results,
+            "skipped": skipped,
+        }
+        os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+        with open(RESULTS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    db.close()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Заміри для benchmarks/run_benchmarks.py: CRUD бази, запити завантаження
+модулів, звіти ReportsModule і запуск. Імпортується після вибору бази
+(AGROFARM_DB), бо працює зі спільним екземпляром database.db.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+from database import Database, db, EXPENSE_COLUMNS
+from queries import crops_query, expenses_query, harvests_query, plans_query
+from report_engine import REPORTS, stream_report
+from services import expenses, fields, harvests, plans
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Розмір першої сторінки таблиць модулів (LazyTableModel.PAGE_SIZE)
+PAGE_SIZE = 500
+BATCH_ROWS = 1000
+
+# [(група, назва, функція без аргументів)]
+CASES = []
+
+
+def case(group, name=None):
+    def register(func):
+        CASES.append((group, name or func.__name__, func))
+        return func
+    return register
+
+
+def first_page(query, params=()):
+    return db.fetch_all(f"{query} LIMIT ? OFFSET ?", tuple(params) + (PAGE_SIZE, 0))
+
+
+def _sample_expense():
+    return expenses.get(db.fetch_one("SELECT MAX(id) / 2 + 1 FROM expenses")[0])
+
+
+def _latest_year():
+    return db.fetch_one("SELECT MAX(substr(date, 1, 4)) FROM expenses")[0]
+
+
+def _latest_season():
+    seasons = plans.seasons()
+    return seasons[0] if seasons else None
+
+
+# CRUD через Database і сервісні репозиторії; кожен замір залишає базу
+# в попередньому стані
+
+@case("crud")
+def get_by_id():
+    _sample_expense()
+
+
+@case("crud")
+def insert_delete():
+    item = _sample_expense()
+    expenses.delete(expenses.add(item))
+
+
+@case("crud")
+def update():
+    expenses.update(_sample_expense())
+
+
+@case("crud")
+def insert_many_delete():
+    first_id = db.fetch_one("SELECT IFNULL(MAX(id), 0) FROM expenses")[0]
+    rows = [(1, 1, 'fuel', 52.0, float(i % 50 + 1), 'л', 52.0 * (i % 50 + 1),
+             '2025-05-01', '') for i in range(BATCH_ROWS)]
+    with db.transaction():
+        db.insert_many("expenses", EXPENSE_COLUMNS, rows)
+        db.execute_query("DELETE FROM expenses WHERE id > ?", (first_id,))
+
+
+@case("crud")
+def list_page():
+    expenses.list(limit=PAGE_SIZE)
+
+
+# Запити, з якими модулі завантажують таблицю та статистику
+
+@case("modules", "fields")
+def load_fields():
+    first_page("SELECT * FROM fields ORDER BY id")
+    fields.stats()
+
+
+@case("modules", "crops")
+def load_crops():
+    query, params, _ = crops_query()
+    first_page(query, params)
+
+
+@case("modules", "expenses")
+def load_expenses():
+    first_page(*expenses_query())
+    expenses.stats()
+
+
+@case("modules", "expenses_year")
+def load_expenses_year():
+    year = _latest_year()
+    first_page(*expenses_query("fuel", year))
+    expenses.stats("fuel", year)
+
+
+@case("modules", "harvest")
+def load_harvest():
+    first_page(*harvests_query())
+    harvests.stats()
+
+
+@case("modules", "planning")
+def load_planning():
+    season = _latest_season()
+    first_page(*plans_query(season))
+    plans.season_overview(season)
+
+
+# Повна генерація кожного звіту ReportsModule
+
+def _report(name):
+    def run():
+        for _ in stream_report(name):
+            pass
+    return run
+
+
+for _name in REPORTS:
+    case("reports", _name)(_report(_name))
+
+
+# Запуск: відкриття бази з перевіркою міграцій і завантаження довідників
+# (без інтерфейсу) та повний запуск вікна, якщо доступний PyQt6
+
+@case("startup", "database")
+def open_database():
+    database = Database(db.db_path)
+    database.fetch_all("SELECT id, name FROM fields ORDER BY id")
+    database.fetch_all("SELECT id, name FROM crops ORDER BY id")
+    database.close()
+
+
+@case("startup", "window")
+def open_window():
+    if importlib.util.find_spec("PyQt6") is None:
+        raise ImportError("No module named 'PyQt6'")
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "bench_startup.py"),
+                    "--child"], env=dict(env, AGROFARM_BENCH_T0="0"), cwd=ROOT,
+                   capture_output=True, check=True)
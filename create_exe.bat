@@ -23,7 +23,13 @@ if errorlevel 1 (
 
 REM 3. Створення EXE
 echo [3/4] Створення EXE файлу...
-pyinstaller --onefile --windowed --name AgroFarmManager main.py
+REM Модулі вікна імпортуються за назвою при першому переході - PyInstaller
+REM не знаходить їх сам
+pyinstaller --onefile --windowed --name AgroFarmManager ^
+    --hidden-import modules.fields --hidden-import modules.crops ^
+    --hidden-import modules.expenses --hidden-import modules.harvest ^
+    --hidden-import modules.reports --hidden-import modules.planning ^
+    main.py
 
 REM 4. Копіювання до папки release
 echo [4/4] Копіювання файлів...
@@ -1,99 +1,200 @@
 import sqlite3
 import os
+import re
+import atexit
+import threading
+import time
+import traceback
+from contextlib import contextmanager
 from datetime import datetime
 
+from migrations import migrate, pending_migrations, backup_database
+from summaries import rebuild_summaries, check_summaries
+from search import search, rebuild_search_index
+from allocation import (free_area, season_overview, plan_seasons,
+                        rebuild_allocation, check_allocation)
+from profiler import profiler_from_env
+
+# Колонки для пакетного запису (порядок відповідає кортежам значень)
+EXPENSE_COLUMNS = ('field_id', 'crop_id', 'expense_type', 'amount', 'quantity',
+                   'unit', 'total_cost', 'date', 'description')
+HARVEST_COLUMNS = ('field_id', 'crop_id', 'actual_yield', 'harvest_date',
+                   'quality_rating', 'moisture_content', 'notes')
+PLAN_COLUMNS = ('field_id', 'crop_id', 'season_year', 'planned_area',
+                'sowing_date', 'expected_harvest_date', 'status')
+
+# Профілі зберігання: PRAGMA, що застосовуються до кожного нового з'єднання.
+# WAL дозволяє звітам читати базу паралельно із записом даних.
+STORAGE_PROFILES = {
+    # Поведінка SQLite за замовчуванням (журнал відкату)
+    'compat': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+    },
+    # WAL з повною синхронізацією - максимальна надійність
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16384,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # WAL + NORMAL: безпечно для WAL, в рази швидший запис
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # Для масових імпортів і бенчмарків: можлива втрата останніх
+    # транзакцій при збої живлення
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+DEFAULT_STORAGE_PROFILE = 'balanced'
+# Розбір DML-запитів для сповіщень про зміни: таблиця, дія та id запису
+_DML_PATTERN = re.compile(
+    r"^\s*(INSERT(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+    re.IGNORECASE)
+_BY_ID_PATTERN = re.compile(r"WHERE\s+id\s*=\s*\?\s*$", re.IGNORECASE)
+
+# Назви типів витрат і категорій культур для інтерфейсу (код -> назва)
+EXPENSE_TYPE_NAMES = {
+    'seeds': 'Насіння',
+    'fuel': 'Паливо',
+    'fertilizers': 'Добрива',
+    'chemicals': 'Хімікати',
+    'labor': 'Робоча сила',
+    'equipment': 'Техніка',
+    'other': 'Інше',
+}
+CROP_CATEGORY_NAMES = {'grain': 'Зернові', 'legume': 'Бобові', 'oil': 'Олійні'}
+PLAN_STATUS_NAMES = {
+    'planned': 'Заплановано',
+    'in_progress': 'Виконується',
+    'completed': 'Завершено',
+    'cancelled': 'Скасовано',
+}
+
+# Скільки мілісекунд чекати на блокування замість помилки "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
 class Database:
-    def __init__(self):
-        self.db_path = 'agrofarm.db'
+    # Розмір кешу підготовлених запитів для кожного з'єднання
+    STATEMENT_CACHE_SIZE = 256
+    
+    def __init__(self, db_path='agrofarm.db', profile=DEFAULT_STORAGE_PROFILE):
+        self.db_path = db_path
+        if isinstance(profile, str):
+            if profile not in STORAGE_PROFILES:
+                raise ValueError(f"Невідомий профіль зберігання: {profile}")
+            profile = STORAGE_PROFILES[profile]
+        self.profile = dict(profile)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._listeners = []
+        # Профайлер запитів (profiler.QueryProfiler) або None
+        self.profiler = None
         self.init_database()
+        atexit.register(self.close)
     
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        # Одне довготривале з'єднання на потік: sqlite3 не дозволяє
+        # одночасно використовувати з'єднання з різних потоків
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path,
+                                   cached_statements=self.STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False,
+                                   timeout=BUSY_TIMEOUT_MS / 1000)
+            self.apply_profile(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def apply_profile(self, conn):
+        for pragma, value in self.profile.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+    
+    def close(self):
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+            # Потоки отримають нові з'єднання при наступному запиті
+            self._local = threading.local()
+        
+        for conn in connections:
+            try:
+                # Оновлення статистики планувальника для індексів
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            conn.close()
     
     def init_database(self):
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Створення таблиці полів
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fields (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            area REAL NOT NULL,
-            soil_type TEXT,
-            description TEXT,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Створення таблиці культур
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS crops (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            category TEXT CHECK(category IN ('grain', 'legume', 'oil')),
-            sowing_season TEXT,
-            harvest_period INTEGER,
-            average_yield REAL,
-            description TEXT
-        )
-        ''')
         
-        # Створення таблиці плану посівів
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS planting_plans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            field_id INTEGER,
-            crop_id INTEGER,
-            season_year TEXT,
-            planned_area REAL,
-            sowing_date DATE,
-            expected_harvest_date DATE,
-            status TEXT DEFAULT 'planned',
-            FOREIGN KEY (field_id) REFERENCES fields (id),
-            FOREIGN KEY (crop_id) REFERENCES crops (id)
-        )
-        ''')
-        
-        # Створення таблиці витрат
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            field_id INTEGER,
-            crop_id INTEGER,
-            expense_type TEXT CHECK(expense_type IN ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')),
-            amount REAL NOT NULL,
-            quantity REAL,
-            unit TEXT,
-            total_cost REAL,
-            date DATE,
-            description TEXT,
-            FOREIGN KEY (field_id) REFERENCES fields (id),
-            FOREIGN KEY (crop_id) REFERENCES crops (id)
-        )
-        ''')
-        
-        # Створення таблиці врожаю
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS harvest (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            field_id INTEGER,
-            crop_id INTEGER,
-            actual_yield REAL,
-            harvest_date DATE,
-            quality_rating INTEGER CHECK(quality_rating BETWEEN 1 AND 5),
-            moisture_content REAL,
-            notes TEXT,
-            FOREIGN KEY (field_id) REFERENCES fields (id),
-            FOREIGN KEY (crop_id) REFERENCES crops (id)
-        )
-        ''')
+        # Оновлення схеми до актуальної версії
+        self.migrate()
         
         # Додавання базових культур
+        cursor = conn.cursor()
         self.add_default_crops(cursor)
         
         conn.commit()
-        conn.close()
+    
+    def migrate(self, dry_run=False):
+        conn = self.get_connection()
+        pending = pending_migrations(conn)
+        # Резервна копія перед оновленням вже існуючої бази
+        if pending and not dry_run and self.fetch_one(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")[0]:
+            backup_database(conn, self.db_path)
+        return migrate(conn, dry_run=dry_run)
+    
+    def rebuild_summaries(self):
+        # Перерахунок зведених таблиць (наприклад, після ручного редагування бази)
+        with self.transaction() as conn:
+            rebuild_summaries(conn.cursor())
+            rebuild_allocation(conn.cursor())
+        self.notify('expense_summary', 'update')
+        self.notify('harvest_summary', 'update')
+        self.notify('field_allocation', 'update')
+    
+    def check_summaries(self):
+        conn = self.get_connection()
+        return {**check_summaries(conn), **check_allocation(conn)}
+    
+    def free_area(self, field_id, season_year, plan_id=None):
+        # Вільна площа поля в сезоні (без урахування плану plan_id)
+        return free_area(self, field_id, season_year, plan_id)
+    
+    def season_overview(self, season_year):
+        # [(id поля, назва, площа, розподілено, вільно, планів)]
+        return season_overview(self, season_year)
+    
+    def plan_seasons(self):
+        # Сезони, для яких є плани посівів
+        return plan_seasons(self)
+    
+    def search(self, text, limit=50):
+        # Повнотекстовий пошук: [(таблиця, id, заголовок, фрагмент)] за релевантністю
+        return search(self, text, limit)
+    
+    def rebuild_search_index(self):
+        with self.transaction() as conn:
+            rebuild_search_index(conn.cursor())
     
     def add_default_crops(self, cursor):
         default_crops = [
@@ -114,29 +215,270 @@ class Database:
             VALUES (?, ?, ?, ?, ?, ?)
             ''', default_crops)
     
+    def in_transaction(self):
+        return getattr(self._local, 'tx_depth', 0) > 0
+    
+    @contextmanager
+    def transaction(self):
+        # Вкладені транзакції об'єднуються із зовнішньою:
+        # фіксація або відкат виконується лише на верхньому рівні.
+        # Сповіщення про зміни надсилаються лише після фіксації.
+        conn = self.get_connection()
+        depth = getattr(self._local, 'tx_depth', 0)
+        self._local.tx_depth = depth + 1
+        if depth == 0:
+            self._local.pending_changes = []
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+                self._local.pending_changes = []
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+        finally:
+            self._local.tx_depth = depth
+        
+        if depth == 0:
+            changes = self._local.pending_changes
+            self._local.pending_changes = []
+            for change in changes:
+                self._dispatch(*change)
+    
+    def add_listener(self, callback):
+        # callback(table, action, row_id) викликається після кожної зміни;
+        # action - 'insert', 'update' або 'delete', row_id - None, якщо
+        # змінено довільну кількість рядків таблиці
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def notify(self, table, action, row_id=None):
+        if self.in_transaction():
+            self._local.pending_changes.append((table, action, row_id))
+        else:
+            self._dispatch(table, action, row_id)
+    
+    def _dispatch(self, table, action, row_id):
+        for callback in list(self._listeners):
+            try:
+                callback(table, action, row_id)
+            except Exception:
+                traceback.print_exc()
+    
+    def _notify_statement(self, query, params, cursor=None):
+        match = _DML_PATTERN.match(query)
+        if match is None:
+            return
+        action = match.group(1).split()[0].lower()
+        row_id = None
+        if cursor is not None:
+            if action == 'insert':
+                row_id = cursor.lastrowid
+            elif _BY_ID_PATTERN.search(query) and params:
+                row_id = params[-1]
+        self.notify(match.group(2), action, row_id)
+    
+    def set_profiler(self, profiler):
+        # Увімкнення (QueryProfiler) або вимкнення (None) профілювання запитів
+        old, self.profiler = self.profiler, profiler
+        if old is not None and old is not profiler:
+            old.close()
+    
+    def _profile(self, query, params, start, rows):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.record(self, query, params, time.perf_counter() - start, rows)
+    
     def execute_query(self, query, params=()):
+        start = time.perf_counter()
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        try:
+            cursor.execute(query, params)
+        except Exception:
+            # Помилка запису (CHECK, RAISE тригера) не повинна залишати
+            # постійне з'єднання у відкритій транзакції з блокуванням запису;
+            # у transaction() відкат виконує зовнішній рівень
+            if not self.in_transaction():
+                conn.rollback()
+            raise
+        if not self.in_transaction():
+            conn.commit()
+        self._profile(query, params, start, cursor.rowcount)
+        self._notify_statement(query, params, cursor)
         return cursor
     
+    def execute_many(self, query, seq_of_params):
+        start = time.perf_counter()
+        with self.transaction() as conn:
+            cursor = conn.executemany(query, seq_of_params)
+            self._notify_statement(query, None)
+        # Без параметрів: план пакетного запиту не будується
+        self._profile(query, None, start, cursor.rowcount)
+        return cursor.rowcount
+    
+    def insert_many(self, table, columns, rows):
+        placeholders = ', '.join('?' * len(columns))
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if isinstance(rows, (list, tuple)) and len(rows) == 1:
+            # Один рядок: сповіщення з id нового запису
+            return self.execute_query(query, rows[0]).rowcount
+        return self.execute_many(query, rows)
+    
+    def update_many(self, table, columns, rows):
+        # Кожен рядок - значення колонок, останнім елементом id запису
+        assignments = ', '.join(f"{column}=?" for column in columns)
+        query = f"UPDATE {table} SET {assignments} WHERE id=?"
+        if isinstance(rows, (list, tuple)) and len(rows) == 1:
+            return self.execute_query(query, rows[0]).rowcount
+        return self.execute_many(query, rows)
+    
+    def insert_expenses(self, rows):
+        return self.insert_many('expenses', EXPENSE_COLUMNS, rows)
+    
+    def update_expenses(self, rows):
+        return self.update_many('expenses', EXPENSE_COLUMNS, rows)
+    
+    def insert_harvests(self, rows):
+        return self.insert_many('harvest', HARVEST_COLUMNS, rows)
+    
+    def update_harvests(self, rows):
+        return self.update_many('harvest', HARVEST_COLUMNS, rows)
+    
+    def insert_plans(self, rows):
+        return self.insert_many('planting_plans', PLAN_COLUMNS, rows)
+    
+    def update_plans(self, rows):
+        return self.update_many('planting_plans', PLAN_COLUMNS, rows)
+    
     def fetch_all(self, query, params=()):
+        start = time.perf_counter()
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(query, params)
         results = cursor.fetchall()
-        conn.close()
+        cursor.close()
+        self._profile(query, params, start, len(results))
         return results
     
+    def iter_query(self, query, params=(), chunk_size=1000):
+        # Потокове читання великих вибірок: у пам'яті лише одна порція рядків.
+        # Для профайлера - час лише читання порцій, без обробки рядків споживачем
+        cursor = self.get_connection().cursor()
+        elapsed = 0.0
+        count = 0
+        try:
+            start = time.perf_counter()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+                start = time.perf_counter()
+        finally:
+            cursor.close()
+            self._profile(query, params, time.perf_counter() - elapsed, count)
+    
+    def explain(self, query, params=()):
+        # План виконання запиту (колонка detail з EXPLAIN QUERY PLAN);
+        # напряму через курсор, щоб не потрапити до профайлера
+        cursor = self.get_connection().cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            return [row[3] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    
     def fetch_one(self, query, params=()):
+        start = time.perf_counter()
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(query, params)
         result = cursor.fetchone()
-        conn.close()
+        cursor.close()
+        self._profile(query, params, start, 0 if result is None else 1)
         return result
 
+class ReferenceCache:
+    # Довідники полів і культур у пам'яті: діалоги та списки отримують
+    # назви без запитів до бази. Кеш таблиці скидається при будь-якому
+    # записі в неї (сповіщення бази) і завантажується знову при зверненні.
+    QUERIES = {
+        'fields': "SELECT id, name FROM fields ORDER BY id",
+        'crops': "SELECT id, name FROM crops ORDER BY id",
+    }
+    
+    def __init__(self, database):
+        self.database = database
+        self._data = {}
+        # Лічильник скидань: дані, прочитані до скидання, не зберігаються
+        self._generation = 0
+        self._lock = threading.Lock()
+        database.add_listener(self._on_change)
+    
+    def _on_change(self, table, action, row_id):
+        if table in self.QUERIES:
+            self.invalidate(table)
+    
+    def invalidate(self, table=None):
+        with self._lock:
+            self._generation += 1
+            if table is None:
+                self._data.clear()
+            else:
+                self._data.pop(table, None)
+    
+    def _load(self, table):
+        with self._lock:
+            data = self._data.get(table)
+            generation = self._generation
+        if data is not None:
+            return data
+        
+        rows = self.database.fetch_all(self.QUERIES[table])
+        by_name = {}
+        for row_id, name in rows:
+            by_name.setdefault((name or '').strip().casefold(), row_id)
+        data = (rows, dict(rows), by_name)
+        with self._lock:
+            if generation == self._generation:
+                self._data[table] = data
+        return data
+    
+    def fields(self):
+        # [(id, назва)] у порядку id
+        return list(self._load('fields')[0])
+    
+    def crops(self):
+        return list(self._load('crops')[0])
+    
+    def field_name(self, field_id, default=None):
+        return self._load('fields')[1].get(field_id, default)
+    
+    def crop_name(self, crop_id, default=None):
+        return self._load('crops')[1].get(crop_id, default)
+    
+    def field_id(self, name):
+        # Пошук за назвою без урахування регістру та пробілів по краях
+        return self._load('fields')[2].get((name or '').strip().casefold())
+    
+    def crop_id(self, name):
+        return self._load('crops')[2].get((name or '').strip().casefold())
+
+
 # Синглтон для доступу до бази даних
-db = Database()
\ No newline at end of file
+# (шлях і профіль можна перевизначити змінними оточення, напр. для бенчмарків)
+db = Database(os.environ.get('AGROFARM_DB', 'agrofarm.db'),
+              os.environ.get('AGROFARM_DB_PROFILE', DEFAULT_STORAGE_PROFILE))
+db.set_profiler(profiler_from_env())
+
+# Спільний кеш довідників
+reference = ReferenceCache(db)
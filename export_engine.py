@@ -0,0 +1,184 @@
+import csv
+import os
+import re
+
+from database import db
+from report_engine import REPORTS
+
+# Потоковий експорт таблиць і звітів у Excel (.xlsx) або CSV.
+# Рядки читаються з курсора порціями і одразу записуються у файл:
+# openpyxl у режимі write_only не тримає аркуш у пам'яті, тож пам'ять не
+# залежить від кількості рядків. Експорт - генератор, що повертає прогрес
+# (записано, всього), тому його можна виконувати через query_runner з
+# індикатором прогресу та скасуванням.
+
+# Скільки рядків читається з курсора та записується за раз
+EXPORT_CHUNK_ROWS = 5000
+
+# Назва -> (заголовки, запит)
+EXPORTS = {
+    "Поля": (
+        ["ID", "Назва", "Площа (га)", "Тип ґрунту", "Опис", "Створено"],
+        "SELECT id, name, area, soil_type, description, created_date FROM fields ORDER BY name, id"),
+    "Культури": (
+        ["ID", "Назва", "Категорія", "Сезон посіву", "Період (днів)", "Урожайність (т/га)", "Опис"],
+        """SELECT id, name, category, sowing_season, harvest_period, average_yield, description
+           FROM crops ORDER BY name, id"""),
+    "Витрати": (
+        ["ID", "Поле", "Культура", "Тип", "Сума", "Кількість", "Од.", "Загальна вартість", "Дата", "Опис"],
+        """SELECT e.id, f.name, c.name, e.expense_type, e.amount, e.quantity, e.unit,
+                  e.total_cost, e.date, e.description
+           FROM expenses e
+           LEFT JOIN fields f ON e.field_id = f.id
+           LEFT JOIN crops c ON e.crop_id = c.id
+           ORDER BY e.date DESC, e.id DESC"""),
+    "Урожай": (
+        ["ID", "Поле", "Культура", "Урожай (т)", "Дата збору", "Якість", "Вологість (%)", "Примітки"],
+        """SELECT h.id, f.name, c.name, h.actual_yield, h.harvest_date, h.quality_rating,
+                  h.moisture_content, h.notes
+           FROM harvest h
+           LEFT JOIN fields f ON h.field_id = f.id
+           LEFT JOIN crops c ON h.crop_id = c.id
+           ORDER BY h.harvest_date DESC, h.id DESC"""),
+    "План посівів": (
+        ["ID", "Поле", "Культура", "Сезон", "Площа (га)", "Дата посіву", "Очікуваний збір", "Статус"],
+        """SELECT p.id, f.name, c.name, p.season_year, p.planned_area, p.sowing_date,
+                  p.expected_harvest_date, p.status
+           FROM planting_plans p
+           LEFT JOIN fields f ON p.field_id = f.id
+           LEFT JOIN crops c ON p.crop_id = c.id
+           ORDER BY p.season_year DESC, p.id"""),
+    "Підсумки витрат": (
+        ["Рік", "Тип", "Поле", "Культура", "Загальна вартість", "Сума", "Записів"],
+        """SELECT NULLIF(s.year, 0), s.expense_type, f.name, c.name,
+                  s.total_cost, s.total_amount, s.record_count
+           FROM expense_summary s
+           LEFT JOIN fields f ON s.field_id = f.id
+           LEFT JOIN crops c ON s.crop_id = c.id
+           ORDER BY s.year DESC, s.expense_type"""),
+    "Підсумки врожаю": (
+        ["Рік", "Поле", "Культура", "Урожай (т)", "Середня якість", "Середня вологість (%)", "Записів"],
+        """SELECT NULLIF(s.year, 0), f.name, c.name, s.total_yield,
+                  s.quality_sum / NULLIF(s.quality_count, 0),
+                  s.moisture_sum / NULLIF(s.moisture_count, 0), s.record_count
+           FROM harvest_summary s
+           LEFT JOIN fields f ON s.field_id = f.id
+           LEFT JOIN crops c ON s.crop_id = c.id
+           ORDER BY s.year DESC"""),
+}
+
+FILE_FILTERS = "Excel (*.xlsx);;CSV (*.csv)"
+
+
+def safe_filename(name, default="файл"):
+    # Назва звіту чи таблиці як ім'я файлу: без символів, заборонених у
+    # Windows (напр. ":" у "Аналітика: поля")
+    return " ".join(re.sub(r'[\\/:*?"<>|]+', " ", name or "").split()).strip(".") or default
+
+
+def sheet_title(name):
+    # Excel не дозволяє []:*?/\ у назві аркуша та обмежує її 31 символом
+    return " ".join(re.sub(r"[\[\]:*?/\\]+", " ", name or "").split())[:31].strip() or "Дані"
+
+
+class CsvWriter:
+    def __init__(self, path, headers):
+        # utf-8-sig: Excel правильно відкриває кирилицю в CSV
+        self.file = open(path, "w", encoding="utf-8-sig", newline="")
+        self.writer = csv.writer(self.file, delimiter=";")
+        if headers:
+            self.writer.writerow(headers)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class XlsxWriter:
+    def __init__(self, path, headers, title="Дані"):
+        from openpyxl import Workbook
+
+        self.path = path
+        # write_only: рядки одразу скидаються у тимчасовий файл
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_title(title))
+        if headers:
+            self.sheet.append(headers)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+    def abort(self):
+        # Незбережена книга не створює файл; тимчасові дані аркуша
+        # видаляє openpyxl
+        self.workbook = None
+
+
+def open_writer(path, headers, title="Дані"):
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return CsvWriter(path, headers)
+    return XlsxWriter(path, headers, title)
+
+
+def _export(rows, path, headers, title, total=None, chunk_size=EXPORT_CHUNK_ROWS):
+    # Запис у тимчасовий файл, який перейменовується лише після успішного
+    # завершення: скасований чи перерваний експорт не залишає пошкоджений файл
+    part_path = f"{path}.part{os.path.splitext(path)[1]}"
+    writer = open_writer(part_path, headers, title)
+    written = 0
+    done = False
+    try:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_rows(chunk)
+                written += len(chunk)
+                chunk = []
+                yield written, total
+        writer.write_rows(chunk)
+        written += len(chunk)
+        writer.close()
+        os.replace(part_path, path)
+        done = True
+        yield written, total
+    finally:
+        if not done:
+            writer.abort()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+
+def export_query(query, path, headers=None, params=(), title="Дані",
+                 chunk_size=EXPORT_CHUNK_ROWS):
+    total = db.fetch_one(f"SELECT COUNT(*) FROM ({query})", params)[0]
+    rows = db.iter_query(query, params, chunk_size)
+    return _export(rows, path, headers, title, total, chunk_size)
+
+
+def export_table(name, path, chunk_size=EXPORT_CHUNK_ROWS):
+    headers, query = EXPORTS[name]
+    return export_query(query, path, headers, title=name, chunk_size=chunk_size)
+
+
+def export_report(name, path, chunk_size=EXPORT_CHUNK_ROWS):
+    # Текстовий звіт: кожен рядок звіту - окремий рядок таблиці
+    def lines():
+        tail = ""
+        for part in REPORTS[name]():
+            *complete, tail = (tail + part).split("\n")
+            for line in complete:
+                yield (line,) if line else ()
+        if tail:
+            yield (tail,)
+
+    return _export(lines(), path, None, name, chunk_size=chunk_size)
@@ -0,0 +1,324 @@
+import csv
+import os
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+
+from database import reference, EXPENSE_TYPE_NAMES
+from services import expenses, harvests
+
+# Масовий імпорт витрат і врожаю з CSV або Excel (.xlsx).
+# Файл читається потоково, рядки перевіряються за обмеженнями схеми,
+# назви полів і культур перетворюються на id через словники в пам'яті, а
+# коректні рядки записуються порціями - одна транзакція на порцію.
+# Імпорт - генератор прогресу (ImportProgress), як і експорт, тож його
+# можна виконувати через query_runner зі скасуванням. При скасуванні вже
+# записані порції залишаються в базі.
+# Відхилені рядки з причиною записуються у файл <назва>.rejected.csv.
+
+# Рядків в одній транзакції
+IMPORT_CHUNK_ROWS = 5000
+
+ImportProgress = namedtuple('ImportProgress',
+                            ['read', 'imported', 'rejected', 'elapsed', 'rejected_path'])
+
+# Типи витрат: код з CHECK-обмеження або назва, як у формі витрат
+EXPENSE_TYPES = dict(
+    [(code, code) for code in EXPENSE_TYPE_NAMES]
+    + [(name.casefold(), code) for code, name in EXPENSE_TYPE_NAMES.items()])
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S")
+
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def parse_number(value):
+    if is_empty(value):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value.strip().replace(" ", "").replace(" ", "").replace(",", "."))
+    except ValueError:
+        raise ValueError(f"не число: {value}")
+
+
+def parse_date(value):
+    if is_empty(value):
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return parse_date_text(str(value).strip())
+
+
+@lru_cache(maxsize=4096)
+def parse_date_text(text):
+    # Дати в імпорті здебільшого повторюються, тож розбір кешується;
+    # ISO-формат розбирається без повільного strptime
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"невідома дата: {text}")
+
+
+def parse_text(value):
+    return "" if is_empty(value) else str(value).strip()
+
+
+def parse_expense_type(value):
+    expense_type = EXPENSE_TYPES.get(parse_text(value).casefold())
+    if expense_type is None:
+        raise ValueError(f"невідомий тип витрат: {value}")
+    return expense_type
+
+
+def parse_quality(value):
+    quality = parse_number(value)
+    if quality is None:
+        return None
+    if quality != int(quality) or not 1 <= quality <= 5:
+        raise ValueError(f"якість має бути цілим числом від 1 до 5: {value}")
+    return int(quality)
+
+
+def parse_moisture(value):
+    moisture = parse_number(value)
+    if moisture is not None and not 0 <= moisture <= 100:
+        raise ValueError(f"вологість поза межами 0-100%: {value}")
+    return moisture
+
+
+def non_negative(parser):
+    def parse(value):
+        number = parser(value)
+        if number is not None and number < 0:
+            raise ValueError(f"від'ємне значення: {value}")
+        return number
+    return parse
+
+
+class NameLookup:
+    # Назва (без урахування регістру) або id -> id запису через кеш
+    # довідників; результати для значень з файлу запам'ятовуються
+    def __init__(self, table, label):
+        self.label = label
+        rows = reference.fields() if table == "fields" else reference.crops()
+        self.ids = {row[0] for row in rows}
+        self.find = reference.field_id if table == "fields" else reference.crop_id
+        self.cache = {}
+
+    def __call__(self, value):
+        row_id = self.cache.get(value)
+        if row_id is None:
+            row_id = self.cache[value] = self.resolve(value)
+        return row_id
+
+    def resolve(self, value):
+        if is_empty(value):
+            return None
+        if isinstance(value, (int, float)) and value in self.ids:
+            return int(value)
+        text = parse_text(value)
+        row_id = self.find(text)
+        if row_id is None and text.isdigit() and int(text) in self.ids:
+            row_id = int(text)
+        if row_id is None:
+            raise ValueError(f"{self.label} не знайдено: {value}")
+        return row_id
+
+
+# Колонка бази -> (назви колонок у файлі, обов'язкова)
+# Назви збігаються із заголовками експорту (export_engine) та формами
+EXPENSE_IMPORT_COLUMNS = {
+    "field_id": (("поле", "field", "field_id"), False),
+    "crop_id": (("культура", "crop", "crop_id"), False),
+    "expense_type": (("тип", "тип витрат", "expense_type", "type"), True),
+    "amount": (("сума", "сума (грн)", "ціна", "amount"), True),
+    "quantity": (("кількість", "quantity"), False),
+    "unit": (("од.", "одиниця", "unit"), False),
+    "total_cost": (("загальна вартість", "total_cost"), False),
+    "date": (("дата", "date"), True),
+    "description": (("опис", "description"), False),
+}
+
+HARVEST_IMPORT_COLUMNS = {
+    "field_id": (("поле", "field", "field_id"), True),
+    "crop_id": (("культура", "crop", "crop_id"), True),
+    "actual_yield": (("урожай (т)", "урожай", "фактичний врожай", "actual_yield", "yield"), True),
+    "harvest_date": (("дата збору", "дата", "harvest_date", "date"), True),
+    "quality_rating": (("якість", "якість (1-5)", "quality_rating", "quality"), False),
+    "moisture_content": (("вологість (%)", "вологість", "moisture_content", "moisture"), False),
+    "notes": (("примітки", "notes"), False),
+}
+
+
+def expense_parsers():
+    return {
+        "field_id": NameLookup("fields", "Поле"),
+        "crop_id": NameLookup("crops", "Культуру"),
+        "expense_type": parse_expense_type,
+        "amount": non_negative(parse_number),
+        "quantity": non_negative(parse_number),
+        "unit": parse_text,
+        "total_cost": non_negative(parse_number),
+        "date": parse_date,
+        "description": parse_text,
+    }
+
+
+def harvest_parsers():
+    return {
+        "field_id": NameLookup("fields", "Поле"),
+        "crop_id": NameLookup("crops", "Культуру"),
+        "actual_yield": non_negative(parse_number),
+        "harvest_date": parse_date,
+        "quality_rating": parse_quality,
+        "moisture_content": parse_moisture,
+        "notes": parse_text,
+    }
+
+
+def complete_expense(values):
+    # Як у формі: кількість за замовчуванням 1, вартість = сума x кількість
+    if values["quantity"] is None:
+        values["quantity"] = 1.0
+    if values["total_cost"] is None:
+        values["total_cost"] = values["amount"] * values["quantity"]
+    return values
+
+
+# Назва -> (колонки, фабрика парсерів, доповнення рядка, запис порції)
+IMPORTS = {
+    "Витрати": (EXPENSE_IMPORT_COLUMNS, expense_parsers, complete_expense, expenses.add_rows),
+    "Урожай": (HARVEST_IMPORT_COLUMNS, harvest_parsers, None, harvests.add_rows),
+}
+
+FILE_FILTERS = "Таблиці (*.csv *.xlsx);;CSV (*.csv);;Excel (*.xlsx)"
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def read_xlsx(path):
+    from openpyxl import load_workbook
+
+    # read_only: рядки читаються з файлу по одному, без завантаження аркуша
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        return read_xlsx(path)
+    return read_csv(path)
+
+
+def map_columns(header, columns):
+    # Колонка бази -> номер колонки у файлі
+    names = [parse_text(name).casefold() for name in header]
+    positions = {}
+    for column, (aliases, required) in columns.items():
+        for alias in aliases:
+            if alias in names:
+                positions[column] = names.index(alias)
+                break
+        else:
+            if required:
+                raise ValueError(f"У файлі немає колонки «{aliases[0]}»")
+    return positions
+
+
+def rejected_path_for(path):
+    return f"{os.path.splitext(path)[0]}.rejected.csv"
+
+
+def import_file(name, path, chunk_size=IMPORT_CHUNK_ROWS):
+    columns, make_parsers, complete, insert = IMPORTS[name]
+    rows = read_rows(path)
+    # Номери рядків як у файлі: заголовок - перший непорожній рядок, перед
+    # ним можуть бути порожні
+    numbered = enumerate(rows, start=1)
+    header = next((row for _, row in numbered if any(row)), None)
+    if header is None:
+        raise ValueError("Файл порожній")
+    positions = map_columns(header, columns)
+    parsers = make_parsers()
+    order = list(columns)
+    # (колонка, номер у файлі, обов'язкова, назва для повідомлення, парсер)
+    layout = [(column, positions.get(column), required, aliases[0], parsers[column])
+              for column, (aliases, required) in columns.items()]
+
+    started = time.perf_counter()
+    rejected_path = rejected_path_for(path)
+    rejected_file = None
+    rejected_writer = None
+    read = imported = rejected = 0
+    chunk = []
+
+    def progress():
+        return ImportProgress(read, imported, rejected, time.perf_counter() - started,
+                              rejected_path if rejected else None)
+
+    try:
+        # numbered продовжує нумерацію з рядка після заголовка
+        for line, row in numbered:
+            if not any(row):
+                continue
+            read += 1
+            try:
+                values = {}
+                for column, position, required, label, parse in layout:
+                    raw = row[position] if position is not None and position < len(row) else None
+                    if required and is_empty(raw):
+                        raise ValueError(f"не заповнено «{label}»")
+                    values[column] = parse(raw)
+                if complete is not None:
+                    values = complete(values)
+            except ValueError as e:
+                rejected += 1
+                if rejected_writer is None:
+                    rejected_file = open(rejected_path, "w", encoding="utf-8-sig", newline="")
+                    rejected_writer = csv.writer(rejected_file, delimiter=";")
+                    rejected_writer.writerow(["Рядок", "Причина"] + list(header))
+                rejected_writer.writerow([line, str(e)] + list(row))
+                continue
+
+            chunk.append(tuple(values[column] for column in order))
+            if len(chunk) >= chunk_size:
+                insert(chunk)
+                imported += len(chunk)
+                chunk = []
+                yield progress()
+
+        if chunk:
+            insert(chunk)
+            imported += len(chunk)
+        yield progress()
+    finally:
+        if rejected_file is not None:
+            rejected_file.close()
+        close = getattr(rows, "close", None)
+        if close is not None:
+            close()
@@ -1,9 +1,9 @@
 import sys
 import os
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QSplashScreen
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap
-from ui.main_window import MainWindow
 
 def main():
     app = QApplication(sys.argv)
@@ -13,23 +13,54 @@ def main():
     splash_pix.fill(Qt.GlobalColor.green)
     
     splash = QSplashScreen(splash_pix)
-    splash.showMessage("Завантаження AgroFarm Manager...\n"
-                      "Ініціалізація бази даних...",
-                      Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignCenter,
-                      Qt.GlobalColor.white)
+    show_splash_message(splash, "Ініціалізація бази даних...")
     splash.show()
     
     # Оновлення сплеш-скріну
     app.processEvents()
     
+    # Імпорт головного вікна ініціалізує базу даних (міграції, з'єднання)
+    from ui.main_window import MainWindow
+    from ui.query_runner import query_runner
+    app.aboutToQuit.connect(query_runner.shutdown)
+    app.aboutToQuit.connect(shutdown_pdf_worker)
+    
+    show_splash_message(splash, "Завантаження даних...")
+    app.processEvents()
+    
     # Створення головного вікна
     window = MainWindow()
     
-    # Затримка перед показом головного вікна
-    QTimer.singleShot(1500, lambda: finish_startup(splash, window))
+    # Сплеш закривається, щойно завантажено дані першого модуля
+    when_idle(query_runner, lambda: finish_startup(splash, window))
     
     sys.exit(app.exec())
 
+def show_splash_message(splash, message):
+    splash.showMessage(f"Завантаження AgroFarm Manager...\n{message}",
+                      Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignCenter,
+                      Qt.GlobalColor.white)
+
+def when_idle(runner, callback):
+    # Виклик відкладається до циклу подій, щоб результати запитів
+    # встигли відобразитися до показу вікна
+    if not runner.is_busy():
+        QTimer.singleShot(0, callback)
+        return
+    
+    def on_busy_changed(busy):
+        if not busy:
+            runner.busy_changed.disconnect(on_busy_changed)
+            QTimer.singleShot(0, callback)
+    
+    runner.busy_changed.connect(on_busy_changed)
+
+def shutdown_pdf_worker():
+    # Процес створюється лише після першого PDF-звіту
+    pdf_engine = sys.modules.get("pdf_engine")
+    if pdf_engine is not None:
+        pdf_engine.shutdown()
+
 def finish_startup(splash, window):
     window.show()
     splash.finish(window)
@@ -41,6 +72,9 @@ def finish_startup(splash, window):
         "Для початку роботи виберіть потрібний модуль з панелі навігації.")
 
 if __name__ == "__main__":
+    # Процеси генерації PDF у зібраному .exe
+    multiprocessing.freeze_support()
+    
     # Перевірка та створення необхідних папок
     os.makedirs("exports", exist_ok=True)
     os.makedirs("reports", exist_ok=True)
@@ -0,0 +1,230 @@
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+from summaries import SUMMARY_TABLES, SUMMARY_TRIGGERS, rebuild_summaries
+from search import SEARCH_TABLE, SEARCH_TRIGGERS, rebuild_search_index
+from allocation import (ALLOCATION_TABLE, ALLOCATION_TRIGGERS, CAPACITY_UPDATE_TRIGGER,
+                        FIELD_DELETE_TRIGGER, ORPHAN_PLANS_CLEANUP, rebuild_allocation)
+
+# Міграції схеми бази даних.
+# Кожна міграція переводить базу з версії N-1 у версію N; номер останньої
+# застосованої міграції зберігається в PRAGMA user_version. Крок міграції -
+# SQL-рядок або функція, що приймає курсор (для перенесення даних).
+Migration = namedtuple('Migration', ['version', 'description', 'steps'])
+
+SCHEMA_TABLES = [
+    # Створення таблиці полів
+    '''
+    CREATE TABLE IF NOT EXISTS fields (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        area REAL NOT NULL,
+        soil_type TEXT,
+        description TEXT,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Створення таблиці культур
+    '''
+    CREATE TABLE IF NOT EXISTS crops (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category TEXT CHECK(category IN ('grain', 'legume', 'oil')),
+        sowing_season TEXT,
+        harvest_period INTEGER,
+        average_yield REAL,
+        description TEXT
+    )
+    ''',
+    # Створення таблиці плану посівів
+    '''
+    CREATE TABLE IF NOT EXISTS planting_plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        field_id INTEGER,
+        crop_id INTEGER,
+        season_year TEXT,
+        planned_area REAL,
+        sowing_date DATE,
+        expected_harvest_date DATE,
+        status TEXT DEFAULT 'planned',
+        FOREIGN KEY (field_id) REFERENCES fields (id),
+        FOREIGN KEY (crop_id) REFERENCES crops (id)
+    )
+    ''',
+    # Створення таблиці витрат
+    '''
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        field_id INTEGER,
+        crop_id INTEGER,
+        expense_type TEXT CHECK(expense_type IN ('seeds', 'fuel', 'fertilizers', 'chemicals', 'labor', 'equipment', 'other')),
+        amount REAL NOT NULL,
+        quantity REAL,
+        unit TEXT,
+        total_cost REAL,
+        date DATE,
+        description TEXT,
+        FOREIGN KEY (field_id) REFERENCES fields (id),
+        FOREIGN KEY (crop_id) REFERENCES crops (id)
+    )
+    ''',
+    # Створення таблиці врожаю
+    '''
+    CREATE TABLE IF NOT EXISTS harvest (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        field_id INTEGER,
+        crop_id INTEGER,
+        actual_yield REAL,
+        harvest_date DATE,
+        quality_rating INTEGER CHECK(quality_rating BETWEEN 1 AND 5),
+        moisture_content REAL,
+        notes TEXT,
+        FOREIGN KEY (field_id) REFERENCES fields (id),
+        FOREIGN KEY (crop_id) REFERENCES crops (id)
+    )
+    ''',
+]
+
+# Вторинні індекси для фільтрів за датою, полем, культурою та типом витрат
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_type_date ON expenses (expense_type, date)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_field_crop ON expenses (field_id, crop_id)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_crop ON expenses (crop_id)",
+    "CREATE INDEX IF NOT EXISTS idx_harvest_date ON harvest (harvest_date)",
+    "CREATE INDEX IF NOT EXISTS idx_harvest_field_crop ON harvest (field_id, crop_id)",
+    "CREATE INDEX IF NOT EXISTS idx_harvest_crop ON harvest (crop_id)",
+    "CREATE INDEX IF NOT EXISTS idx_planting_field_season ON planting_plans (field_id, season_year)",
+    "CREATE INDEX IF NOT EXISTS idx_planting_crop ON planting_plans (crop_id)",
+    "CREATE INDEX IF NOT EXISTS idx_crops_category_name ON crops (category, name)",
+]
+
+# Покриваючі індекси для статистики модулів: SUM/AVG з фільтрами за датою
+# і типом витрат рахуються без читання рядків таблиці. Індекси з міграції 1
+# залишаються для списків: їх порядок (дата, id) збігається з сортуванням.
+COVERING_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_expenses_date_cost ON expenses (date, total_cost)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_type_date_cost ON expenses (expense_type, date, total_cost)",
+    "CREATE INDEX IF NOT EXISTS idx_harvest_date_stats ON harvest (harvest_date, actual_yield, quality_rating)",
+    "ANALYZE",
+]
+
+# Список планів посівів з фільтром за сезоном, у порядку id
+PLANTING_SEASON_INDEX = "CREATE INDEX IF NOT EXISTS idx_planting_season ON planting_plans (season_year, id)"
+
+MIGRATIONS = [
+    # Бази без версії вже можуть містити таблиці, тому всі інструкції
+    # першої міграції ідемпотентні
+    Migration(1, "Початкова схема та індекси", SCHEMA_TABLES + INDEXES + ["ANALYZE"]),
+    Migration(2, "Покриваючі індекси для статистики", COVERING_INDEXES),
+    # Зведені таблиці заповнюються з наявних даних, далі їх ведуть тригери
+    Migration(3, "Зведені таблиці витрат і врожаю",
+              SUMMARY_TABLES + SUMMARY_TRIGGERS + [rebuild_summaries, "ANALYZE"]),
+    Migration(4, "Повнотекстовий пошук за описами й примітками",
+              [SEARCH_TABLE] + SEARCH_TRIGGERS + [rebuild_search_index]),
+    # Існуючі плани не перевіряються: обмеження площі діє для нових змін
+    Migration(5, "Розподіл площі полів за сезонами",
+              [ALLOCATION_TABLE, PLANTING_SEASON_INDEX] + ALLOCATION_TRIGGERS
+              + [rebuild_allocation]),
+    # Тригер з міграції 5 відхиляв будь-яку зміну плану на полі, де площа
+    # вже перевищена, навіть якщо площа плану не збільшується
+    Migration(6, "Зміни планів без збільшення площі на перерозподілених полях",
+              ["DROP TRIGGER IF EXISTS trg_planting_capacity_update", CAPACITY_UPDATE_TRIGGER]),
+    # Плани вже видалених полів видаляються (їх тригери оновлюють
+    # field_allocation), далі - разом з полем
+    Migration(7, "Видалення планів посівів разом з полем",
+              [ORPHAN_PLANS_CLEANUP, FIELD_DELETE_TRIGGER]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn, migrations=MIGRATIONS):
+    version = current_version(conn)
+    return [migration for migration in sorted(migrations, key=lambda m: m.version)
+            if migration.version > version]
+
+
+def apply_migration(conn, migration):
+    cursor = conn.cursor()
+    for step in migration.steps:
+        if callable(step):
+            step(cursor)
+        else:
+            cursor.execute(step)
+    # user_version змінюється в тій самій транзакції, що й схема
+    cursor.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+
+def backup_database(conn, db_path):
+    backup_path = f"{db_path}.v{current_version(conn)}.bak"
+    target = sqlite3.connect(backup_path)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+    return backup_path
+
+
+def migrate(conn, migrations=MIGRATIONS, dry_run=False):
+    # Кожна міграція застосовується у власній транзакції: при помилці база
+    # залишається у версії останньої успішної міграції.
+    # dry_run виконує всі міграції в одній транзакції та відкочує її -
+    # так перевіряється SQL без змін у базі.
+    pending = pending_migrations(conn, migrations)
+    if conn.in_transaction:
+        conn.commit()
+    
+    if dry_run:
+        conn.execute("BEGIN")
+        try:
+            for migration in pending:
+                apply_migration(conn, migration)
+        finally:
+            conn.rollback()
+        return pending
+    
+    for migration in pending:
+        conn.execute("BEGIN")
+        try:
+            apply_migration(conn, migration)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return pending
+
+
+def main(argv):
+    dry_run = "--dry-run" in argv
+    paths = [arg for arg in argv if not arg.startswith("--")]
+    db_path = paths[0] if paths else "agrofarm.db"
+    if not os.path.exists(db_path):
+        print(f"Базу даних не знайдено: {db_path}")
+        return 1
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        print(f"Поточна версія схеми: {current_version(conn)}")
+        pending = pending_migrations(conn)
+        if not pending:
+            print("Схема актуальна")
+            return 0
+        if not dry_run:
+            print(f"Резервна копія: {backup_database(conn, db_path)}")
+        for migration in migrate(conn, dry_run=dry_run):
+            print(f"{'[перевірка] ' if dry_run else ''}{migration.version}: {migration.description}")
+        print(f"Версія схеми після міграції: {current_version(conn)}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
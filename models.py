@@ -1,8 +1,15 @@
+import sys
 from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional
 
-@dataclass
+# Python 3.10+: slots=True - атрибути зберігаються в слотах без __dict__
+# у кожного екземпляра (менше пам'яті та швидше створення при масовому
+# читанні); на старіших версіях - звичайні dataclass
+slotted_dataclass = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+
+@slotted_dataclass
 class Field:
     id: Optional[int] = None
     name: str = ""
@@ -11,7 +18,7 @@ class Field:
     description: str = ""
     created_date: Optional[datetime] = None
 
-@dataclass
+@slotted_dataclass
 class Crop:
     id: Optional[int] = None
     name: str = ""
@@ -21,7 +28,7 @@ class Crop:
     average_yield: float = 0.0
     description: str = ""
 
-@dataclass
+@slotted_dataclass
 class PlantingPlan:
     id: Optional[int] = None
     field_id: int = 0
@@ -32,7 +39,7 @@ class PlantingPlan:
     expected_harvest_date: Optional[date] = None
     status: str = "planned"
 
-@dataclass
+@slotted_dataclass
 class Expense:
     id: Optional[int] = None
     field_id: Optional[int] = None
@@ -45,7 +52,7 @@ class Expense:
     date: Optional[date] = None
     description: str = ""
 
-@dataclass
+@slotted_dataclass
 class Harvest:
     id: Optional[int] = None
     field_id: int = 0
@@ -54,4 +61,4 @@ class Harvest:
     harvest_date: Optional[date] = None
     quality_rating: int = 3
     moisture_content: float = 0.0
-    notes: str = ""
\ No newline at end of file
+    notes: str = ""
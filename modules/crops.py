@@ -1,10 +1,13 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QMessageBox, 
+                             QTableView, QAbstractItemView, QMessageBox, 
                              QDialog, QFormLayout, QLineEdit, QComboBox, 
                              QTextEdit, QHeaderView, QLabel, QSpinBox)
-from PyQt6.QtCore import Qt
-from database import db
+from database import CROP_CATEGORY_NAMES
 from models import Crop
+from queries import crops_query
+from services import crops
+from ui.table_model import LazyTableModel, selected_row_id
+from ui.change_notifier import change_notifier
 
 class CropDialog(QDialog):
     def __init__(self, crop=None, parent=None):
@@ -86,30 +89,16 @@ class CropDialog(QDialog):
             QMessageBox.warning(self, "Помилка", "Введіть коректну врожайність")
             return
         
-        category_map = {"grain": "Зернові", "legume": "Бобові", "oil": "Олійні"}
-        
+        crop = Crop(id=self.crop.id if self.crop else None, name=name,
+                    category=self.category_combo.currentText(),
+                    sowing_season=self.season_combo.currentText(),
+                    harvest_period=self.harvest_period_spin.value(),
+                    average_yield=avg_yield,
+                    description=self.description_input.toPlainText())
         if self.crop:
-            db.execute_query(
-                """UPDATE crops SET name=?, category=?, sowing_season=?, 
-                   harvest_period=?, average_yield=?, description=? WHERE id=?""",
-                (name, self.category_combo.currentText(), 
-                 self.season_combo.currentText(),
-                 self.harvest_period_spin.value(),
-                 avg_yield,
-                 self.description_input.toPlainText(),
-                 self.crop.id)
-            )
+            crops.update(crop)
         else:
-            db.execute_query(
-                """INSERT INTO crops (name, category, sowing_season, 
-                   harvest_period, average_yield, description) 
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (name, self.category_combo.currentText(), 
-                 self.season_combo.currentText(),
-                 self.harvest_period_spin.value(),
-                 avg_yield,
-                 self.description_input.toPlainText())
-            )
+            crops.add(crop)
         
         self.accept()
 
@@ -118,6 +107,7 @@ class CropsModule(QWidget):
         super().__init__()
         self.init_ui()
         self.load_crops()
+        change_notifier.changed.connect(self.on_data_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -153,11 +143,17 @@ class CropsModule(QWidget):
         layout.addLayout(button_layout)
         
         # Таблиця культур
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["ID", "Назва", "Категорія", "Сезон", "Період (міс)", "Урожайність", "Опис"])
+        self.model = LazyTableModel(
+            ["ID", "Назва", "Категорія", "Сезон", "Період (міс)", "Урожайність", "Опис"],
+            {
+                2: lambda value: CROP_CATEGORY_NAMES.get(value, value),
+                6: lambda value: value if value else "",
+            },
+            sort_key=lambda row: (row[1] or "", row[0]))
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         
         layout.addWidget(self.table)
         
@@ -165,69 +161,32 @@ class CropsModule(QWidget):
     
     def load_crops(self):
         filter_text = self.filter_combo.currentText()
-        category_filter = {
-            "Всі": "",
-            "Зернові": "WHERE category='grain'",
-            "Бобові": "WHERE category='legume'",
-            "Олійні": "WHERE category='oil'"
-        }
-        
-        where_clause = category_filter[filter_text]
-        query = f"SELECT * FROM crops {where_clause} ORDER BY name"
-        
-        crops = db.fetch_all(query)
-        self.table.setRowCount(len(crops))
-        
-        category_names = {"grain": "Зернові", "legume": "Бобові", "oil": "Олійні"}
-        
-        for row_idx, crop in enumerate(crops):
-            category_name = category_names.get(crop[2], crop[2])
-            
-            for col_idx in range(7):
-                if col_idx == 2:  # Категорія
-                    value = category_name
-                elif col_idx == 6:  # Опис
-                    value = crop[6] if crop[6] else ""
-                else:
-                    value = str(crop[col_idx]) if crop[col_idx] else ""
-                
-                item = QTableWidgetItem(value)
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
+        category = {name: code for code, name in CROP_CATEGORY_NAMES.items()}.get(filter_text)
+        query, params, row_query = crops_query(category)
+        self.model.set_query(query, params, row_query)
+    
+    def on_data_changed(self, table, action, row_id):
+        if table == "crops":
+            self.model.apply_change(action, row_id)
     
     def add_crop(self):
         dialog = CropDialog()
-        if dialog.exec():
-            self.load_crops()
+        dialog.exec()
     
     def edit_crop(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        crop_id = selected_row_id(self.table)
+        if crop_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть культуру для редагування")
             return
         
-        row = selected[0].row()
-        crop_id = int(self.table.item(row, 0).text())
-        
-        crop_data = db.fetch_one("SELECT * FROM crops WHERE id = ?", (crop_id,))
-        if crop_data:
-            crop = Crop(
-                id=crop_data[0],
-                name=crop_data[1],
-                category=crop_data[2],
-                sowing_season=crop_data[3],
-                harvest_period=crop_data[4],
-                average_yield=crop_data[5],
-                description=crop_data[6]
-            )
-            
+        crop = crops.get(crop_id)
+        if crop:
             dialog = CropDialog(crop, self)
-            if dialog.exec():
-                self.load_crops()
+            dialog.exec()
     
     def delete_crop(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        crop_id = selected_row_id(self.table)
+        if crop_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть культуру для видалення")
             return
         
@@ -238,7 +197,4 @@ class CropsModule(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            row = selected[0].row()
-            crop_id = int(self.table.item(row, 0).text())
-            db.execute_query("DELETE FROM crops WHERE id = ?", (crop_id,))
-            self.load_crops()
\ No newline at end of file
+            crops.delete(crop_id)
\ No newline at end of file
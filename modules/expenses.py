@@ -1,11 +1,16 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QMessageBox, 
+                             QTableView, QAbstractItemView, QMessageBox, 
                              QDialog, QFormLayout, QLineEdit, QComboBox, 
                              QTextEdit, QHeaderView, QLabel, QDateEdit, 
                              QDoubleSpinBox, QSpinBox)
-from PyQt6.QtCore import Qt, QDate
-from database import db
+from PyQt6.QtCore import QDate
+from database import reference, EXPENSE_TYPE_NAMES
 from models import Expense
+from queries import expenses_query, expenses_row_query
+from services import expenses
+from ui.table_model import LazyTableModel, selected_row_id
+from ui.query_runner import query_runner
+from ui.change_notifier import change_notifier
 
 class ExpenseDialog(QDialog):
     def __init__(self, expense=None, parent=None):
@@ -19,9 +24,9 @@ class ExpenseDialog(QDialog):
         
         layout = QFormLayout()
         
-        # Отримання списків полів і культур
-        fields = db.fetch_all("SELECT id, name FROM fields")
-        crops = db.fetch_all("SELECT id, name FROM crops")
+        # Списки полів і культур з кешу довідників
+        fields = reference.fields()
+        crops = reference.crops()
         
         self.field_combo = QComboBox()
         self.field_combo.addItem("-- Не обрано --", None)
@@ -48,17 +53,7 @@ class ExpenseDialog(QDialog):
         layout.addRow("Культура:", self.crop_combo)
         
         self.type_combo = QComboBox()
-        expense_types = [
-            ("Насіння", "seeds"),
-            ("Паливо", "fuel"),
-            ("Добрива", "fertilizers"),
-            ("Хімікати", "chemicals"),
-            ("Робоча сила", "labor"),
-            ("Техніка", "equipment"),
-            ("Інше", "other")
-        ]
-        
-        for display_name, value in expense_types:
+        for value, display_name in EXPENSE_TYPE_NAMES.items():
             self.type_combo.addItem(display_name, value)
         
         if self.expense:
@@ -132,30 +127,19 @@ class ExpenseDialog(QDialog):
         field_id = self.field_combo.currentData()
         crop_id = self.crop_combo.currentData()
         
+        expense = Expense(id=self.expense.id if self.expense else None,
+                          field_id=field_id, crop_id=crop_id,
+                          expense_type=self.type_combo.currentData(),
+                          amount=self.amount_spin.value(),
+                          quantity=self.quantity_spin.value(),
+                          unit=self.unit_input.text(), total_cost=total_cost,
+                          date=self.date_edit.date().toString("yyyy-MM-dd"),
+                          description=self.description_input.toPlainText())
+        
         if self.expense:
-            db.execute_query(
-                """UPDATE expenses SET field_id=?, crop_id=?, expense_type=?, 
-                   amount=?, quantity=?, unit=?, total_cost=?, date=?, description=? 
-                   WHERE id=?""",
-                (field_id, crop_id, self.type_combo.currentData(),
-                 self.amount_spin.value(), self.quantity_spin.value(),
-                 self.unit_input.text(), total_cost,
-                 self.date_edit.date().toString("yyyy-MM-dd"),
-                 self.description_input.toPlainText(),
-                 self.expense.id)
-            )
+            expenses.update(expense)
         else:
-            db.execute_query(
-                """INSERT INTO expenses 
-                   (field_id, crop_id, expense_type, amount, quantity, unit, 
-                    total_cost, date, description) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (field_id, crop_id, self.type_combo.currentData(),
-                 self.amount_spin.value(), self.quantity_spin.value(),
-                 self.unit_input.text(), total_cost,
-                 self.date_edit.date().toString("yyyy-MM-dd"),
-                 self.description_input.toPlainText())
-            )
+            expenses.add(expense)
         
         self.accept()
 
@@ -164,6 +148,7 @@ class ExpensesModule(QWidget):
         super().__init__()
         self.init_ui()
         self.load_expenses()
+        change_notifier.changed.connect(self.on_data_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -177,8 +162,7 @@ class ExpensesModule(QWidget):
         filter_layout = QHBoxLayout()
         
         self.filter_type_combo = QComboBox()
-        self.filter_type_combo.addItems(["Всі типи", "Насіння", "Паливо", "Добрива", 
-                                         "Хімікати", "Робоча сила", "Техніка", "Інше"])
+        self.filter_type_combo.addItems(["Всі типи"] + list(EXPENSE_TYPE_NAMES.values()))
         self.filter_type_combo.currentTextChanged.connect(self.load_expenses)
         
         self.year_combo = QComboBox()
@@ -212,12 +196,25 @@ class ExpensesModule(QWidget):
         
         layout.addLayout(button_layout)
         
-        # Таблиця витрат
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["ID", "Поле", "Культура", "Тип", "Сума", "Кількість", "Загальна вартість", "Дата"])
+        # Таблиця витрат (назви полів і культур - з кешу довідників за id)
+        money = lambda value: f"{value:.2f}" if value else "0.00"
+        self.model = LazyTableModel(
+            ["ID", "Поле", "Культура", "Тип", "Сума", "Кількість", "Загальна вартість", "Дата"],
+            {
+                0: str,
+                1: lambda value: reference.field_name(value) or "--",
+                2: lambda value: reference.crop_name(value) or "--",
+                3: lambda value: EXPENSE_TYPE_NAMES.get(value, value),
+                4: money,
+                5: money,
+                6: lambda value: money(value) + " ₴",
+                7: lambda value: value if value else "",
+            },
+            sort_key=lambda row: (row[7] or "", row[0]), descending=True)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         
         layout.addWidget(self.table)
         
@@ -228,111 +225,59 @@ class ExpensesModule(QWidget):
         
         self.setLayout(layout)
     
-    def load_expenses(self):
+    def current_filters(self):
         filter_type = self.filter_type_combo.currentText()
         year = self.year_combo.currentText()
         
-        query = """SELECT e.id, f.name, c.name, e.expense_type, 
-                   e.amount, e.quantity, e.total_cost, e.date 
-                   FROM expenses e
-                   LEFT JOIN fields f ON e.field_id = f.id
-                   LEFT JOIN crops c ON e.crop_id = c.id
-                   WHERE 1=1"""
-        
-        params = []
-        
+        expense_type = None
         if filter_type != "Всі типи":
-            type_map = {
-                "Насіння": "seeds",
-                "Паливо": "fuel",
-                "Добрива": "fertilizers",
-                "Хімікати": "chemicals",
-                "Робоча сила": "labor",
-                "Техніка": "equipment",
-                "Інше": "other"
-            }
-            query += " AND e.expense_type = ?"
-            params.append(type_map.get(filter_type, filter_type))
-        
-        if year != "Всі роки":
-            query += " AND strftime('%Y', e.date) = ?"
-            params.append(year)
-        
-        query += " ORDER BY e.date DESC"
-        
-        expenses = db.fetch_all(query, tuple(params))
-        self.table.setRowCount(len(expenses))
-        
-        total_expenses = 0
-        type_names = {
-            "seeds": "Насіння",
-            "fuel": "Паливо",
-            "fertilizers": "Добрива",
-            "chemicals": "Хімікати",
-            "labor": "Робоча сила",
-            "equipment": "Техніка",
-            "other": "Інше"
-        }
-        
-        for row_idx, expense in enumerate(expenses):
-            total_expenses += expense[6] if expense[6] else 0
-            
-            for col_idx in range(8):
-                if col_idx == 0:  # ID
-                    value = str(expense[0])
-                elif col_idx == 3:  # Тип витрат
-                    value = type_names.get(expense[3], expense[3])
-                elif col_idx in [4, 5, 6]:  # Суми
-                    value = f"{expense[col_idx]:.2f}" if expense[col_idx] else "0.00"
-                    if col_idx == 6:  # Загальна вартість
-                        value += " ₴"
-                elif col_idx == 7:  # Дата
-                    value = expense[7] if expense[7] else ""
-                else:  # Назви полів та культур
-                    value = expense[col_idx] if expense[col_idx] else "--"
-                
-                item = QTableWidgetItem(value)
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
-        
-        self.stats_label.setText(f"Загальна сума витрат: {total_expenses:.2f} ₴ | Кількість записів: {len(expenses)}")
+            type_map = {name: code for code, name in EXPENSE_TYPE_NAMES.items()}
+            expense_type = type_map.get(filter_type, filter_type)
+        
+        return expense_type, year if year != "Всі роки" else None
+    
+    def load_expenses(self):
+        filters = self.current_filters()
+        query, params = expenses_query(*filters)
+        self.model.set_query(query, params, expenses_row_query(*filters))
+        self.load_stats()
+    
+    def load_stats(self):
+        filters = self.current_filters()
+        self.stats_label.setText("Завантаження...")
+        query_runner.submit(lambda: expenses.stats(*filters),
+                            self.show_stats, key=(self, "stats"))
+    
+    def on_data_changed(self, table, action, row_id):
+        if table == "expenses":
+            self.model.apply_change(action, row_id)
+            self.load_stats()
+        elif table in ("fields", "crops"):
+            # Змінилися назви полів або культур: лише перемалювати рядки
+            self.model.redraw()
+    
+    def show_stats(self, stats):
+        total_expenses, count = stats
+        self.stats_label.setText(f"Загальна сума витрат: {total_expenses:.2f} ₴ | Кількість записів: {count}")
     
     def add_expense(self):
         dialog = ExpenseDialog()
-        if dialog.exec():
-            self.load_expenses()
+        dialog.exec()
     
     def edit_expense(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        expense_id = selected_row_id(self.table)
+        if expense_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть запис для редагування")
             return
         
-        row = selected[0].row()
-        expense_id = int(self.table.item(row, 0).text())
-        
-        expense_data = db.fetch_one("SELECT * FROM expenses WHERE id = ?", (expense_id,))
-        if expense_data:
-            expense = Expense(
-                id=expense_data[0],
-                field_id=expense_data[1],
-                crop_id=expense_data[2],
-                expense_type=expense_data[3],
-                amount=expense_data[4],
-                quantity=expense_data[5],
-                unit=expense_data[6],
-                total_cost=expense_data[7],
-                date=expense_data[8],
-                description=expense_data[9]
-            )
-            
+        expense = expenses.get(expense_id)
+        if expense:
             dialog = ExpenseDialog(expense, self)
-            if dialog.exec():
-                self.load_expenses()
+            dialog.exec()
     
     def delete_expense(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        expense_id = selected_row_id(self.table)
+        if expense_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть запис для видалення")
             return
         
@@ -343,7 +288,4 @@ class ExpensesModule(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            row = selected[0].row()
-            expense_id = int(self.table.item(row, 0).text())
-            db.execute_query("DELETE FROM expenses WHERE id = ?", (expense_id,))
-            self.load_expenses()
\ No newline at end of file
+            expenses.delete(expense_id)
\ No newline at end of file
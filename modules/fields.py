@@ -1,10 +1,12 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QMessageBox, 
+                             QTableView, QAbstractItemView, QMessageBox, 
                              QDialog, QFormLayout, QLineEdit, QComboBox, 
                              QTextEdit, QHeaderView, QLabel)
-from PyQt6.QtCore import Qt
-from database import db
 from models import Field
+from services import fields
+from ui.table_model import LazyTableModel, selected_row_id
+from ui.query_runner import query_runner
+from ui.change_notifier import change_notifier
 
 class FieldDialog(QDialog):
     def __init__(self, field=None, parent=None):
@@ -71,20 +73,15 @@ class FieldDialog(QDialog):
             QMessageBox.warning(self, "Помилка", "Введіть коректну площу")
             return
         
+        field = Field(id=self.field.id if self.field else None, name=name, area=area,
+                      soil_type=self.soil_type_combo.currentText(),
+                      description=self.description_input.toPlainText())
         if self.field:
             # Оновлення
-            db.execute_query(
-                "UPDATE fields SET name=?, area=?, soil_type=?, description=? WHERE id=?",
-                (name, area, self.soil_type_combo.currentText(), 
-                 self.description_input.toPlainText(), self.field.id)
-            )
+            fields.update(field)
         else:
             # Додавання
-            db.execute_query(
-                "INSERT INTO fields (name, area, soil_type, description) VALUES (?, ?, ?, ?)",
-                (name, area, self.soil_type_combo.currentText(), 
-                 self.description_input.toPlainText())
-            )
+            fields.add(field)
         
         self.accept()
 
@@ -93,6 +90,7 @@ class FieldsModule(QWidget):
         super().__init__()
         self.init_ui()
         self.load_fields()
+        change_notifier.changed.connect(self.on_data_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -126,11 +124,11 @@ class FieldsModule(QWidget):
         layout.addLayout(button_layout)
         
         # Таблиця полів
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Назва", "Площа (га)", "Тип ґрунту", "Дата створення"])
+        self.model = LazyTableModel(["ID", "Назва", "Площа (га)", "Тип ґрунту", "Дата створення"])
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         
         layout.addWidget(self.table)
         
@@ -142,62 +140,49 @@ class FieldsModule(QWidget):
         self.setLayout(layout)
     
     def load_fields(self):
-        fields = db.fetch_all("SELECT * FROM fields ORDER BY id")
-        self.table.setRowCount(len(fields))
-        
-        total_area = 0
-        for row_idx, field in enumerate(fields):
-            total_area += field[2]
-            for col_idx in range(5):
-                item = QTableWidgetItem(str(field[col_idx]) if field[col_idx] else "")
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
-        
-        self.stats_label.setText(f"Загальна площа: {total_area:.2f} га | Кількість полів: {len(fields)}")
+        self.model.set_query("SELECT * FROM fields ORDER BY id", (),
+                             "SELECT * FROM fields WHERE id = ?")
+        self.load_stats()
+    
+    def load_stats(self):
+        self.stats_label.setText("Завантаження...")
+        query_runner.submit(fields.stats, self.show_stats, key=(self, "stats"))
+    
+    def on_data_changed(self, table, action, row_id):
+        if table == "fields":
+            self.model.apply_change(action, row_id)
+            self.load_stats()
+    
+    def show_stats(self, stats):
+        total_area, count = stats
+        self.stats_label.setText(f"Загальна площа: {total_area:.2f} га | Кількість полів: {count}")
     
     def add_field(self):
         dialog = FieldDialog()
-        if dialog.exec():
-            self.load_fields()
+        dialog.exec()
     
     def edit_field(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        field_id = selected_row_id(self.table)
+        if field_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть поле для редагування")
             return
         
-        row = selected[0].row()
-        field_id = int(self.table.item(row, 0).text())
-        
-        field_data = db.fetch_one("SELECT * FROM fields WHERE id = ?", (field_id,))
-        if field_data:
-            field = Field(
-                id=field_data[0],
-                name=field_data[1],
-                area=field_data[2],
-                soil_type=field_data[3],
-                description=field_data[4],
-                created_date=field_data[5]
-            )
-            
+        field = fields.get(field_id)
+        if field:
             dialog = FieldDialog(field, self)
-            if dialog.exec():
-                self.load_fields()
+            dialog.exec()
     
     def delete_field(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        field_id = selected_row_id(self.table)
+        if field_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть поле для видалення")
             return
         
         reply = QMessageBox.question(
             self, "Підтвердження",
-            "Видалити обране поле?",
+            "Видалити обране поле разом з його планами посівів?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            row = selected[0].row()
-            field_id = int(self.table.item(row, 0).text())
-            db.execute_query("DELETE FROM fields WHERE id = ?", (field_id,))
-            self.load_fields()
\ No newline at end of file
+            fields.delete(field_id)
\ No newline at end of file
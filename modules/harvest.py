@@ -1,11 +1,16 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QMessageBox, 
+                             QTableView, QAbstractItemView, QMessageBox, 
                              QDialog, QFormLayout, QLineEdit, QComboBox, 
                              QTextEdit, QHeaderView, QLabel, QDateEdit, 
                              QDoubleSpinBox, QSpinBox)
-from PyQt6.QtCore import Qt, QDate
-from database import db
+from PyQt6.QtCore import QDate
+from database import reference
 from models import Harvest
+from queries import harvests_query, harvests_row_query
+from services import harvests
+from ui.table_model import LazyTableModel, selected_row_id
+from ui.query_runner import query_runner
+from ui.change_notifier import change_notifier
 
 class HarvestDialog(QDialog):
     def __init__(self, harvest=None, parent=None):
@@ -19,9 +24,9 @@ class HarvestDialog(QDialog):
         
         layout = QFormLayout()
         
-        # Отримання списків полів і культур
-        fields = db.fetch_all("SELECT id, name FROM fields")
-        crops = db.fetch_all("SELECT id, name FROM crops")
+        # Списки полів і культур з кешу довідників
+        fields = reference.fields()
+        crops = reference.crops()
         
         self.field_combo = QComboBox()
         for field in fields:
@@ -95,34 +100,19 @@ class HarvestDialog(QDialog):
         self.setLayout(layout)
     
     def save_harvest(self):
+        harvest = Harvest(id=self.harvest.id if self.harvest else None,
+                          field_id=self.field_combo.currentData(),
+                          crop_id=self.crop_combo.currentData(),
+                          actual_yield=self.yield_input.value(),
+                          harvest_date=self.date_edit.date().toString("yyyy-MM-dd"),
+                          quality_rating=self.quality_spin.value(),
+                          moisture_content=self.moisture_input.value(),
+                          notes=self.notes_input.toPlainText())
+        
         if self.harvest:
-            db.execute_query(
-                """UPDATE harvest SET field_id=?, crop_id=?, actual_yield=?, 
-                   harvest_date=?, quality_rating=?, moisture_content=?, notes=? 
-                   WHERE id=?""",
-                (self.field_combo.currentData(),
-                 self.crop_combo.currentData(),
-                 self.yield_input.value(),
-                 self.date_edit.date().toString("yyyy-MM-dd"),
-                 self.quality_spin.value(),
-                 self.moisture_input.value(),
-                 self.notes_input.toPlainText(),
-                 self.harvest.id)
-            )
+            harvests.update(harvest)
         else:
-            db.execute_query(
-                """INSERT INTO harvest 
-                   (field_id, crop_id, actual_yield, harvest_date, 
-                    quality_rating, moisture_content, notes) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (self.field_combo.currentData(),
-                 self.crop_combo.currentData(),
-                 self.yield_input.value(),
-                 self.date_edit.date().toString("yyyy-MM-dd"),
-                 self.quality_spin.value(),
-                 self.moisture_input.value(),
-                 self.notes_input.toPlainText())
-            )
+            harvests.add(harvest)
         
         self.accept()
 
@@ -131,6 +121,7 @@ class HarvestModule(QWidget):
         super().__init__()
         self.init_ui()
         self.load_harvests()
+        change_notifier.changed.connect(self.on_data_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -173,11 +164,24 @@ class HarvestModule(QWidget):
         layout.addLayout(button_layout)
         
         # Таблиця врожаю
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["ID", "Поле", "Культура", "Урожай (т)", "Дата", "Якість", "Вологість", "Примітки"])
+        text_or_empty = lambda value: value if value else ""
+        self.model = LazyTableModel(
+            ["ID", "Поле", "Культура", "Урожай (т)", "Дата", "Якість", "Вологість", "Примітки"],
+            {
+                0: str,
+                1: lambda value: reference.field_name(value) or "--",
+                2: lambda value: reference.crop_name(value) or "--",
+                3: lambda value: f"{value:.2f} т" if value else "0.00 т",
+                4: text_or_empty,
+                5: lambda value: f"{'★' * value} ({value})" if value else "",
+                6: lambda value: f"{value:.1f}%" if value else "",
+                7: text_or_empty,
+            },
+            sort_key=lambda row: (row[4] or "", row[0]), descending=True)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         
         layout.addWidget(self.table)
         
@@ -188,95 +192,51 @@ class HarvestModule(QWidget):
         
         self.setLayout(layout)
     
-    def load_harvests(self):
+    def current_year(self):
         year = self.year_combo.currentText()
-        
-        query = """SELECT h.id, f.name, c.name, h.actual_yield, 
-                   h.harvest_date, h.quality_rating, 
-                   h.moisture_content, h.notes 
-                   FROM harvest h
-                   LEFT JOIN fields f ON h.field_id = f.id
-                   LEFT JOIN crops c ON h.crop_id = c.id
-                   WHERE 1=1"""
-        
-        params = []
-        
-        if year != "Всі роки":
-            query += " AND strftime('%Y', h.harvest_date) = ?"
-            params.append(year)
-        
-        query += " ORDER BY h.harvest_date DESC"
-        
-        harvests = db.fetch_all(query, tuple(params))
-        self.table.setRowCount(len(harvests))
-        
-        total_yield = 0
-        avg_quality = 0
-        
-        for row_idx, harvest in enumerate(harvests):
-            total_yield += harvest[3] if harvest[3] else 0
-            avg_quality += harvest[5] if harvest[5] else 0
-            
-            for col_idx in range(8):
-                if col_idx == 0:  # ID
-                    value = str(harvest[0])
-                elif col_idx == 3:  # Урожай
-                    value = f"{harvest[3]:.2f} т" if harvest[3] else "0.00 т"
-                elif col_idx == 4:  # Дата
-                    value = harvest[4] if harvest[4] else ""
-                elif col_idx == 5:  # Якість
-                    stars = "★" * (harvest[5] if harvest[5] else 0)
-                    value = f"{stars} ({harvest[5]})" if harvest[5] else ""
-                elif col_idx == 6:  # Вологість
-                    value = f"{harvest[6]:.1f}%" if harvest[6] else ""
-                elif col_idx == 7:  # Примітки
-                    value = harvest[7] if harvest[7] else ""
-                else:  # Назви полів та культур
-                    value = harvest[col_idx] if harvest[col_idx] else "--"
-                
-                item = QTableWidgetItem(value)
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
-        
-        if len(harvests) > 0:
-            avg_quality = avg_quality / len(harvests)
-        
-        self.stats_label.setText(f"Загальний врожай: {total_yield:.2f} т | Середня якість: {avg_quality:.1f}/5 | Записів: {len(harvests)}")
+        return year if year != "Всі роки" else None
+    
+    def load_harvests(self):
+        year = self.current_year()
+        query, params = harvests_query(year)
+        self.model.set_query(query, params, harvests_row_query(year))
+        self.load_stats()
+    
+    def load_stats(self):
+        year = self.current_year()
+        self.stats_label.setText("Завантаження...")
+        query_runner.submit(lambda: harvests.stats(year),
+                            self.show_stats, key=(self, "stats"))
+    
+    def on_data_changed(self, table, action, row_id):
+        if table == "harvest":
+            self.model.apply_change(action, row_id)
+            self.load_stats()
+        elif table in ("fields", "crops"):
+            self.model.redraw()
+    
+    def show_stats(self, stats):
+        total_yield, avg_quality, count = stats
+        self.stats_label.setText(f"Загальний врожай: {total_yield:.2f} т | Середня якість: {avg_quality:.1f}/5 | Записів: {count}")
     
     def add_harvest(self):
         dialog = HarvestDialog()
-        if dialog.exec():
-            self.load_harvests()
+        dialog.exec()
     
     def edit_harvest(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        harvest_id = selected_row_id(self.table)
+        if harvest_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть запис для редагування")
             return
         
-        row = selected[0].row()
-        harvest_id = int(self.table.item(row, 0).text())
-        
-        harvest_data = db.fetch_one("SELECT * FROM harvest WHERE id = ?", (harvest_id,))
-        if harvest_data:
-            harvest = Harvest(
-                id=harvest_data[0],
-                field_id=harvest_data[1],
-                crop_id=harvest_data[2],
-                actual_yield=harvest_data[3],
-                harvest_date=harvest_data[4],
-                quality_rating=harvest_data[5],
-                moisture_content=harvest_data[6],
-                notes=harvest_data[7]
-            )
-            
+        harvest = harvests.get(harvest_id)
+        if harvest:
             dialog = HarvestDialog(harvest, self)
-            if dialog.exec():
-                self.load_harvests()
+            dialog.exec()
     
     def delete_harvest(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        harvest_id = selected_row_id(self.table)
+        if harvest_id is None:
             QMessageBox.warning(self, "Помилка", "Виберіть запис для видалення")
             return
         
@@ -287,7 +247,4 @@ class HarvestModule(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            row = selected[0].row()
-            harvest_id = int(self.table.item(row, 0).text())
-            db.execute_query("DELETE FROM harvest WHERE id = ?", (harvest_id,))
-            self.load_harvests()
\ No newline at end of file
+            harvests.delete(harvest_id)
\ No newline at end of file
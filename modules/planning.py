@@ -0,0 +1,490 @@
+import sqlite3
+from datetime import date
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QTableView, QAbstractItemView, QMessageBox,
+                             QDialog, QFormLayout, QComboBox, QHeaderView,
+                             QLabel, QDateEdit, QDoubleSpinBox, QTableWidget,
+                             QTableWidgetItem, QSpinBox)
+from PyQt6.QtCore import Qt, QDate
+from database import reference, PLAN_STATUS_NAMES, CROP_CATEGORY_NAMES
+from allocation import AREA_TOLERANCE, CANCELLED_STATUS
+from analytics import DEFAULT_CATEGORY_PRICES
+from rotation import optimize_rotation, apply_rotation
+from models import PlantingPlan
+from queries import plans_query, plans_row_query
+from services import crops, plans
+from ui.table_model import LazyTableModel, selected_row_id
+from ui.query_runner import query_runner
+from ui.change_notifier import change_notifier
+
+
+def current_season():
+    year = date.today().year
+    return f"{year}-{year + 1}"
+
+
+def season_choices():
+    # Сезони навколо поточного року та всі сезони з наявними планами
+    year = date.today().year
+    seasons = {f"{y}-{y + 1}" for y in range(year - 2, year + 2)}
+    seasons.update(plans.seasons())
+    return sorted(seasons, reverse=True)
+
+
+class PlantingDialog(QDialog):
+    def __init__(self, plan=None, season=None, parent=None):
+        super().__init__(parent)
+        self.plan = plan
+        self.season = season
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Редагування плану посіву" if self.plan else "Додати план посіву")
+        self.setFixedWidth(400)
+
+        layout = QFormLayout()
+
+        # Списки полів і культур з кешу довідників, за назвою
+        field_rows = sorted(reference.fields(), key=lambda row: row[1])
+        crop_rows = sorted(reference.crops(), key=lambda row: row[1])
+
+        self.field_combo = QComboBox()
+        for field in field_rows:
+            self.field_combo.addItem(field[1], field[0])
+        if self.plan:
+            index = self.field_combo.findData(self.plan.field_id)
+            if index >= 0:
+                self.field_combo.setCurrentIndex(index)
+        layout.addRow("Поле:", self.field_combo)
+
+        self.crop_combo = QComboBox()
+        for crop in crop_rows:
+            self.crop_combo.addItem(crop[1], crop[0])
+        if self.plan:
+            index = self.crop_combo.findData(self.plan.crop_id)
+            if index >= 0:
+                self.crop_combo.setCurrentIndex(index)
+        layout.addRow("Культура:", self.crop_combo)
+
+        self.season_combo = QComboBox()
+        self.season_combo.addItems(season_choices())
+        season = self.plan.season_year if self.plan else (self.season or current_season())
+        index = self.season_combo.findText(season)
+        if index < 0:
+            self.season_combo.addItem(season)
+            index = self.season_combo.count() - 1
+        self.season_combo.setCurrentIndex(index)
+        layout.addRow("Сезон/Рік:", self.season_combo)
+
+        self.area_input = QDoubleSpinBox()
+        self.area_input.setRange(0, 100000)
+        self.area_input.setDecimals(2)
+        self.area_input.setSuffix(" га")
+        if self.plan:
+            self.area_input.setValue(self.plan.planned_area or 0)
+        layout.addRow("Площа:", self.area_input)
+
+        # Вільна площа обраного поля в обраному сезоні
+        self.free_label = QLabel()
+        self.free_label.setStyleSheet("color: #666;")
+        layout.addRow("", self.free_label)
+
+        self.sowing_date = QDateEdit()
+        self.sowing_date.setCalendarPopup(True)
+        self.sowing_date.setDate(QDate.currentDate())
+        if self.plan and self.plan.sowing_date:
+            self.sowing_date.setDate(QDate.fromString(self.plan.sowing_date, "yyyy-MM-dd"))
+        layout.addRow("Дата посіву:", self.sowing_date)
+
+        self.status_combo = QComboBox()
+        for value, display_name in PLAN_STATUS_NAMES.items():
+            self.status_combo.addItem(display_name, value)
+        if self.plan:
+            index = self.status_combo.findData(self.plan.status)
+            if index >= 0:
+                self.status_combo.setCurrentIndex(index)
+        layout.addRow("Статус:", self.status_combo)
+
+        button_layout = QHBoxLayout()
+        save_btn = QPushButton("Зберегти")
+        save_btn.clicked.connect(self.save_planning)
+        cancel_btn = QPushButton("Скасувати")
+        cancel_btn.clicked.connect(self.reject)
+
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addRow(button_layout)
+
+        self.setLayout(layout)
+
+        self.field_combo.currentIndexChanged.connect(self.update_free_area)
+        self.season_combo.currentIndexChanged.connect(self.update_free_area)
+        self.update_free_area()
+
+    def free_area(self):
+        field_id = self.field_combo.currentData()
+        if field_id is None:
+            return None
+        # Пошук за первинними ключами, тож виконується одразу в GUI-потоці
+        return plans.free_area(field_id, self.season_combo.currentText(),
+                               self.plan.id if self.plan else None)
+
+    def update_free_area(self):
+        free = self.free_area()
+        self.free_label.setText("" if free is None else f"Вільно в сезоні: {free:.2f} га")
+
+    def save_planning(self):
+        field_id = self.field_combo.currentData()
+        area = self.area_input.value()
+        status = self.status_combo.currentData()
+
+        if field_id is None:
+            QMessageBox.warning(self, "Помилка", "Виберіть поле")
+            return
+        if area <= 0:
+            QMessageBox.warning(self, "Помилка", "Введіть коректну площу")
+            return
+
+        season_year = self.season_combo.currentText()
+        # Як і тригер бази: план, що не збільшує свою площу на тому самому
+        # полі в сезоні, зберігається навіть на вже перерозподіленому полі
+        keeps_allocation = (self.plan is not None and self.plan.status != CANCELLED_STATUS
+                            and self.plan.field_id == field_id
+                            and self.plan.season_year == season_year
+                            and area <= (self.plan.planned_area or 0) + AREA_TOLERANCE)
+        free = self.free_area()
+        if (status != CANCELLED_STATUS and not keeps_allocation and free is not None
+                and area > free + AREA_TOLERANCE):
+            QMessageBox.warning(self, "Помилка",
+                                f"Площа плану перевищує вільну площу поля в сезоні: "
+                                f"вільно {max(free, 0):.2f} га")
+            return
+
+        plan = PlantingPlan(id=self.plan.id if self.plan else None,
+                            field_id=field_id,
+                            crop_id=self.crop_combo.currentData(),
+                            season_year=season_year,
+                            planned_area=area,
+                            sowing_date=self.sowing_date.date().toString("yyyy-MM-dd"),
+                            expected_harvest_date=self.plan.expected_harvest_date if self.plan else None,
+                            status=status)
+
+        try:
+            if self.plan:
+                plans.update(plan)
+            else:
+                plans.add(plan)
+        except sqlite3.IntegrityError as e:
+            # Площу могли зайняти з іншого вікна після перевірки
+            QMessageBox.warning(self, "Помилка", str(e))
+            self.update_free_area()
+            return
+
+        self.accept()
+
+class RotationDialog(QDialog):
+    # Автоматичний план сівозміни на кілька сезонів (rotation.py): ціни
+    # культур задаються у формі, розрахунок виконується у фоновому потоці,
+    # нові призначення додаються в план посівів однією транзакцією
+    RESULT_HEADERS = ["Поле", "Сезон", "Культура", "Площа (га)", "Маржа (грн)", ""]
+
+    def __init__(self, season=None, parent=None):
+        super().__init__(parent)
+        self.season = season
+        self.assignments = []
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Оптимізація сівозміни")
+        self.resize(800, 600)
+
+        layout = QVBoxLayout()
+
+        form_layout = QFormLayout()
+        self.season_combo = QComboBox()
+        self.season_combo.addItems(season_choices())
+        index = self.season_combo.findText(self.season or current_season())
+        if index >= 0:
+            self.season_combo.setCurrentIndex(index)
+        form_layout.addRow("Перший сезон:", self.season_combo)
+
+        self.count_spin = QSpinBox()
+        self.count_spin.setRange(1, 10)
+        self.count_spin.setValue(3)
+        form_layout.addRow("Сезонів:", self.count_spin)
+        layout.addLayout(form_layout)
+
+        # Ціни реалізації культур, грн/т
+        crop_list = crops.list()
+        self.prices_table = QTableWidget(len(crop_list), 3)
+        self.prices_table.setHorizontalHeaderLabels(["Культура", "Категорія", "Ціна (грн/т)"])
+        self.prices_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.prices_table.verticalHeader().setVisible(False)
+        self.price_inputs = {}
+        for row, crop in enumerate(crop_list):
+            self.prices_table.setItem(row, 0, QTableWidgetItem(crop.name))
+            self.prices_table.setItem(row, 1, QTableWidgetItem(CROP_CATEGORY_NAMES.get(crop.category, "")))
+            price_input = QDoubleSpinBox()
+            price_input.setRange(0, 1000000)
+            price_input.setDecimals(0)
+            price_input.setValue(DEFAULT_CATEGORY_PRICES.get(crop.category, 0.0))
+            self.prices_table.setCellWidget(row, 2, price_input)
+            self.price_inputs[crop.id] = price_input
+        self.prices_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.prices_table, 1)
+
+        self.calculate_btn = QPushButton("🧮 Розрахувати")
+        self.calculate_btn.clicked.connect(self.calculate)
+        layout.addWidget(self.calculate_btn)
+
+        self.result_table = QTableWidget(0, len(self.RESULT_HEADERS))
+        self.result_table.setHorizontalHeaderLabels(self.RESULT_HEADERS)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.result_table, 2)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("font-weight: bold; padding: 5px;")
+        layout.addWidget(self.summary_label)
+
+        button_layout = QHBoxLayout()
+        self.apply_btn = QPushButton("Додати в план")
+        self.apply_btn.setEnabled(False)
+        self.apply_btn.clicked.connect(self.apply)
+        close_btn = QPushButton("Закрити")
+        close_btn.clicked.connect(self.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(self.apply_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def calculate(self):
+        season = self.season_combo.currentText()
+        count = self.count_spin.value()
+        prices = {crop_id: price_input.value() for crop_id, price_input in self.price_inputs.items()}
+        self.calculate_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.summary_label.setText("Розрахунок...")
+        query_runner.submit(lambda: optimize_rotation(season, count, prices),
+                            self.show_result, self.show_error, key=(self, "rotation"))
+
+    def show_error(self, message):
+        self.calculate_btn.setEnabled(True)
+        self.summary_label.setText(f"Помилка розрахунку: {message}")
+
+    def show_result(self, result):
+        self.assignments, infeasible = result
+        self.calculate_btn.setEnabled(True)
+
+        self.result_table.setRowCount(len(self.assignments))
+        for row, assignment in enumerate(self.assignments):
+            values = [reference.field_name(assignment.field_id) or "--",
+                      assignment.season_year,
+                      reference.crop_name(assignment.crop_id) or "--",
+                      f"{assignment.area:.2f}",
+                      f"{assignment.margin:,.0f}".replace(",", " "),
+                      "вже в плані" if assignment.planned else ""]
+            for column, value in enumerate(values):
+                self.result_table.setItem(row, column, QTableWidgetItem(value))
+
+        new = [assignment for assignment in self.assignments if not assignment.planned]
+        margin = sum(assignment.margin for assignment in self.assignments)
+        text = f"Очікувана маржа: {margin:,.0f} грн | Нових планів: {len(new)}".replace(",", " ")
+        if infeasible:
+            text += f" | Полів без допустимої сівозміни: {len(infeasible)}"
+        self.summary_label.setText(text)
+        self.apply_btn.setEnabled(bool(new))
+
+    def apply(self):
+        try:
+            added = apply_rotation(self.assignments)
+        except sqlite3.IntegrityError as e:
+            # Плани змінилися після розрахунку
+            QMessageBox.warning(self, "Помилка", f"{e}. Виконайте розрахунок ще раз.")
+            return
+        QMessageBox.information(self, "Успіх", f"Додано планів посіву: {added}")
+        self.accept()
+
+class PlanningModule(QWidget):
+    OVERVIEW_HEADERS = ["Поле", "Площа (га)", "Розподілено (га)", "Вільно (га)", "Планів"]
+
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+        self.load_plans()
+        change_notifier.changed.connect(self.on_data_changed)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        # Заголовок
+        title_label = QLabel("Планування посівів")
+        title_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 10px;")
+        layout.addWidget(title_label)
+
+        # Фільтри
+        filter_layout = QHBoxLayout()
+
+        self.season_combo = QComboBox()
+        self.season_combo.addItem("Всі сезони")
+        self.season_combo.addItems(season_choices())
+        self.season_combo.currentTextChanged.connect(self.load_plans)
+
+        filter_layout.addWidget(QLabel("Сезон:"))
+        filter_layout.addWidget(self.season_combo)
+        filter_layout.addStretch()
+
+        layout.addLayout(filter_layout)
+
+        # Кнопки управління
+        button_layout = QHBoxLayout()
+
+        self.add_btn = QPushButton("➕ Додати план")
+        self.add_btn.clicked.connect(self.add_plan)
+
+        self.edit_btn = QPushButton("✏️ Редагувати")
+        self.edit_btn.clicked.connect(self.edit_plan)
+
+        self.delete_btn = QPushButton("🗑️ Видалити")
+        self.delete_btn.clicked.connect(self.delete_plan)
+
+        self.rotation_btn = QPushButton("🧮 Оптимізація сівозміни")
+        self.rotation_btn.clicked.connect(self.optimize_rotation)
+
+        button_layout.addWidget(self.add_btn)
+        button_layout.addWidget(self.edit_btn)
+        button_layout.addWidget(self.delete_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(self.rotation_btn)
+
+        layout.addLayout(button_layout)
+
+        # Таблиця планів
+        text_or_empty = lambda value: value if value else ""
+        self.model = LazyTableModel(
+            ["ID", "Поле", "Культура", "Сезон", "Площа (га)", "Дата посіву",
+             "Очікуваний збір", "Статус"],
+            {
+                0: str,
+                1: lambda value: reference.field_name(value) or "--",
+                2: lambda value: reference.crop_name(value) or "--",
+                3: text_or_empty,
+                4: lambda value: f"{value:.2f}" if value else "0.00",
+                5: text_or_empty,
+                6: text_or_empty,
+                7: lambda value: PLAN_STATUS_NAMES.get(value, value or ""),
+            },
+            sort_key=lambda row: (row[3] or "", row[0]), descending=True)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+
+        layout.addWidget(self.table, 3)
+
+        # Огляд сезону: розподілена та вільна площа по всіх полях
+        self.overview_label = QLabel()
+        self.overview_label.setStyleSheet("font-weight: bold; padding: 5px;")
+        layout.addWidget(self.overview_label)
+
+        self.overview_table = QTableWidget(0, len(self.OVERVIEW_HEADERS))
+        self.overview_table.setHorizontalHeaderLabels(self.OVERVIEW_HEADERS)
+        self.overview_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.overview_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.overview_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.overview_table, 2)
+
+        # Статистика
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("color: #666; padding: 5px; font-weight: bold;")
+        layout.addWidget(self.stats_label)
+
+        self.setLayout(layout)
+
+    def current_season(self):
+        season = self.season_combo.currentText()
+        return season if season != "Всі сезони" else None
+
+    def overview_season(self):
+        # Для "Всі сезони" - огляд поточного сезону
+        return self.current_season() or current_season()
+
+    def load_plans(self):
+        season = self.current_season()
+        query, params = plans_query(season)
+        self.model.set_query(query, params, plans_row_query(season))
+        self.load_overview()
+
+    def load_overview(self):
+        season = self.overview_season()
+        self.overview_label.setText(f"Розподіл площі в сезоні {season}")
+        self.stats_label.setText("Завантаження...")
+        query_runner.submit(lambda: plans.season_overview(season),
+                            self.show_overview, key=(self, "overview"))
+
+    def on_data_changed(self, table, action, row_id):
+        if table == "planting_plans":
+            self.model.apply_change(action, row_id)
+            self.load_overview()
+        elif table == "fields":
+            if action == "delete":
+                # Плани поля видалено тригером бази без окремих сповіщень
+                self.load_plans()
+            else:
+                self.model.redraw()
+                self.load_overview()
+        elif table == "crops":
+            self.model.redraw()
+
+    def show_overview(self, rows):
+        self.overview_table.setRowCount(len(rows))
+        for row_index, (_, name, area, allocated, free, plan_count) in enumerate(rows):
+            values = [name or "--", f"{area or 0:.2f}", f"{allocated:.2f}",
+                      f"{free or 0:.2f}", str(plan_count)]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.overview_table.setItem(row_index, column, item)
+
+        total_area = sum(row[2] or 0 for row in rows)
+        allocated = sum(row[3] for row in rows)
+        self.stats_label.setText(f"Площа полів: {total_area:.2f} га | Розподілено: {allocated:.2f} га | "
+                                 f"Вільно: {total_area - allocated:.2f} га")
+
+    def add_plan(self):
+        dialog = PlantingDialog(season=self.current_season(), parent=self)
+        dialog.exec()
+
+    def optimize_rotation(self):
+        dialog = RotationDialog(self.current_season(), self)
+        dialog.exec()
+
+    def edit_plan(self):
+        plan_id = selected_row_id(self.table)
+        if plan_id is None:
+            QMessageBox.warning(self, "Помилка", "Виберіть план для редагування")
+            return
+
+        plan = plans.get(plan_id)
+        if plan:
+            dialog = PlantingDialog(plan, parent=self)
+            dialog.exec()
+
+    def delete_plan(self):
+        plan_id = selected_row_id(self.table)
+        if plan_id is None:
+            QMessageBox.warning(self, "Помилка", "Виберіть план для видалення")
+            return
+
+        reply = QMessageBox.question(
+            self, "Підтвердження",
+            "Видалити обраний план посіву?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+
+        if reply == QMessageBox.StandardButton.Yes:
+            plans.delete(plan_id)
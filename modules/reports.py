@@ -1,8 +1,16 @@
+import os
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from database import db
+from PyQt6.QtGui import QTextCursor
+from report_engine import REPORTS, stream_report, write_report
+from export_engine import export_report, safe_filename
+from ui.query_runner import query_runner
+from ui.export_progress import start_export
 
 class ReportsModule(QWidget):
+    # Скільки символів звіту показувати у вікні; повний звіт - через збереження у файл
+    MAX_VIEW_CHARS = 2 * 1024 * 1024
+    
     def __init__(self):
         super().__init__()
         self.init_ui()
@@ -14,17 +22,33 @@ class ReportsModule(QWidget):
         title_label.setStyleSheet("font-size: 16px; font-weight: bold;")
         layout.addWidget(title_label)
         
+        controls_layout = QHBoxLayout()
+        
         self.report_combo = QComboBox()
-        self.report_combo.addItems([
-            "Поля",
-            "Культури",
-            "Витрати",
-            "Урожай"
-        ])
+        self.report_combo.addItems(list(REPORTS))
         self.report_combo.currentTextChanged.connect(self.show_report)
-        layout.addWidget(self.report_combo)
+        controls_layout.addWidget(self.report_combo)
+        
+        self.save_btn = QPushButton("💾 Зберегти у файл")
+        self.save_btn.clicked.connect(self.save_report)
+        controls_layout.addWidget(self.save_btn)
+        
+        self.export_btn = QPushButton("📊 Експорт в Excel")
+        self.export_btn.clicked.connect(self.export_report)
+        controls_layout.addWidget(self.export_btn)
         
-        self.text_edit = QTextEdit()
+        self.pdf_btn = QPushButton("📄 PDF")
+        self.pdf_btn.clicked.connect(self.save_pdf)
+        controls_layout.addWidget(self.pdf_btn)
+        
+        self.fields_pdf_btn = QPushButton("📄 PDF по всіх полях")
+        self.fields_pdf_btn.clicked.connect(self.save_field_pdfs)
+        controls_layout.addWidget(self.fields_pdf_btn)
+        
+        layout.addLayout(controls_layout)
+        
+        # QPlainTextEdit розрахований на великі обсяги тексту
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setReadOnly(True)
         layout.addWidget(self.text_edit)
         
@@ -43,84 +67,98 @@ class ReportsModule(QWidget):
             self.show_expenses()
         elif report_type == "Урожай":
             self.show_harvest()
+        else:
+            self.load_report(report_type)
+    
+    def load_report(self, name):
+        # Звіт генерується у фоновому потоці й додається у вікно фрагментами
+        self.text_edit.clear()
+        self._shown_chars = 0
+        self._last_chunk = None
+        query_runner.submit(lambda: stream_report(name), self.finish_report,
+                            key=self, on_chunk=self.append_chunk)
+    
+    def append_chunk(self, chunk):
+        if self._shown_chars < self.MAX_VIEW_CHARS:
+            self.insert_text(chunk)
+            self._shown_chars += len(chunk)
+        else:
+            # Після ліміту зберігається лише останній фрагмент з підсумками
+            self._last_chunk = chunk
+    
+    def finish_report(self, _):
+        if self._last_chunk is not None:
+            self.insert_text("\n... (звіт скорочено, повна версія - «Зберегти у файл») ...\n\n")
+            self.insert_text(self._last_chunk)
+            self._last_chunk = None
+    
+    def insert_text(self, text):
+        cursor = self.text_edit.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
     
     def show_fields(self):
-        fields = db.fetch_all("SELECT * FROM fields ORDER BY name")
-        text = "ЗВІТ ПО ПОЛЯХ\n"
-        text += "=" * 40 + "\n\n"
-        
-        total_area = 0
-        for field in fields:
-            text += f"Поле: {field[1]}\n"
-            text += f"Площа: {field[2]} га\n"
-            text += f"Тип ґрунту: {field[3]}\n"
-            text += f"Опис: {field[4]}\n"
-            text += "-" * 40 + "\n"
-            total_area += field[2]
-        
-        text += f"\nЗагальна площа: {total_area} га\n"
-        text += f"Кількість полів: {len(fields)}"
-        
-        self.text_edit.setText(text)
+        self.load_report("Поля")
     
     def show_crops(self):
-        crops = db.fetch_all("SELECT * FROM crops ORDER BY name")
-        text = "ЗВІТ ПО КУЛЬТУРАХ\n"
-        text += "=" * 40 + "\n\n"
-        
-        categories = {"grain": 0, "legume": 0, "oil": 0}
-        for crop in crops:
-            cat = crop[2]
-            if cat in categories:
-                categories[cat] += 1
-            
-            text += f"Культура: {crop[1]}\n"
-            text += f"Категорія: {cat}\n"
-            text += f"Сезон: {crop[3]}\n"
-            text += f"Урожайність: {crop[5]} т/га\n"
-            text += "-" * 40 + "\n"
-        
-        text += f"\nСтатистика:\n"
-        text += f"Зернові: {categories['grain']}\n"
-        text += f"Бобові: {categories['legume']}\n"
-        text += f"Олійні: {categories['oil']}\n"
-        text += f"Всього: {len(crops)}"
-        
-        self.text_edit.setText(text)
+        self.load_report("Культури")
     
     def show_expenses(self):
-        expenses = db.fetch_all("SELECT * FROM expenses ORDER BY date DESC")
-        text = "ЗВІТ ПО ВИТРАТАХ\n"
-        text += "=" * 40 + "\n\n"
-        
-        total = 0
-        for exp in expenses:
-            text += f"Тип: {exp[3]}\n"
-            text += f"Сума: {exp[4]} грн\n"
-            text += f"Дата: {exp[5]}\n"
-            text += f"Опис: {exp[6]}\n"
-            text += "-" * 40 + "\n"
-            total += exp[4]
-        
-        text += f"\nЗагальна сума: {total} грн\n"
-        text += f"Кількість записів: {len(expenses)}"
-        
-        self.text_edit.setText(text)
+        self.load_report("Витрати")
     
     def show_harvest(self):
-        harvest = db.fetch_all("SELECT * FROM harvest ORDER BY harvest_date DESC")
-        text = "ЗВІТ ПО УРОЖАЮ\n"
-        text += "=" * 40 + "\n\n"
-        
-        total_yield = 0
-        for h in harvest:
-            text += f"Урожай: {h[3]} т\n"
-            text += f"Дата: {h[4]}\n"
-            text += f"Якість: {h[5]}/5\n"
-            text += "-" * 40 + "\n"
-            total_yield += h[3]
-        
-        text += f"\nЗагальний урожай: {total_yield} т\n"
-        text += f"Кількість записів: {len(harvest)}"
-        
-        self.text_edit.setText(text)
\ No newline at end of file
+        self.load_report("Урожай")
+    
+    def save_report(self):
+        name = self.report_combo.currentText()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Зберегти звіт", os.path.join("reports", f"{safe_filename(name)}.txt"),
+            "Текстові файли (*.txt)")
+        if not path:
+            return
+        
+        query_runner.submit(
+            lambda: write_report(name, path),
+            lambda written: QMessageBox.information(
+                self, "Звіт збережено", f"Звіт збережено у файл:\n{path}"),
+            lambda message: QMessageBox.warning(
+                self, "Помилка", f"Не вдалося зберегти звіт: {message}"),
+            key=(self, "save"))
+    
+    def export_report(self):
+        name = self.report_combo.currentText()
+        start_export(self, name, lambda path: export_report(name, path))
+    
+    def save_pdf(self):
+        name = self.report_combo.currentText()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Зберегти PDF", os.path.join("reports", f"{safe_filename(name)}.pdf"), "PDF (*.pdf)")
+        if not path:
+            return
+        
+        # PDF рендериться в окремому процесі; потік пулу лише чекає результат
+        import pdf_engine
+        self.pdf_btn.setEnabled(False)
+        query_runner.submit(
+            lambda: pdf_engine.render_in_background(pdf_engine.render_report, name, path).result(),
+            lambda result: self.pdf_finished(f"Звіт збережено у файл:\n{path}"),
+            self.pdf_failed, key=(self, "pdf"))
+    
+    def save_field_pdfs(self):
+        import pdf_engine
+        self.fields_pdf_btn.setEnabled(False)
+        query_runner.submit(
+            pdf_engine.render_field_reports,
+            lambda paths: self.pdf_finished(
+                f"Створено звітів: {len(paths)}\nПапка: {os.path.abspath(pdf_engine.FIELDS_REPORTS_DIR)}"),
+            self.pdf_failed, key=(self, "fields_pdf"))
+    
+    def pdf_finished(self, message):
+        self.pdf_btn.setEnabled(True)
+        self.fields_pdf_btn.setEnabled(True)
+        QMessageBox.information(self, "PDF", message)
+    
+    def pdf_failed(self, message):
+        self.pdf_btn.setEnabled(True)
+        self.fields_pdf_btn.setEnabled(True)
+        QMessageBox.warning(self, "Помилка", f"Не вдалося створити PDF: {message}")
@@ -0,0 +1,328 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from database import db
+from export_engine import EXPORTS, safe_filename
+from report_engine import REPORTS
+
+# Генерація PDF-звітів (reportlab platypus).
+# Рядки читаються з курсора порціями; кожна порція - окрема LongTable із
+# повтором заголовка на кожній сторінці, тож розбиття на сторінки не
+# переглядає всю таблицю щоразу. Історія документа (story) - генератор:
+# platypus отримує наступні порції лише після розміщення попередніх, тож у
+# пам'яті одночасно лише кілька таблиць, а не весь звіт. Шрифти та стилі реєструються один раз
+# на процес. Рендеринг виконується в окремому процесі (background_executor),
+# а звіти по полях - паралельно на всіх ядрах (render_field_reports).
+# reportlab імпортується лише при генерації PDF.
+
+# Шрифти з кирилицею: (звичайний, жирний, моноширинний) - перший знайдений
+FONT_CANDIDATES = [
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf", "C:/Windows/Fonts/consola.ttf"),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+     "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+     "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf",
+     "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+     "/usr/share/fonts/dejavu/DejaVuSansMono.ttf"),
+    ("/Library/Fonts/Arial Unicode.ttf", "/Library/Fonts/Arial Unicode.ttf",
+     "/Library/Fonts/Arial Unicode.ttf"),
+]
+FONT_NAMES = ("AgroSans", "AgroSans-Bold", "AgroMono")
+# Без TTF-шрифту кирилиця не відображається, але PDF все одно створюється
+FALLBACK_FONTS = ("Helvetica", "Helvetica-Bold", "Courier")
+
+# Рядків в одній LongTable
+TABLE_CHUNK_ROWS = 500
+# Рядків тексту в одному блоці Preformatted: великий блок не розбивається
+# між сторінками
+TEXT_CHUNK_LINES = 80
+# Скільки елементів story тримати наперед у черзі platypus
+STORY_LOOKAHEAD = 2
+TABLE_FONT_SIZE = 7
+
+FIELDS_REPORTS_DIR = os.path.join("reports", "fields")
+
+
+@lru_cache(maxsize=None)
+def register_fonts():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    for paths in FONT_CANDIDATES:
+        if not os.path.exists(paths[0]):
+            continue
+        for name, path in zip(FONT_NAMES, paths):
+            pdfmetrics.registerFont(TTFont(name, path if os.path.exists(path) else paths[0]))
+        return FONT_NAMES
+    return FALLBACK_FONTS
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    regular, bold, mono = register_fonts()
+    sample = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle("AgroTitle", parent=sample["Title"], fontName=bold),
+        "heading": ParagraphStyle("AgroHeading", parent=sample["Heading2"], fontName=bold),
+        "normal": ParagraphStyle("AgroNormal", parent=sample["Normal"], fontName=regular),
+        "mono": ParagraphStyle("AgroMono", parent=sample["Code"], fontName=mono, fontSize=7,
+                               leading=9),
+        "table": TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), regular),
+            ("FONTNAME", (0, 0), (-1, 0), bold),
+            ("FONTSIZE", (0, 0), (-1, -1), TABLE_FONT_SIZE),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4CAF50")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F1F8E9")]),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]),
+    }
+
+
+def format_cell(value, max_chars):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        text = f"{value:.2f}"
+    else:
+        text = str(value).replace("\n", " ")
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def table_flowables(headers, rows, width, chunk_rows=TABLE_CHUNK_ROWS):
+    from reportlab.platypus import LongTable
+
+    style = get_styles()["table"]
+    col_width = width / len(headers)
+    # Однакова ширина колонок у всіх порціях; задовгий текст обрізається
+    max_chars = max(4, int(col_width / (TABLE_FONT_SIZE * 0.55)))
+
+    def make_table(chunk):
+        table = LongTable([headers] + chunk, colWidths=[col_width] * len(headers), repeatRows=1)
+        table.setStyle(style)
+        return table
+
+    chunk = []
+    empty = True
+    for row in rows:
+        chunk.append([format_cell(value, max_chars) for value in row])
+        if len(chunk) >= chunk_rows:
+            yield make_table(chunk)
+            chunk = []
+            empty = False
+    if chunk or empty:
+        # Порожня таблиця - лише заголовок
+        yield make_table(chunk)
+
+
+class LazyStory(list):
+    # Черга елементів для doc.build, що поповнюється з ітератора.
+    # platypus перевіряє len() перед кожним елементом і видаляє розміщені
+    # з початку списку (або вставляє туди залишок розбитої таблиці), тож
+    # поповнення в __len__ тримає в пам'яті лише кілька елементів
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+
+    def __len__(self):
+        while self._source is not None and super().__len__() < STORY_LOOKAHEAD:
+            flowable = next(self._source, None)
+            if flowable is None:
+                self._source = None
+            else:
+                self.append(flowable)
+        return super().__len__()
+
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont(register_fonts()[0], 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2,
+                           f"Сторінка {doc.page}")
+    canvas.restoreState()
+
+
+def build_pdf(path, story, wide=False):
+    # story - будь-який ітерований набір елементів, зокрема генератор.
+    # Запис через тимчасовий файл, як і в export_engine
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    part_path = f"{path}.part"
+    doc = SimpleDocTemplate(part_path, pagesize=landscape(A4) if wide else A4,
+                            leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+                            topMargin=1.5 * cm, bottomMargin=1.5 * cm)
+    try:
+        doc.build(LazyStory(story), onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return path
+
+
+def page_width(wide):
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.units import cm
+
+    return (landscape(A4) if wide else A4)[0] - 3 * cm
+
+
+def table_story(name, params, wide):
+    from reportlab.platypus import Paragraph
+
+    headers, query = EXPORTS[name]
+    yield Paragraph(escape(name), get_styles()["title"])
+    yield from table_flowables(headers, db.iter_query(query, params), page_width(wide))
+
+
+def render_table(name, path, params=()):
+    wide = len(EXPORTS[name][0]) > 6
+    return build_pdf(path, table_story(name, params, wide), wide)
+
+
+def text_flowables(parts, chunk_lines=TEXT_CHUNK_LINES):
+    # Частини тексту звіту (рядок може бути розірваний між частинами) -
+    # блоки Preformatted по chunk_lines рядків
+    from reportlab.platypus import Preformatted
+
+    style = get_styles()["mono"]
+    lines = []
+    tail = ""
+    for part in parts:
+        *complete, tail = (tail + part).split("\n")
+        lines.extend(complete)
+        while len(lines) >= chunk_lines:
+            yield Preformatted("\n".join(lines[:chunk_lines]), style)
+            del lines[:chunk_lines]
+    lines.append(tail)
+    yield Preformatted("\n".join(lines), style)
+
+
+def render_text_report(name, path):
+    # Текстовий звіт (report_engine) - моноширинним шрифтом, зі збереженням
+    # вирівнювання колонок аналітичних таблиць
+    return build_pdf(path, text_flowables(REPORTS[name]()), wide=True)
+
+
+def render_report(name, path):
+    if name in EXPORTS:
+        return render_table(name, path)
+    return render_text_report(name, path)
+
+
+FIELD_EXPENSES = """SELECT e.date, c.name, e.expense_type, e.quantity, e.unit, e.total_cost
+                    FROM expenses e LEFT JOIN crops c ON e.crop_id = c.id
+                    WHERE e.field_id = ? ORDER BY e.date DESC, e.id DESC"""
+FIELD_HARVEST = """SELECT h.harvest_date, c.name, h.actual_yield, h.quality_rating,
+                          h.moisture_content, h.notes
+                   FROM harvest h LEFT JOIN crops c ON h.crop_id = c.id
+                   WHERE h.field_id = ? ORDER BY h.harvest_date DESC, h.id DESC"""
+# Підсумки за роками зі зведених таблиць
+FIELD_TOTALS = """SELECT y.year,
+                         (SELECT SUM(total_cost) FROM expense_summary
+                          WHERE year = y.year AND field_id = ?),
+                         (SELECT SUM(total_yield) FROM harvest_summary
+                          WHERE year = y.year AND field_id = ?)
+                  FROM (SELECT year FROM expense_summary WHERE field_id = ?
+                        UNION SELECT year FROM harvest_summary WHERE field_id = ?) y
+                  ORDER BY y.year DESC"""
+
+
+def field_report_path(out_dir, field_id, name):
+    return os.path.join(out_dir, f"{field_id}_{safe_filename(name, 'поле')}.pdf")
+
+
+def field_story(field_id, field):
+    from reportlab.platypus import Paragraph, Spacer
+
+    name, area, soil_type, description = field
+    styles = get_styles()
+    width = page_width(False)
+
+    yield Paragraph(escape(f"Поле: {name}"), styles["title"])
+    yield Paragraph(escape(f"Площа: {area} га | Тип ґрунту: {soil_type or '-'}"), styles["normal"])
+    yield Paragraph(escape(description or ""), styles["normal"])
+    yield Spacer(1, 12)
+    yield Paragraph("Підсумки за роками", styles["heading"])
+    yield from table_flowables(
+        ["Рік", "Витрати, грн", "Урожай, т"],
+        ((year or "без дати", cost or 0.0, harvest or 0.0) for year, cost, harvest
+         in db.iter_query(FIELD_TOTALS, (field_id,) * 4)), width)
+    yield Paragraph("Витрати", styles["heading"])
+    yield from table_flowables(
+        ["Дата", "Культура", "Тип", "Кількість", "Од.", "Вартість"],
+        db.iter_query(FIELD_EXPENSES, (field_id,)), width)
+    yield Paragraph("Урожай", styles["heading"])
+    yield from table_flowables(
+        ["Дата", "Культура", "Урожай, т", "Якість", "Вологість, %", "Примітки"],
+        db.iter_query(FIELD_HARVEST, (field_id,)), width)
+
+
+def render_field_report(field_id, out_dir=FIELDS_REPORTS_DIR):
+    field = db.fetch_one("SELECT name, area, soil_type, description FROM fields WHERE id = ?",
+                         (field_id,))
+    if field is None:
+        return None
+    os.makedirs(out_dir, exist_ok=True)
+    return build_pdf(field_report_path(out_dir, field_id, field[0]), field_story(field_id, field))
+
+
+def _init_worker():
+    # Шрифти й стилі реєструються один раз на робочий процес і
+    # використовуються всіма звітами, які він генерує
+    register_fonts()
+    get_styles()
+
+
+def _process_pool(workers):
+    # spawn на всіх платформах: дочірній процес відкриває власні з'єднання
+    # з базою замість успадкованих через fork
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def render_field_reports(out_dir=FIELDS_REPORTS_DIR, field_ids=None, workers=None):
+    # Звіти по всіх (або вказаних) полях, паралельно на всіх ядрах
+    if field_ids is None:
+        field_ids = [row[0] for row in db.fetch_all("SELECT id FROM fields ORDER BY id")]
+    workers = min(workers or os.cpu_count() or 1, len(field_ids))
+    if workers <= 1:
+        _init_worker()
+        paths = [render_field_report(field_id, out_dir) for field_id in field_ids]
+    else:
+        with _process_pool(workers) as pool:
+            paths = list(pool.map(render_field_report, field_ids, [out_dir] * len(field_ids)))
+    return [path for path in paths if path]
+
+
+_background = None
+
+
+def background_executor():
+    # Довготривалий процес для звітів, запущених з інтерфейсу: рендеринг не
+    # займає GIL головного процесу, а шрифти завантажуються лише при першому звіті
+    global _background
+    if _background is None:
+        _background = _process_pool(1)
+    return _background
+
+
+def render_in_background(func, *args):
+    return background_executor().submit(func, *args)
+
+
+def shutdown():
+    global _background
+    if _background is not None:
+        _background.shutdown(wait=False, cancel_futures=True)
+        _background = None
@@ -0,0 +1,150 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# Профілювання запитів до бази (вмикається явно: змінна оточення
+# AGROFARM_PROFILE або панель діагностики).
+# Database передає профайлеру кожен виконаний запит: час, кількість рядків
+# і модуль, з якого його викликано. Останні записи зберігаються в пам'яті
+# для панелі діагностики; повільні запити (понад поріг) записуються в
+# журнал з ротацією разом з планом виконання EXPLAIN QUERY PLAN.
+# Без профайлера Database лише перевіряє атрибут, тож вимкнене
+# профілювання не сповільнює запити.
+
+DEFAULT_THRESHOLD_MS = 100.0
+QUERY_LOG = 'agrofarm_queries.log'
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+# Скільки останніх запитів зберігати для панелі діагностики
+HISTORY_SIZE = 500
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Файли й пакети, виклики з яких не вважаються джерелом запиту: база,
+# фоновий виконавець, модель таблиці та сервіси лише передають запит далі
+_INTERNAL_FILES = {os.path.normcase(os.path.join(_ROOT, *path)) for path in (
+    ('profiler.py',), ('database.py',), ('ui', 'query_runner.py'), ('ui', 'table_model.py'))}
+_INTERNAL_DIRS = tuple(os.path.normcase(os.path.join(_ROOT, name)) + os.sep
+                       for name in ('services',))
+# Явне джерело запитів поточного потоку (query_source)
+_source = threading.local()
+
+QueryRecord = namedtuple('QueryRecord', ['started', 'query', 'params', 'ms', 'rows',
+                                         'caller', 'thread', 'plan'])
+
+
+@contextmanager
+def query_source(name):
+    # Запити в блоці приписуються джерелу name, наприклад обробнику, що
+    # передав функцію у фоновий потік (у стеку робочого потоку його немає)
+    previous = getattr(_source, 'name', None)
+    _source.name = name
+    try:
+        yield
+    finally:
+        _source.name = previous
+
+
+def caller_name():
+    # Явне джерело (query_source) або "модуль:функція" першого кадру стеку
+    # поза внутрішніми файлами
+    name = getattr(_source, 'name', None)
+    if name:
+        return name
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename not in _INTERNAL_FILES and not filename.startswith(_INTERNAL_DIRS):
+            return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return '?'
+
+
+def compact(query):
+    return ' '.join(query.split())
+
+
+class QueryProfiler:
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, log_path=QUERY_LOG,
+                 history_size=HISTORY_SIZE):
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self.records = deque(maxlen=history_size)
+        # Повільні запити окремо, щоб часті швидкі їх не витіснили
+        self.slow = deque(maxlen=history_size)
+        # Запит -> [кількість, сумарний час, максимальний час, рядків]
+        self.totals = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger('agrofarm.queries')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._handler = None
+        if log_path:
+            self._handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES,
+                                                backupCount=LOG_BACKUPS, encoding='utf-8',
+                                                delay=True)
+            self._handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.logger.addHandler(self._handler)
+
+    def close(self):
+        if self._handler is not None:
+            self.logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def record(self, database, query, params, seconds, rows):
+        # Викликається Database після виконання запиту в потоці запиту
+        ms = seconds * 1000
+        query = compact(query)
+        plan = None
+        slow = ms >= self.threshold_ms
+        if slow and params is not None:
+            try:
+                plan = database.explain(query, params)
+            except Exception as e:
+                plan = [f"EXPLAIN недоступний: {e}"]
+        record = QueryRecord(time.time() - seconds, query, params, ms, rows,
+                             caller_name(), threading.current_thread().name, plan)
+        with self._lock:
+            self.records.append(record)
+            if slow:
+                self.slow.append(record)
+            totals = self.totals.setdefault(query, [0, 0.0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += ms
+            totals[2] = max(totals[2], ms)
+            totals[3] += max(rows, 0)
+        if slow:
+            self.logger.info("%.1f ms, %d рядків, %s [%s]\n  %s\n  параметри: %r\n  план: %s",
+                             ms, rows, record.caller, record.thread, query, params,
+                             "; ".join(plan or ["-"]))
+
+    def snapshot(self):
+        # (останні запити, повільні запити, підсумки) - копії для інтерфейсу
+        with self._lock:
+            totals = [(query, count, total, peak, rows)
+                      for query, (count, total, peak, rows) in self.totals.items()]
+            return list(self.records), list(self.slow), totals
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.slow.clear()
+            self.totals.clear()
+
+
+def profiler_from_env(environ=os.environ):
+    # AGROFARM_PROFILE=1 або поріг у мс (AGROFARM_PROFILE=50) вмикає
+    # профілювання з запуску; AGROFARM_QUERY_LOG - шлях журналу
+    value = environ.get('AGROFARM_PROFILE', '')
+    if value in ('', '0'):
+        return None
+    try:
+        threshold = float(value) if value != '1' else DEFAULT_THRESHOLD_MS
+    except ValueError:
+        threshold = DEFAULT_THRESHOLD_MS
+    return QueryProfiler(threshold, environ.get('AGROFARM_QUERY_LOG', QUERY_LOG))
@@ -0,0 +1,139 @@
+# SQL-запити списків модулів та допоміжні функції для фільтрів
+
+
+def year_bounds(year):
+    # Фільтр за роком як діапазон дат: на відміну від strftime('%Y', date) = ?
+    # такий вираз може використовувати індекс за датою
+    year = int(year)
+    return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+
+# Поле й культура повертаються як id: назви підставляє кеш довідників
+# (database.reference) при відображенні, без JOIN для кожного рядка
+EXPENSES_LIST = """SELECT e.id, e.field_id, e.crop_id, e.expense_type, 
+                   e.amount, e.quantity, e.total_cost, e.date 
+                   FROM expenses e
+                   WHERE 1=1"""
+
+HARVESTS_LIST = """SELECT h.id, h.field_id, h.crop_id, h.actual_yield, 
+                   h.harvest_date, h.quality_rating, 
+                   h.moisture_content, h.notes 
+                   FROM harvest h
+                   WHERE 1=1"""
+
+PLANS_LIST = """SELECT p.id, p.field_id, p.crop_id, p.season_year, p.planned_area,
+                p.sowing_date, p.expected_harvest_date, p.status
+                FROM planting_plans p
+                WHERE 1=1"""
+
+
+FIELDS_STATS = "SELECT COALESCE(SUM(area), 0), COUNT(*) FROM fields"
+
+
+def crops_query(category=None):
+    # Список культур модуля: (запит, параметри, запит одного рядка)
+    if category:
+        return ("SELECT * FROM crops WHERE category = ? ORDER BY name, id", (category,),
+                "SELECT * FROM crops WHERE category = ? AND id = ?")
+    return "SELECT * FROM crops ORDER BY name, id", (), "SELECT * FROM crops WHERE id = ?"
+
+
+def expense_conditions(expense_type=None, year=None, alias="e."):
+    # Умови фільтра витрат і параметри; alias - префікс колонок
+    conditions = []
+    params = []
+    
+    if expense_type:
+        conditions.append(f"{alias}expense_type = ?")
+        params.append(expense_type)
+    
+    if year:
+        conditions.append(f"{alias}date >= ? AND {alias}date < ?")
+        params.extend(year_bounds(year))
+    
+    return conditions, tuple(params)
+
+
+def harvest_conditions(year=None, alias="h."):
+    if year:
+        return [f"{alias}harvest_date >= ? AND {alias}harvest_date < ?"], year_bounds(year)
+    return [], ()
+
+
+def _where(conditions):
+    return "".join(f" AND {condition}" for condition in conditions)
+
+
+def _expense_filters(expense_type=None, year=None):
+    conditions, params = expense_conditions(expense_type, year)
+    return _where(conditions), params
+
+
+def _harvest_filters(year=None):
+    conditions, params = harvest_conditions(year)
+    return _where(conditions), params
+
+
+def expenses_query(expense_type=None, year=None):
+    where, params = _expense_filters(expense_type, year)
+    return f"{EXPENSES_LIST}{where} ORDER BY e.date DESC, e.id DESC", params
+
+
+def expenses_row_query(expense_type=None, year=None):
+    # Один рядок списку з тими самими фільтрами (параметри як у expenses_query + id)
+    where, _ = _expense_filters(expense_type, year)
+    return f"{EXPENSES_LIST}{where} AND e.id = ?"
+
+
+def expenses_stats_query(expense_type=None, year=None):
+    # Ті самі фільтри, що й у списку, але за зведеною таблицею:
+    # читається кількість груп поле x культура, а не всі записи
+    where = ""
+    params = []
+    if year:
+        where += " AND year = ?"
+        params.append(int(year))
+    if expense_type:
+        where += " AND expense_type = ?"
+        params.append(expense_type)
+    return (f"""SELECT COALESCE(SUM(total_cost), 0), COALESCE(SUM(record_count), 0)
+                FROM expense_summary WHERE 1=1{where}""", tuple(params))
+
+
+def harvests_query(year=None):
+    where, params = _harvest_filters(year)
+    return f"{HARVESTS_LIST}{where} ORDER BY h.harvest_date DESC, h.id DESC", params
+
+
+def harvests_row_query(year=None):
+    where, _ = _harvest_filters(year)
+    return f"{HARVESTS_LIST}{where} AND h.id = ?"
+
+
+def _plan_filters(season_year=None):
+    if season_year:
+        return " AND p.season_year = ?", (season_year,)
+    return "", ()
+
+
+def plans_query(season_year=None):
+    where, params = _plan_filters(season_year)
+    return f"{PLANS_LIST}{where} ORDER BY p.season_year DESC, p.id DESC", params
+
+
+def plans_row_query(season_year=None):
+    where, _ = _plan_filters(season_year)
+    return f"{PLANS_LIST}{where} AND p.id = ?"
+
+
+def harvests_stats_query(year=None):
+    # Середня якість рахується як у списку: записи без оцінки - як 0
+    where = ""
+    params = []
+    if year:
+        where += " AND year = ?"
+        params.append(int(year))
+    return (f"""SELECT COALESCE(SUM(total_yield), 0),
+                       COALESCE(SUM(quality_sum) / SUM(record_count), 0),
+                       COALESCE(SUM(record_count), 0)
+                FROM harvest_summary WHERE 1=1{where}""", tuple(params))
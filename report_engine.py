@@ -0,0 +1,212 @@
+from database import db
+
+# Потокова генерація текстових звітів.
+# Кожен звіт - генератор фрагментів тексту, що читає рядки з курсора
+# порціями (db.iter_query), тож пам'ять не залежить від розміру таблиці.
+
+SEPARATOR = "-" * 40 + "\n"
+
+# Розмір фрагмента, яким текст передається у вікно перегляду або файл
+CHUNK_CHARS = 64 * 1024
+
+
+def fields_report():
+    yield "ЗВІТ ПО ПОЛЯХ\n"
+    yield "=" * 40 + "\n\n"
+
+    total_area = 0
+    count = 0
+    for name, area, soil_type, description in db.iter_query(
+            "SELECT name, area, soil_type, description FROM fields ORDER BY name"):
+        yield (f"Поле: {name}\n"
+               f"Площа: {area} га\n"
+               f"Тип ґрунту: {soil_type}\n"
+               f"Опис: {description}\n"
+               f"{SEPARATOR}")
+        total_area += area
+        count += 1
+
+    yield (f"\nЗагальна площа: {total_area} га\n"
+           f"Кількість полів: {count}")
+
+
+def crops_report():
+    yield "ЗВІТ ПО КУЛЬТУРАХ\n"
+    yield "=" * 40 + "\n\n"
+
+    categories = {"grain": 0, "legume": 0, "oil": 0}
+    count = 0
+    for name, category, sowing_season, average_yield in db.iter_query(
+            "SELECT name, category, sowing_season, average_yield FROM crops ORDER BY name"):
+        if category in categories:
+            categories[category] += 1
+        count += 1
+        yield (f"Культура: {name}\n"
+               f"Категорія: {category}\n"
+               f"Сезон: {sowing_season}\n"
+               f"Урожайність: {average_yield} т/га\n"
+               f"{SEPARATOR}")
+
+    yield (f"\nСтатистика:\n"
+           f"Зернові: {categories['grain']}\n"
+           f"Бобові: {categories['legume']}\n"
+           f"Олійні: {categories['oil']}\n"
+           f"Всього: {count}")
+
+
+def expenses_report():
+    yield "ЗВІТ ПО ВИТРАТАХ\n"
+    yield "=" * 40 + "\n\n"
+
+    total = 0
+    count = 0
+    for expense_type, amount, date, description in db.iter_query(
+            """SELECT expense_type, amount, date, description
+               FROM expenses ORDER BY date DESC, id DESC"""):
+        yield (f"Тип: {expense_type}\n"
+               f"Сума: {amount} грн\n"
+               f"Дата: {date}\n"
+               f"Опис: {description}\n"
+               f"{SEPARATOR}")
+        total += amount
+        count += 1
+
+    yield (f"\nЗагальна сума: {total} грн\n"
+           f"Кількість записів: {count}")
+
+
+def harvest_report():
+    yield "ЗВІТ ПО УРОЖАЮ\n"
+    yield "=" * 40 + "\n\n"
+
+    total_yield = 0
+    count = 0
+    for actual_yield, harvest_date, quality_rating in db.iter_query(
+            """SELECT actual_yield, harvest_date, quality_rating
+               FROM harvest ORDER BY harvest_date DESC, id DESC"""):
+        yield (f"Урожай: {actual_yield} т\n"
+               f"Дата: {harvest_date}\n"
+               f"Якість: {quality_rating}/5\n"
+               f"{SEPARATOR}")
+        total_yield += actual_yield or 0
+        count += 1
+
+    yield (f"\nЗагальний урожай: {total_yield} т\n"
+           f"Кількість записів: {count}")
+
+
+def summary_report():
+    # Підсумки за роками зі зведених таблиць: кількість прочитаних рядків
+    # залежить від кількості груп, а не записів
+    yield "ПІДСУМКИ ЗА РОКАМИ\n"
+    yield "=" * 40 + "\n\n"
+
+    yield "Витрати за типами:\n"
+    for year, expense_type, total_cost, count in db.iter_query(
+            """SELECT year, expense_type, SUM(total_cost), SUM(record_count)
+               FROM expense_summary GROUP BY year, expense_type
+               ORDER BY year DESC, expense_type"""):
+        yield (f"{year or 'без дати'} | {expense_type or 'без типу'}: "
+               f"{total_cost:.2f} грн ({count} записів)\n")
+
+    yield f"\n{SEPARATOR}Урожай:\n"
+    for year, total_yield, quality, moisture, count in db.iter_query(
+            """SELECT year, SUM(total_yield),
+                      SUM(quality_sum) / NULLIF(SUM(quality_count), 0),
+                      SUM(moisture_sum) / NULLIF(SUM(moisture_count), 0),
+                      SUM(record_count)
+               FROM harvest_summary GROUP BY year ORDER BY year DESC"""):
+        quality = f"{quality:.1f}/5" if quality is not None else "--"
+        moisture = f"{moisture:.1f}%" if moisture is not None else "--"
+        yield (f"{year or 'без дати'}: {total_yield:.2f} т, якість {quality}, "
+               f"вологість {moisture} ({count} записів)\n")
+
+
+ANALYTICS_COLUMNS = {
+    "field_name": "Поле",
+    "crop_name": "Культура",
+    "year": "Рік",
+    "area": "Площа, га",
+    "cost": "Витрати, грн",
+    "yield_t": "Урожай, т",
+    "margin": "Маржа, грн",
+    "cost_per_ha": "Витрати/га",
+    "yield_per_ha": "Урожай/га",
+    "margin_per_ha": "Маржа/га",
+}
+
+
+def analytics_report(kind):
+    # Зведення FarmAnalytics у вигляді текстової таблиці
+    from analytics import FarmAnalytics
+
+    analytics = FarmAnalytics.load()
+    titles = {
+        "fields": ("АНАЛІТИКА ПО ПОЛЯХ", analytics.by_field),
+        "crops": ("АНАЛІТИКА ПО КУЛЬТУРАХ", analytics.by_crop),
+        "seasons": ("АНАЛІТИКА ПО СЕЗОНАХ", analytics.by_season),
+        "field_crop_season": ("ПОЛЕ × КУЛЬТУРА × СЕЗОН", analytics.field_crop_season),
+    }
+    title, build = titles[kind]
+    yield f"{title}\n"
+    yield "=" * 40 + "\n\n"
+
+    table = build()
+    columns = [column for column in ANALYTICS_COLUMNS if column in table.columns]
+    table = table[columns].rename(columns=ANALYTICS_COLUMNS)
+    yield table.to_string(index=False, float_format=lambda value: f"{value:,.2f}", na_rep="--")
+    yield "\n"
+
+
+def cost_by_type_report():
+    from analytics import FarmAnalytics
+
+    yield "ВИТРАТИ ЗА ТИПАМИ (поле × рік)\n"
+    yield "=" * 40 + "\n\n"
+    yield FarmAnalytics.load().cost_by_type().to_string(float_format=lambda value: f"{value:,.2f}")
+    yield "\n"
+
+
+# Назва звіту -> генератор
+REPORTS = {
+    "Поля": fields_report,
+    "Культури": crops_report,
+    "Витрати": expenses_report,
+    "Урожай": harvest_report,
+    "Підсумки за роками": summary_report,
+    "Аналітика: поля": lambda: analytics_report("fields"),
+    "Аналітика: культури": lambda: analytics_report("crops"),
+    "Аналітика: сезони": lambda: analytics_report("seasons"),
+    "Аналітика: поле × культура × сезон": lambda: analytics_report("field_crop_season"),
+    "Витрати за типами": cost_by_type_report,
+}
+
+
+def chunked(parts, chunk_chars=CHUNK_CHARS):
+    # Об'єднання дрібних фрагментів у блоки через список і join,
+    # без квадратичної конкатенації рядків
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_chars:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_report(name, chunk_chars=CHUNK_CHARS):
+    return chunked(REPORTS[name](), chunk_chars)
+
+
+def write_report(name, path):
+    # Запис повного звіту у файл фрагментами; повертає кількість символів
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in stream_report(name):
+            f.write(chunk)
+            written += len(chunk)
+    return written
@@ -0,0 +1,261 @@
+from collections import namedtuple
+
+from database import db
+from analytics import DEFAULT_CATEGORY_PRICES, AREA_QUERY, PLAN_SEASON_YEAR, SEASON_COSTS
+from allocation import CANCELLED_STATUS
+
+# Оптимізація сівозміни: призначення культур полям на кілька наступних
+# сезонів з максимальною очікуваною маржею.
+# Маржа на гектар для пари поле x культура - історична врожайність поля
+# x ціна мінус історичні витрати на гектар (сезони й площа - як в
+# analytics, площа поля врахована один раз за сезон); без історії
+# поля - середнє культури по всіх полях, далі - average_yield з довідника.
+# Правила сівозміни стосуються лише послідовності культур на одному полі,
+# тож задача розпадається на незалежні задачі полів, і кожна розв'язується
+# точно динамічним програмуванням за сезонами: стан - попередня культура та
+# кількість сезонів без бобових. Час лінійний за кількістю полів.
+# Сезони, для яких у поля вже є плани, не змінюються: їх культура
+# фіксована й враховується правилами для сусідніх сезонів.
+
+# Бобові - щонайменше раз на стільки сезонів поспіль на кожному полі
+LEGUME_BREAK = 4
+
+# Призначення; planned - це наявний план (повторно не додається)
+Assignment = namedtuple('Assignment',
+                        ['field_id', 'season_year', 'crop_id', 'area', 'margin', 'planned'])
+
+FIELDS_QUERY = "SELECT id, area FROM fields WHERE area > 0 ORDER BY id"
+CROPS_QUERY = "SELECT id, category, average_yield FROM crops ORDER BY id"
+HARVEST_HISTORY = """SELECT field_id, crop_id, year, total_yield FROM harvest_summary
+                     WHERE year != 0 AND field_id != 0 AND crop_id != 0"""
+COST_HISTORY = f"""SELECT field_id, crop_id, year, total_cost FROM ({SEASON_COSTS})
+                   WHERE year IS NOT NULL AND field_id IS NOT NULL AND crop_id IS NOT NULL"""
+AREA_HISTORY = f"""SELECT field_id, crop_id, year, area FROM ({AREA_QUERY})
+                   WHERE crop_id IS NOT NULL"""
+# Сезон "2023-2024" відноситься до року збору 2024, як в analytics
+PLAN_HISTORY = f"""SELECT field_id, crop_id, {PLAN_SEASON_YEAR}, SUM(planned_area)
+                   FROM planting_plans
+                   WHERE status IS NOT '{CANCELLED_STATUS}'
+                         AND field_id IS NOT NULL AND crop_id IS NOT NULL
+                   GROUP BY 1, 2, 3"""
+
+
+def season_harvest_year(season_year):
+    return int(str(season_year)[-4:])
+
+
+def next_seasons(start, count):
+    # "2025-2026", 3 -> ["2025-2026", "2026-2027", "2027-2028"]
+    year = season_harvest_year(start) - 1
+    return [f"{year + i}-{year + i + 1}" for i in range(count)]
+
+
+def rotation_allowed(previous_category, previous_id, category, crop_id):
+    # Без монокультури і без олійних після олійних
+    if previous_id == crop_id:
+        return False
+    return not (previous_category == "oil" and category == "oil")
+
+
+def _ratio(totals, key):
+    value, area = totals.get(key, (0.0, 0.0))
+    return value / area if area > 0 else None
+
+
+def _add(totals, key, value, area):
+    old_value, old_area = totals.get(key, (0.0, 0.0))
+    totals[key] = (old_value + value, old_area + area)
+
+
+class RotationOptimizer:
+    def __init__(self, fields, crops, harvest, costs, plans, areas, prices=None):
+        # fields: [(id, площа)]; crops: [(id, категорія, average_yield)];
+        # harvest/costs/plans/areas: [(поле, культура, рік, значення)]
+        self.fields = fields
+        self.crops = crops
+        self.crop_ids = [crop[0] for crop in crops]
+        self.crop_index = {crop_id: index for index, crop_id in enumerate(self.crop_ids)}
+        self.legume = [crop[1] == "legume" for crop in crops]
+        # Без бобових у довіднику правило бобової перерви не діє
+        self.legume_break = LEGUME_BREAK if any(self.legume) else float("inf")
+        prices = prices or {}
+        self.prices = [prices.get(crop_id, DEFAULT_CATEGORY_PRICES.get(category, 0.0))
+                       for crop_id, category, _ in crops]
+
+        # Допустимі переходи: індекс попередньої культури -> [індекси культур];
+        # останній елемент - попередня культура невідома
+        self.unknown = len(crops)
+        self.transitions = [
+            [index for index, (crop_id, category, _) in enumerate(crops)
+             if rotation_allowed(previous[1], previous[0], category, crop_id)]
+            for previous in crops] + [list(range(len(crops)))]
+
+        self._load_history(harvest, costs, plans, areas)
+
+    @classmethod
+    def load(cls, database=db, prices=None):
+        return cls(database.fetch_all(FIELDS_QUERY), database.fetch_all(CROPS_QUERY),
+                   database.fetch_all(HARVEST_HISTORY), database.fetch_all(COST_HISTORY),
+                   database.fetch_all(PLAN_HISTORY), database.fetch_all(AREA_HISTORY),
+                   prices)
+
+    def _load_history(self, harvest, costs, plans, areas):
+        # Площа поле x культура x сезон (analytics.AREA_QUERY); рядки без
+        # площі не входять у показники на гектар
+        area_of = {(field_id, crop_id, year): area or 0.0
+                   for field_id, crop_id, year, area in areas}
+        # Культура поля за роком: з планів, інакше з найбільшого врожаю
+        self.history = {}
+        for field_id, crop_id, year, area in plans:
+            best = self.history.setdefault(field_id, {}).get(year)
+            if best is None or (area or 0.0) > best[0]:
+                self.history[field_id][year] = (area or 0.0, crop_id)
+
+        field_yield, crop_yield, field_cost, crop_cost = {}, {}, {}, {}
+        harvested = {}
+        for field_id, crop_id, year, total in harvest:
+            area = area_of.get((field_id, crop_id, year), 0.0)
+            if area > 0:
+                _add(field_yield, (field_id, crop_id), total, area)
+                _add(crop_yield, crop_id, total, area)
+            best = harvested.setdefault(field_id, {}).get(year)
+            if best is None or total > best[0]:
+                harvested[field_id][year] = (total, crop_id)
+        for field_id, crop_id, year, total in costs:
+            area = area_of.get((field_id, crop_id, year), 0.0)
+            if area > 0:
+                _add(field_cost, (field_id, crop_id), total, area)
+                _add(crop_cost, crop_id, total, area)
+
+        for field_id, years in harvested.items():
+            history = self.history.setdefault(field_id, {})
+            for year, value in years.items():
+                if year not in history:
+                    history[year] = value
+
+        # Маржа на гектар: поле -> [маржа для кожної культури]
+        self.margins = {}
+        for field_id, _ in self.fields:
+            margins = []
+            for index, (crop_id, _, average_yield) in enumerate(self.crops):
+                yield_ha = _ratio(field_yield, (field_id, crop_id))
+                if yield_ha is None:
+                    yield_ha = _ratio(crop_yield, crop_id)
+                if yield_ha is None:
+                    yield_ha = average_yield or 0.0
+                cost_ha = _ratio(field_cost, (field_id, crop_id))
+                if cost_ha is None:
+                    cost_ha = _ratio(crop_cost, crop_id) or 0.0
+                margins.append(yield_ha * self.prices[index] - cost_ha)
+            self.margins[field_id] = margins
+
+    def initial_state(self, field_id, first_year):
+        # (індекс попередньої культури, сезонів без бобових) перед першим сезоном
+        years = self.history.get(field_id, {})
+        previous = years.get(first_year - 1)
+        previous_index = self.unknown if previous is None else self.crop_index.get(previous[1], self.unknown)
+        since_legume = 0
+        for year in range(first_year - 1, first_year - 1 - LEGUME_BREAK, -1):
+            crop = years.get(year)
+            if crop is None:
+                break
+            index = self.crop_index.get(crop[1])
+            if index is not None and self.legume[index]:
+                break
+            since_legume += 1
+        return previous_index, since_legume
+
+    def solve_field(self, field_id, area, seasons, fixed=None):
+        # Найкраща послідовність культур поля: [(індекс культури, фіксована)]
+        # або None, якщо правилам не відповідає жодна
+        fixed = fixed or {}
+        margins = self.margins[field_id]
+        limit = self.legume_break
+        legume = self.legume
+        layer = {self.initial_state(field_id, season_harvest_year(seasons[0])): (0.0, None, None)}
+        layers = []
+        for season in seasons:
+            fixed_index = fixed.get(season)
+            following = {}
+            for state, (value, _, _) in layer.items():
+                previous, since = state
+                if fixed_index is not None:
+                    # Наявний план: культура не обирається й не перевіряється
+                    choices = (fixed_index,)
+                else:
+                    choices = self.transitions[previous]
+                for index in choices:
+                    since_next = 0 if legume[index] else since + 1
+                    if fixed_index is None and since_next >= limit:
+                        continue
+                    total = value + margins[index] * area
+                    key = (index, min(since_next, LEGUME_BREAK))
+                    best = following.get(key)
+                    if best is None or total > best[0]:
+                        following[key] = (total, state, index)
+            if not following:
+                return None
+            layers.append(following)
+            layer = following
+
+        state = max(layer, key=lambda key: layer[key][0])
+        path = []
+        for following, season in zip(reversed(layers), reversed(seasons)):
+            _, state_before, index = following[state]
+            path.append((index, season in fixed))
+            state = state_before
+        path.reverse()
+        return path
+
+    def solve(self, seasons, fixed=None):
+        # fixed: {(поле, сезон): id культури} - наявні плани.
+        # Повертає (призначення, поля без допустимої сівозміни)
+        fixed = fixed or {}
+        fixed_by_field = {}
+        for (field_id, season), crop_id in fixed.items():
+            index = self.crop_index.get(crop_id)
+            if index is not None:
+                fixed_by_field.setdefault(field_id, {})[season] = index
+
+        assignments = []
+        infeasible = []
+        for field_id, area in self.fields:
+            path = self.solve_field(field_id, area, seasons, fixed_by_field.get(field_id))
+            if path is None:
+                infeasible.append(field_id)
+                continue
+            margins = self.margins[field_id]
+            for season, (index, planned) in zip(seasons, path):
+                assignments.append(Assignment(field_id, season, self.crop_ids[index], area,
+                                              margins[index] * area, planned))
+        return assignments, infeasible
+
+
+# Культура наявних планів у сезонах (найбільша площа) для фіксації
+FIXED_PLANS = f"""SELECT field_id, season_year, crop_id, SUM(planned_area) AS area
+                  FROM planting_plans
+                  WHERE status IS NOT '{CANCELLED_STATUS}' AND season_year IN ({{seasons}})
+                        AND field_id IS NOT NULL AND crop_id IS NOT NULL
+                  GROUP BY field_id, season_year, crop_id
+                  ORDER BY area"""
+
+
+def fixed_plans(database, seasons):
+    placeholders = ", ".join("?" * len(seasons))
+    return {(field_id, season): crop_id for field_id, season, crop_id, _
+            in database.fetch_all(FIXED_PLANS.format(seasons=placeholders), seasons)}
+
+
+def optimize_rotation(start_season, count=3, prices=None, database=db):
+    seasons = next_seasons(start_season, count)
+    optimizer = RotationOptimizer.load(database, prices)
+    return optimizer.solve(seasons, fixed_plans(database, seasons))
+
+
+def apply_rotation(assignments, database=db):
+    # Нові призначення - плани посівів на всю площу поля (одна транзакція)
+    rows = [(a.field_id, a.crop_id, a.season_year, a.area, None, None, 'planned')
+            for a in assignments if not a.planned]
+    if rows:
+        database.insert_plans(rows)
+    return len(rows)
@@ -0,0 +1,126 @@
+import re
+
+# Повнотекстовий пошук (FTS5) за описами полів і культур, описами витрат
+# та примітками врожаю.
+# Індекс search_index підтримується тригерами. rowid запису в індексі
+# кодує джерело: id * SOURCE_COUNT + номер таблиці, тож оновлення й
+# видалення знаходять запис індексу за первинним ключем.
+
+# (таблиця, вираз тексту для індексу)
+SOURCES = [
+    ("fields", "TRIM(IFNULL({row}.name, '') || ' ' || IFNULL({row}.description, ''))"),
+    ("crops", "TRIM(IFNULL({row}.name, '') || ' ' || IFNULL({row}.description, ''))"),
+    ("expenses", "TRIM(IFNULL({row}.description, ''))"),
+    ("harvest", "TRIM(IFNULL({row}.notes, ''))"),
+]
+SOURCE_COUNT = len(SOURCES)
+# Колонки, зміна яких оновлює індекс
+SOURCE_COLUMNS = {
+    "fields": "name, description",
+    "crops": "name, description",
+    "expenses": "description",
+    "harvest": "notes",
+}
+
+# unicode61 з remove_diacritics: пошук без урахування регістру для кирилиці
+SEARCH_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    body, tokenize = 'unicode61 remove_diacritics 2')"""
+
+
+def _source_key(code, row):
+    return f"{row}.id * {SOURCE_COUNT} + {code}"
+
+
+def _index_row(code, text):
+    return f"""INSERT INTO search_index (rowid, body)
+               SELECT {_source_key(code, 'NEW')}, {text.format(row='NEW')}
+               WHERE {text.format(row='NEW')} != '';"""
+
+
+def _unindex_row(code):
+    return f"DELETE FROM search_index WHERE rowid = {_source_key(code, 'OLD')};"
+
+
+def _search_triggers():
+    triggers = []
+    for code, (table, text) in enumerate(SOURCES):
+        triggers += [
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table}
+            BEGIN
+                {_index_row(code, text)}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table}
+            BEGIN
+                {_unindex_row(code)}
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update
+            AFTER UPDATE OF {SOURCE_COLUMNS[table]} ON {table}
+            BEGIN
+                {_unindex_row(code)}
+                {_index_row(code, text)}
+            END""",
+        ]
+    return triggers
+
+
+SEARCH_TRIGGERS = _search_triggers()
+
+
+def rebuild_search_index(cursor):
+    cursor.execute("DELETE FROM search_index")
+    for code, (table, text) in enumerate(SOURCES):
+        expression = text.format(row=table)
+        cursor.execute(f"""INSERT INTO search_index (rowid, body)
+                           SELECT {_source_key(code, table)}, {expression}
+                           FROM {table} WHERE {expression} != ''""")
+    # Злиття сегментів індексу після масового заповнення
+    cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+
+def decode_rowid(rowid):
+    # rowid індексу -> (таблиця, id запису)
+    return SOURCES[rowid % SOURCE_COUNT][0], rowid // SOURCE_COUNT
+
+
+def match_query(text):
+    # Введений текст -> запит FTS5: усі слова обов'язкові, кожне - як
+    # префікс ("дрон" знаходить "дроном"); спецсимволи FTS5 не інтерпретуються
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+SEARCH_QUERY = """SELECT rowid, snippet(search_index, 0, '«', '»', '…', 12)
+                  FROM search_index WHERE search_index MATCH ?
+                  ORDER BY rank LIMIT ?"""
+
+# Короткий опис знайденого запису для списку результатів
+TITLE_QUERIES = {
+    "fields": "SELECT id, 'Поле: ' || name FROM fields WHERE id IN ({ids})",
+    "crops": "SELECT id, 'Культура: ' || name FROM crops WHERE id IN ({ids})",
+    "expenses": """SELECT e.id, 'Витрати ' || IFNULL(e.date, '') || ': ' || IFNULL(f.name, '--')
+                   FROM expenses e LEFT JOIN fields f ON e.field_id = f.id
+                   WHERE e.id IN ({ids})""",
+    "harvest": """SELECT h.id, 'Урожай ' || IFNULL(h.harvest_date, '') || ': ' || IFNULL(f.name, '--')
+                  FROM harvest h LEFT JOIN fields f ON h.field_id = f.id
+                  WHERE h.id IN ({ids})""",
+}
+
+
+def search(database, text, limit=50):
+    # Результати за релевантністю (bm25): [(таблиця, id, заголовок, фрагмент)]
+    query = match_query(text)
+    if not query:
+        return []
+    hits = [decode_rowid(rowid) + (snippet,)
+            for rowid, snippet in database.fetch_all(SEARCH_QUERY, (query, limit))]
+
+    titles = {}
+    for table in TITLE_QUERIES:
+        ids = [row_id for source, row_id, _ in hits if source == table]
+        if ids:
+            placeholders = ", ".join("?" * len(ids))
+            for row_id, title in database.fetch_all(
+                    TITLE_QUERIES[table].format(ids=placeholders), ids):
+                titles[table, row_id] = title
+    return [(table, row_id, titles.get((table, row_id), ""), snippet)
+            for table, row_id, snippet in hits]
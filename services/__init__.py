@@ -0,0 +1,16 @@
+# Сервісний шар доступу до даних без залежності від PyQt: репозиторії
+# повертають моделі (models.py) і використовуються інтерфейсом, імпортом
+# та скриптами. Спільні екземпляри працюють зі спільною базою database.db;
+# для іншої бази - FieldRepository(Database(path)) тощо.
+from services.base import Repository
+from services.fields import FieldRepository
+from services.crops import CropRepository
+from services.expenses import ExpenseRepository
+from services.harvests import HarvestRepository
+from services.plans import PlanRepository
+
+fields = FieldRepository()
+crops = CropRepository()
+expenses = ExpenseRepository()
+harvests = HarvestRepository()
+plans = PlanRepository()
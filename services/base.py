@@ -0,0 +1,92 @@
+from dataclasses import fields as dataclass_fields
+from itertools import starmap
+from typing import Generic, Iterable, Iterator, List, Optional, Type, TypeVar
+
+from database import db
+
+# Базовий репозиторій: записи однієї таблиці як dataclass з models.
+# Читання повертає моделі, запис іде через пакетні методи бази, тож
+# сповіщення про зміни (оновлення таблиць інтерфейсу, кеш довідників)
+# працюють так само, як і при записі з форм. Не залежить від PyQt:
+# використовується з інтерфейсу, імпорту, скриптів і бенчмарків.
+
+T = TypeVar("T")
+
+
+class Repository(Generic[T]):
+    table: str = ""
+    model: Type[T] = None
+    # Колонки, що записуються (без id та колонок зі значенням за замовчуванням)
+    columns = ()
+    # Сортування списку за замовчуванням
+    order = "id"
+
+    def __init__(self, database=db):
+        self.database = database
+        # Колонки моделі в порядку її полів
+        self.names = [field.name for field in dataclass_fields(self.model)]
+        self.select = ", ".join(self.names)
+
+    def from_row(self, row) -> T:
+        return self.model(*row)
+
+    def values(self, item: T) -> tuple:
+        return tuple(getattr(item, column) for column in self.columns)
+
+    def get(self, item_id) -> Optional[T]:
+        row = self.database.fetch_one(
+            f"SELECT {self.select} FROM {self.table} WHERE id = ?", (item_id,))
+        return None if row is None else self.from_row(row)
+
+    def query(self, where="", order=None, limit=None, offset=0) -> str:
+        # where - умови без WHERE, напр. "category = ?"
+        query = f"SELECT {self.select} FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order or self.order}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)} OFFSET {int(offset)}"
+        return query
+
+    def list(self, where="", params=(), order=None, limit=None, offset=0) -> List[T]:
+        rows = self.database.fetch_all(self.query(where, order, limit, offset), params)
+        # starmap викликає конструктор моделі без проміжного Python-циклу
+        return list(starmap(self.model, rows))
+
+    def iter(self, where="", params=(), order=None) -> Iterator[T]:
+        # Потокове читання великих таблиць порціями курсора
+        yield from starmap(self.model, self.database.iter_query(self.query(where, order), params))
+
+    def count(self, where="", params=()) -> int:
+        query = f"SELECT COUNT(*) FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        return self.database.fetch_one(query, params)[0]
+
+    def add(self, item: T) -> int:
+        # Повертає id нового запису
+        placeholders = ", ".join("?" * len(self.columns))
+        cursor = self.database.execute_query(
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})",
+            self.values(item))
+        return cursor.lastrowid
+
+    def add_many(self, items: Iterable[T]) -> int:
+        return self.add_rows([self.values(item) for item in items])
+
+    def add_rows(self, rows) -> int:
+        # Кортежі значень у порядку columns - без створення моделей
+        # (масовий імпорт); одна транзакція на виклик
+        return self.database.insert_many(self.table, self.columns, rows)
+
+    def update(self, item: T) -> int:
+        return self.database.update_many(self.table, self.columns,
+                                         [self.values(item) + (item.id,)])
+
+    def update_many(self, items: Iterable[T]) -> int:
+        return self.database.update_many(self.table, self.columns,
+                                         [self.values(item) + (item.id,) for item in items])
+
+    def delete(self, item_id) -> int:
+        return self.database.execute_query(
+            f"DELETE FROM {self.table} WHERE id = ?", (item_id,)).rowcount
@@ -0,0 +1,17 @@
+from typing import List
+
+from models import Crop
+from services.base import Repository
+
+
+class CropRepository(Repository[Crop]):
+    table = "crops"
+    model = Crop
+    columns = ("name", "category", "sowing_season", "harvest_period",
+               "average_yield", "description")
+    order = "name, id"
+
+    def by_category(self, category=None) -> List[Crop]:
+        if category is None:
+            return self.list()
+        return self.list("category = ?", (category,))
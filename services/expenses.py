@@ -0,0 +1,22 @@
+from typing import List, Tuple
+
+from database import EXPENSE_COLUMNS
+from models import Expense
+from queries import expense_conditions, expenses_stats_query
+from services.base import Repository
+
+
+class ExpenseRepository(Repository[Expense]):
+    table = "expenses"
+    model = Expense
+    columns = EXPENSE_COLUMNS
+    order = "date DESC, id DESC"
+
+    def find(self, expense_type=None, year=None, limit=None, offset=0) -> List[Expense]:
+        # Ті самі фільтри й порядок, що й у списку модуля витрат
+        conditions, params = expense_conditions(expense_type, year, alias="")
+        return self.list(" AND ".join(conditions), params, limit=limit, offset=offset)
+
+    def stats(self, expense_type=None, year=None) -> Tuple[float, int]:
+        # (загальна сума, кількість записів) зі зведеної таблиці
+        return self.database.fetch_one(*expenses_stats_query(expense_type, year))
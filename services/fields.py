@@ -0,0 +1,15 @@
+from typing import Tuple
+
+from models import Field
+from queries import FIELDS_STATS
+from services.base import Repository
+
+
+class FieldRepository(Repository[Field]):
+    table = "fields"
+    model = Field
+    columns = ("name", "area", "soil_type", "description")
+
+    def stats(self) -> Tuple[float, int]:
+        # (загальна площа, кількість полів)
+        return self.database.fetch_one(FIELDS_STATS)
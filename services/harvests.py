@@ -0,0 +1,21 @@
+from typing import List, Tuple
+
+from database import HARVEST_COLUMNS
+from models import Harvest
+from queries import harvest_conditions, harvests_stats_query
+from services.base import Repository
+
+
+class HarvestRepository(Repository[Harvest]):
+    table = "harvest"
+    model = Harvest
+    columns = HARVEST_COLUMNS
+    order = "harvest_date DESC, id DESC"
+
+    def find(self, year=None, limit=None, offset=0) -> List[Harvest]:
+        conditions, params = harvest_conditions(year, alias="")
+        return self.list(" AND ".join(conditions), params, limit=limit, offset=offset)
+
+    def stats(self, year=None) -> Tuple[float, float, int]:
+        # (загальний урожай, середня якість, кількість записів)
+        return self.database.fetch_one(*harvests_stats_query(year))
@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from database import PLAN_COLUMNS
+from models import PlantingPlan
+from services.base import Repository
+
+
+class PlanRepository(Repository[PlantingPlan]):
+    table = "planting_plans"
+    model = PlantingPlan
+    columns = PLAN_COLUMNS
+    order = "season_year DESC, id DESC"
+
+    def find(self, season_year=None, limit=None, offset=0) -> List[PlantingPlan]:
+        if not season_year:
+            return self.list(limit=limit, offset=offset)
+        return self.list("season_year = ?", (season_year,), limit=limit, offset=offset)
+
+    def free_area(self, field_id, season_year, plan_id=None) -> Optional[float]:
+        # Вільна площа поля в сезоні без урахування плану plan_id
+        return self.database.free_area(field_id, season_year, plan_id)
+
+    def season_overview(self, season_year) -> list:
+        # [(id поля, назва, площа, розподілено, вільно, планів)]
+        return self.database.season_overview(season_year)
+
+    def seasons(self) -> List[str]:
+        return self.database.plan_seasons()
@@ -3,7 +3,7 @@ from cx_Freeze import setup, Executable
 
 # Dependencies are automatically detected, but it might need fine tuning.
 build_exe_options = {
-    "packages": ["os", "PyQt6", "sqlite3", "pandas", "openpyxl"],
+    "packages": ["os", "PyQt6", "sqlite3", "pandas", "openpyxl", "reportlab"],
     "excludes": ["tkinter"],
     "include_files": []
 }
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import sys
+
+# Зведені таблиці витрат і врожаю.
+# Підсумки поле x культура x рік (x тип витрат) зберігаються окремо та
+# підтримуються тригерами при кожній вставці, зміні й видаленні записів,
+# тож звіти й статистика читають кількість груп, а не кількість записів.
+# Поля, культура, рік чи тип, яких немає в записі, зберігаються як 0 або ''.
+
+SUMMARY_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS expense_summary (
+        year INTEGER NOT NULL,
+        expense_type TEXT NOT NULL,
+        field_id INTEGER NOT NULL,
+        crop_id INTEGER NOT NULL,
+        total_cost REAL NOT NULL DEFAULT 0,
+        total_amount REAL NOT NULL DEFAULT 0,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, expense_type, field_id, crop_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS harvest_summary (
+        year INTEGER NOT NULL,
+        field_id INTEGER NOT NULL,
+        crop_id INTEGER NOT NULL,
+        total_yield REAL NOT NULL DEFAULT 0,
+        quality_sum REAL NOT NULL DEFAULT 0,
+        quality_count INTEGER NOT NULL DEFAULT 0,
+        moisture_sum REAL NOT NULL DEFAULT 0,
+        moisture_count INTEGER NOT NULL DEFAULT 0,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, field_id, crop_id)
+    ) WITHOUT ROWID
+    ''',
+]
+
+
+def _expense_keys(row):
+    return (f"IFNULL(CAST(substr({row}.date, 1, 4) AS INTEGER), 0), IFNULL({row}.expense_type, ''), "
+            f"IFNULL({row}.field_id, 0), IFNULL({row}.crop_id, 0)")
+
+
+def _harvest_keys(row):
+    return (f"IFNULL(CAST(substr({row}.harvest_date, 1, 4) AS INTEGER), 0), "
+            f"IFNULL({row}.field_id, 0), IFNULL({row}.crop_id, 0)")
+
+
+def _expense_add(row):
+    return f"""INSERT INTO expense_summary (year, expense_type, field_id, crop_id,
+                                         total_cost, total_amount, record_count)
+        VALUES ({_expense_keys(row)}, IFNULL({row}.total_cost, 0), IFNULL({row}.amount, 0), 1)
+        ON CONFLICT (year, expense_type, field_id, crop_id) DO UPDATE SET
+            total_cost = total_cost + excluded.total_cost,
+            total_amount = total_amount + excluded.total_amount,
+            record_count = record_count + 1;"""
+
+
+def _expense_remove(row):
+    return f"""UPDATE expense_summary SET
+            total_cost = total_cost - IFNULL({row}.total_cost, 0),
+            total_amount = total_amount - IFNULL({row}.amount, 0),
+            record_count = record_count - 1
+        WHERE (year, expense_type, field_id, crop_id) = ({_expense_keys(row)});
+        DELETE FROM expense_summary
+        WHERE (year, expense_type, field_id, crop_id) = ({_expense_keys(row)}) AND record_count <= 0;"""
+
+
+def _harvest_add(row):
+    return f"""INSERT INTO harvest_summary (year, field_id, crop_id, total_yield,
+                                         quality_sum, quality_count,
+                                         moisture_sum, moisture_count, record_count)
+        VALUES ({_harvest_keys(row)}, IFNULL({row}.actual_yield, 0),
+                IFNULL({row}.quality_rating, 0), {row}.quality_rating IS NOT NULL,
+                IFNULL({row}.moisture_content, 0), {row}.moisture_content IS NOT NULL, 1)
+        ON CONFLICT (year, field_id, crop_id) DO UPDATE SET
+            total_yield = total_yield + excluded.total_yield,
+            quality_sum = quality_sum + excluded.quality_sum,
+            quality_count = quality_count + excluded.quality_count,
+            moisture_sum = moisture_sum + excluded.moisture_sum,
+            moisture_count = moisture_count + excluded.moisture_count,
+            record_count = record_count + 1;"""
+
+
+def _harvest_remove(row):
+    return f"""UPDATE harvest_summary SET
+            total_yield = total_yield - IFNULL({row}.actual_yield, 0),
+            quality_sum = quality_sum - IFNULL({row}.quality_rating, 0),
+            quality_count = quality_count - ({row}.quality_rating IS NOT NULL),
+            moisture_sum = moisture_sum - IFNULL({row}.moisture_content, 0),
+            moisture_count = moisture_count - ({row}.moisture_content IS NOT NULL),
+            record_count = record_count - 1
+        WHERE (year, field_id, crop_id) = ({_harvest_keys(row)});
+        DELETE FROM harvest_summary
+        WHERE (year, field_id, crop_id) = ({_harvest_keys(row)}) AND record_count <= 0;"""
+
+
+SUMMARY_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_insert AFTER INSERT ON expenses
+    BEGIN
+        {_expense_add('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_delete AFTER DELETE ON expenses
+    BEGIN
+        {_expense_remove('OLD')}
+    END""",
+    # Лише зміни колонок, що входять у підсумки
+    f"""CREATE TRIGGER IF NOT EXISTS trg_expenses_summary_update
+    AFTER UPDATE OF field_id, crop_id, expense_type, amount, total_cost, date ON expenses
+    BEGIN
+        {_expense_remove('OLD')}
+        {_expense_add('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_harvest_summary_insert AFTER INSERT ON harvest
+    BEGIN
+        {_harvest_add('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_harvest_summary_delete AFTER DELETE ON harvest
+    BEGIN
+        {_harvest_remove('OLD')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_harvest_summary_update
+    AFTER UPDATE OF field_id, crop_id, actual_yield, harvest_date, quality_rating,
+                    moisture_content ON harvest
+    BEGIN
+        {_harvest_remove('OLD')}
+        {_harvest_add('NEW')}
+    END""",
+]
+
+# Підсумки, пораховані заново з вихідних таблиць
+EXPENSE_SUMMARY_SOURCE = f"""
+    SELECT {_expense_keys('expenses')}, SUM(IFNULL(total_cost, 0)),
+           SUM(IFNULL(amount, 0)), COUNT(*)
+    FROM expenses GROUP BY 1, 2, 3, 4"""
+
+HARVEST_SUMMARY_SOURCE = f"""
+    SELECT {_harvest_keys('harvest')}, SUM(IFNULL(actual_yield, 0)),
+           SUM(IFNULL(quality_rating, 0)), COUNT(quality_rating),
+           SUM(IFNULL(moisture_content, 0)), COUNT(moisture_content), COUNT(*)
+    FROM harvest GROUP BY 1, 2, 3"""
+
+# (таблиця, ключові колонки, колонки значень, запит до вихідних даних)
+SUMMARIES = [
+    ("expense_summary", ("year", "expense_type", "field_id", "crop_id"),
+     ("total_cost", "total_amount", "record_count"), EXPENSE_SUMMARY_SOURCE),
+    ("harvest_summary", ("year", "field_id", "crop_id"),
+     ("total_yield", "quality_sum", "quality_count", "moisture_sum",
+      "moisture_count", "record_count"), HARVEST_SUMMARY_SOURCE),
+]
+
+# Допуск для сум REAL: інкрементне додавання й віднімання накопичує
+# похибку округлення
+TOLERANCE_DIGITS = 6
+
+
+def rebuild_summaries(cursor, summaries=SUMMARIES):
+    # Повний перерахунок зведених таблиць з вихідних даних
+    for table, keys, values, source in summaries:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table} ({', '.join(keys + values)}) {source}")
+
+
+def check_summaries(conn, summaries=SUMMARIES):
+    # Перевірка узгодженості: повертає {таблиця: кількість розбіжних груп}
+    # лише для таблиць з розбіжностями
+    problems = {}
+    for table, keys, values, source in summaries:
+        columns = [f"c{i}" for i in range(len(keys) + len(values))]
+        rounded = ", ".join(columns[:len(keys)]
+                            + [f"ROUND({c}, {TOLERANCE_DIGITS})" for c in columns[len(keys):]])
+        mismatched = conn.execute(
+            f"""WITH expected({', '.join(columns)}) AS ({source}),
+                     actual({', '.join(columns)}) AS (
+                         SELECT {', '.join(keys + values)} FROM {table})
+                SELECT (SELECT COUNT(*) FROM (SELECT {rounded} FROM expected
+                                              EXCEPT SELECT {rounded} FROM actual))
+                     + (SELECT COUNT(*) FROM (SELECT {rounded} FROM actual
+                                              EXCEPT SELECT {rounded} FROM expected))""").fetchone()[0]
+        if mismatched:
+            problems[table] = mismatched
+    return problems
+
+
+def main(argv):
+    rebuild = "--rebuild" in argv
+    paths = [arg for arg in argv if not arg.startswith("--")]
+    db_path = paths[0] if paths else "agrofarm.db"
+    if not os.path.exists(db_path):
+        print(f"Базу даних не знайдено: {db_path}")
+        return 1
+
+    conn = sqlite3.connect(db_path)
+    try:
+        if rebuild:
+            with conn:
+                rebuild_summaries(conn.cursor())
+            print("Зведені таблиці перераховано")
+        problems = check_summaries(conn)
+        for table, count in problems.items():
+            print(f"{table}: розбіжних груп - {count}")
+        if not problems:
+            print("Зведені таблиці узгоджені з даними")
+    finally:
+        conn.close()
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
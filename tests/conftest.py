@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Тести працюють з окремою тимчасовою базою: шлях задається до імпорту
+# database, який відкриває спільний екземпляр db
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["AGROFARM_DB"] = os.path.join(tempfile.mkdtemp(prefix="agrofarm_tests_"), "test.db")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,21 @@
+from database import db
+from models import Field, PlantingPlan
+from services import fields, plans
+
+
+def test_deleting_field_removes_its_plans_and_allocation():
+    field_id = fields.add(Field(name="Видалене поле", area=10))
+    plans.add(PlantingPlan(field_id=field_id, season_year="2031", planned_area=4))
+
+    fields.delete(field_id)
+
+    assert db.fetch_all("SELECT id FROM planting_plans WHERE field_id = ?", (field_id,)) == []
+    assert db.fetch_all("SELECT * FROM field_allocation WHERE field_id = ?", (field_id,)) == []
+
+
+def test_seasons_include_seasons_with_only_cancelled_plans():
+    field_id = fields.add(Field(name="Поле", area=10))
+    plans.add(PlantingPlan(field_id=field_id, season_year="2032", planned_area=4,
+                           status="cancelled"))
+
+    assert "2032" in plans.seasons()
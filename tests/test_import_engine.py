@@ -0,0 +1,20 @@
+import csv
+
+from import_engine import import_file, rejected_path_for
+
+
+def test_rejected_rows_keep_file_line_numbers_after_leading_blank_rows(tmp_path):
+    path = tmp_path / "expenses.csv"
+    path.write_text("\n\n"
+                    "Тип;Сума;Дата\n"
+                    "fuel;100;2024-05-01\n"
+                    "\n"
+                    "fuel;не число;2024-05-02\n"
+                    "seeds;50;\n", encoding="utf-8")
+
+    progress = list(import_file("Витрати", str(path)))[-1]
+
+    assert (progress.read, progress.imported, progress.rejected) == (3, 1, 2)
+    with open(rejected_path_for(str(path)), encoding="utf-8-sig", newline="") as f:
+        rejected = list(csv.reader(f, delimiter=";"))
+    assert [row[0] for row in rejected[1:]] == ["6", "7"]
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+
+@pytest.fixture
+def app():
+    from PyQt6.QtWidgets import QApplication
+    from ui.query_runner import query_runner
+
+    app = QApplication.instance() or QApplication([])
+    yield app
+    query_runner.wait()
+    app.processEvents()
+
+
+def test_signal_handlers_of_module_built_while_disabled_are_measured(app):
+    from modules.expenses import ExpensesModule
+    from ui.latency import latency_monitor
+
+    latency_monitor.set_enabled(False)
+    latency_monitor.clear()
+    module = latency_monitor.instrument(ExpensesModule)()
+    try:
+        latency_monitor.set_enabled(True)
+        # currentTextChanged(str) -> load_expenses(self): зайвий аргумент
+        # сигналу відкидається обгорткою
+        module.year_combo.setCurrentIndex(1)
+        assert "ExpensesModule.load_expenses" in latency_monitor.series
+    finally:
+        latency_monitor.set_enabled(False)
@@ -0,0 +1,15 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from database import db
+
+
+class ChangeNotifier(QObject):
+    # Передає сповіщення бази даних про зміни рядків у GUI-потік
+    # (запис може виконуватися і з фонового потоку, напр. при імпорті)
+    changed = pyqtSignal(str, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        db.add_listener(self.changed.emit)
+
+
+change_notifier = ChangeNotifier()
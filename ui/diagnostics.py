@@ -0,0 +1,169 @@
+from datetime import datetime
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QDoubleSpinBox,
+                             QLabel, QPushButton, QTabWidget, QTableWidget, QTableWidgetItem,
+                             QPlainTextEdit, QSplitter, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QTimer
+from database import db
+from profiler import QueryProfiler, DEFAULT_THRESHOLD_MS, QUERY_LOG
+
+
+def _item(value):
+    item = QTableWidgetItem()
+    # Числа - через DisplayRole, щоб сортування було числовим
+    item.setData(Qt.ItemDataRole.DisplayRole, value)
+    return item
+
+
+class DiagnosticsDialog(QDialog):
+    # Панель діагностики запитів: увімкнення профайлера, останні й повільні
+    # запити з планом виконання, підсумки за текстом запиту.
+    # Профайлер пише з робочих потоків, панель лише періодично читає знімок.
+    REFRESH_MS = 1000
+    RECENT_HEADERS = ["Час", "мс", "Рядків", "Джерело", "Запит"]
+    TOTAL_HEADERS = ["Викликів", "Сумарно, мс", "Середнє, мс", "Макс, мс", "Рядків", "Запит"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Діагностика запитів")
+        self.resize(1000, 600)
+        self.init_ui()
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.update_state()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.enabled_check = QCheckBox("Профілювання запитів")
+        self.enabled_check.setChecked(db.profiler is not None)
+        self.enabled_check.toggled.connect(self.toggle_profiler)
+        controls.addWidget(self.enabled_check)
+        controls.addWidget(QLabel("Поріг повільного запиту:"))
+        self.threshold_spin = QDoubleSpinBox()
+        self.threshold_spin.setRange(0, 60000)
+        self.threshold_spin.setSuffix(" мс")
+        self.threshold_spin.setValue(db.profiler.threshold_ms if db.profiler
+                                     else DEFAULT_THRESHOLD_MS)
+        self.threshold_spin.valueChanged.connect(self.set_threshold)
+        controls.addWidget(self.threshold_spin)
+        controls.addStretch()
+        self.clear_btn = QPushButton("Очистити")
+        self.clear_btn.clicked.connect(self.clear)
+        controls.addWidget(self.clear_btn)
+        layout.addLayout(controls)
+
+        self.tabs = QTabWidget()
+        self.recent_table = self.create_table(self.RECENT_HEADERS)
+        self.tabs.addTab(self.recent_table, "Останні")
+
+        # Повільні запити: список і план виконання вибраного
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.slow_table = self.create_table(self.RECENT_HEADERS)
+        self.slow_table.itemSelectionChanged.connect(self.show_plan)
+        splitter.addWidget(self.slow_table)
+        self.plan_text = QPlainTextEdit()
+        self.plan_text.setReadOnly(True)
+        splitter.addWidget(self.plan_text)
+        self.tabs.addTab(splitter, "Повільні")
+
+        self.totals_table = self.create_table(self.TOTAL_HEADERS)
+        self.tabs.addTab(self.totals_table, "Підсумки")
+        layout.addWidget(self.tabs)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+        self.slow_records = []
+
+    @staticmethod
+    def create_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def toggle_profiler(self, enabled):
+        if enabled:
+            db.set_profiler(QueryProfiler(self.threshold_spin.value(), QUERY_LOG))
+        else:
+            db.set_profiler(None)
+        self.update_state()
+
+    def set_threshold(self, value):
+        if db.profiler is not None:
+            db.profiler.threshold_ms = value
+
+    def clear(self):
+        if db.profiler is not None:
+            db.profiler.clear()
+        self.refresh()
+
+    def update_state(self):
+        if db.profiler is not None:
+            self.timer.start()
+        else:
+            self.timer.stop()
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_state()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        profiler = db.profiler
+        if profiler is None:
+            self.status_label.setText("Профілювання вимкнене")
+            return
+        records, slow, totals = profiler.snapshot()
+        self.fill_records(self.recent_table, reversed(records))
+        # Вибраний повільний запит залишається вибраним після оновлення
+        if len(slow) != len(self.slow_records):
+            self.slow_records = list(reversed(slow))
+            self.fill_records(self.slow_table, self.slow_records)
+        self.fill_totals(sorted(totals, key=lambda row: row[2], reverse=True))
+        self.status_label.setText(f"Запитів: {sum(row[1] for row in totals)} | "
+                                  f"повільних: {len(slow)} | журнал: {profiler.log_path or '-'}")
+
+    def fill_records(self, table, records):
+        records = list(records)
+        table.setSortingEnabled(False)
+        table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            values = [datetime.fromtimestamp(record.started).strftime("%H:%M:%S.%f")[:-3],
+                      round(record.ms, 2), record.rows, record.caller, record.query]
+            for column, value in enumerate(values):
+                table.setItem(row, column, _item(value))
+
+    def fill_totals(self, totals):
+        table = self.totals_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(totals))
+        for row, (query, count, total, peak, rows) in enumerate(totals):
+            values = [count, round(total, 2), round(total / count, 2), round(peak, 2), rows, query]
+            for column, value in enumerate(values):
+                table.setItem(row, column, _item(value))
+        table.setSortingEnabled(True)
+
+    def show_plan(self):
+        rows = self.slow_table.selectionModel().selectedRows()
+        if not rows or rows[0].row() >= len(self.slow_records):
+            self.plan_text.clear()
+            return
+        record = self.slow_records[rows[0].row()]
+        self.plan_text.setPlainText(
+            f"{record.query}\n\nПараметри: {record.params!r}\n"
+            f"Джерело: {record.caller} [{record.thread}]\n"
+            f"Час: {record.ms:.2f} мс, рядків: {record.rows}\n\nПлан:\n"
+            + "\n".join(record.plan or ["-"]))
@@ -0,0 +1,65 @@
+import os
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from PyQt6.QtCore import Qt
+from export_engine import FILE_FILTERS, safe_filename
+from ui.query_runner import query_runner
+
+
+def ask_export_path(parent, name):
+    path, selected_filter = QFileDialog.getSaveFileName(
+        parent, "Експорт", os.path.join("exports", f"{safe_filename(name)}.xlsx"), FILE_FILTERS)
+    if path and not os.path.splitext(path)[1]:
+        path += ".csv" if "csv" in selected_filter else ".xlsx"
+    return path
+
+
+class ExportProgress(QProgressDialog):
+    # Виконує експорт (генератор прогресу з export_engine) у фоновому
+    # потоці, показує кількість записаних рядків і дозволяє скасування
+    def __init__(self, parent, path, export):
+        super().__init__("Експорт...", "Скасувати", 0, 0, parent)
+        self.setWindowTitle("Експорт")
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(300)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.path = path
+        self.canceled.connect(self.cancel_export)
+        query_runner.submit(export, self.finish, self.fail, key=self,
+                            on_chunk=self.update_progress)
+
+    def update_progress(self, progress):
+        written, total = progress
+        if total:
+            self.setMaximum(total)
+            self.setValue(min(written, total))
+            self.setLabelText(f"Записано рядків: {written} з {total}")
+        else:
+            self.setLabelText(f"Записано рядків: {written}")
+
+    def cancel_export(self):
+        query_runner.cancel(self)
+        self.dispose()
+
+    def dispose(self):
+        # hide, а не close: закриття QProgressDialog надсилає canceled
+        self.hide()
+        self.deleteLater()
+
+    def finish(self, _):
+        self.dispose()
+        QMessageBox.information(self.parentWidget(), "Експорт завершено",
+                                f"Дані збережено у файл:\n{self.path}")
+
+    def fail(self, message):
+        self.dispose()
+        QMessageBox.warning(self.parentWidget(), "Помилка",
+                            f"Не вдалося виконати експорт: {message}")
+
+
+def start_export(parent, name, make_export):
+    # make_export(path) -> генератор прогресу, напр. export_table(name, path)
+    path = ask_export_path(parent, name)
+    if not path:
+        return None
+    return ExportProgress(parent, path, lambda: make_export(path))
@@ -0,0 +1,44 @@
+from PyQt6.QtWidgets import QFileDialog, QMessageBox
+from import_engine import FILE_FILTERS, import_file
+from ui.export_progress import ExportProgress
+
+
+class ImportProgress(ExportProgress):
+    # Той самий діалог прогресу зі скасуванням, але для імпорту:
+    # показує прочитані, додані й відхилені рядки та швидкість
+    def __init__(self, parent, path, run):
+        super().__init__(parent, path, run)
+        # Результати надходять через чергу подій GUI-потоку, тобто вже після __init__
+        self.last = None
+        self.setWindowTitle("Імпорт")
+        self.setLabelText("Імпорт...")
+
+    def update_progress(self, progress):
+        self.last = progress
+        speed = progress.read / progress.elapsed if progress.elapsed else 0
+        self.setLabelText(f"Прочитано: {progress.read} | Додано: {progress.imported} | "
+                          f"Відхилено: {progress.rejected}\n{speed:,.0f} рядків/с")
+
+    def finish(self, _):
+        self.dispose()
+        progress = self.last
+        if progress is None:
+            return
+        message = (f"Додано записів: {progress.imported}\n"
+                   f"Відхилено: {progress.rejected}\n"
+                   f"Час: {progress.elapsed:.1f} с")
+        if progress.rejected_path:
+            message += f"\n\nВідхилені рядки з причинами:\n{progress.rejected_path}"
+        QMessageBox.information(self.parentWidget(), "Імпорт завершено", message)
+
+    def fail(self, message):
+        self.dispose()
+        QMessageBox.warning(self.parentWidget(), "Помилка",
+                            f"Не вдалося виконати імпорт: {message}")
+
+
+def start_import(parent, name):
+    path, _ = QFileDialog.getOpenFileName(parent, f"Імпорт: {name}", "", FILE_FILTERS)
+    if not path:
+        return None
+    return ImportProgress(parent, path, lambda: import_file(name, path))
@@ -0,0 +1,191 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from ui.query_runner import query_runner
+
+# Монітор затримок GUI-потоку (вмикається змінною оточення AGROFARM_LATENCY
+# або в меню "Сервіс").
+# - Затримка циклу подій: таймер з інтервалом SAMPLE_MS; наскільки пізніше
+#   за очікуване він спрацював - стільки GUI-потік був зайнятий.
+# - Обробники load_* і show_* модулів: синхронний час у GUI-потоці та
+#   повний час від виклику до завершення фонових запитів і відмалювання
+#   результату (запит, побудова моделі, рендер).
+# Перцентилі p50/p95/p99 показуються в рядку стану, а події можна
+# експортувати у файл трасування (формат Chrome Trace Event: chrome://tracing,
+# Perfetto).
+
+SAMPLE_MS = 50
+# Скільки останніх значень кожної серії враховувати в перцентилях
+WINDOW = 1000
+MAX_EVENTS = 100000
+HANDLER_PREFIXES = ("load_", "show_")
+
+
+def positional_limit(func):
+    # Скільки позиційних аргументів приймає func (None - є *args)
+    parameters = inspect.signature(func).parameters.values()
+    if any(p.kind is p.VAR_POSITIONAL for p in parameters):
+        return None
+    return sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
+
+
+def percentiles(values, points=(50, 95, 99)):
+    # Перцентилі методом найближчого рангу; None для порожньої серії
+    values = sorted(values)
+    if not values:
+        return [None] * len(points)
+    return [values[min(len(values) - 1, max(0, -(-len(values) * p // 100) - 1))]
+            for p in points]
+
+
+class LatencyMonitor(QObject):
+    enabled_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(SAMPLE_MS)
+        self._timer.timeout.connect(self._sample)
+        self._expected = None
+        # Серія -> останні значення, мс
+        self.series = {}
+        # Події трасування (Chrome Trace Event)
+        self.events = deque(maxlen=MAX_EVENTS)
+        self._origin = time.perf_counter()
+        # Обробники, що чекають завершення фонових запитів: [(назва, початок)]
+        self._pending = []
+        self._depth = 0
+        query_runner.busy_changed.connect(self._on_busy_changed)
+
+    def set_enabled(self, enabled):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self._pending = []
+        if enabled:
+            self._expected = time.perf_counter() + SAMPLE_MS / 1000
+            self._timer.start()
+        else:
+            self._timer.stop()
+        self.enabled_changed.emit(enabled)
+
+    def clear(self):
+        self.series = {}
+        self.events.clear()
+        self._pending = []
+
+    def add(self, name, ms):
+        values = self.series.get(name)
+        if values is None:
+            values = self.series[name] = deque(maxlen=WINDOW)
+        values.append(ms)
+
+    def _trace(self, name, category, start, seconds):
+        self.events.append({"name": name, "cat": category, "ph": "X",
+                            "ts": round((start - self._origin) * 1e6),
+                            "dur": round(seconds * 1e6), "pid": os.getpid(),
+                            "tid": threading.get_ident()})
+
+    def _sample(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self._expected)
+        self._expected = now + SAMPLE_MS / 1000
+        self.add("loop", lag * 1000)
+        if lag * 1000 >= SAMPLE_MS:
+            # У трасуванні - лише помітні блокування циклу подій
+            self._trace("event loop blocked", "loop", now - lag, lag)
+
+    def instrument(self, cls, prefixes=HANDLER_PREFIXES):
+        # Обгортає методи класу з префіксами prefixes до створення
+        # екземплярів, тож виміряються і виклики через сигнали, підключені
+        # в конструкторі - зокрема модулів, створених з вимкненим монітором
+        # (обгортка тоді лише викликає метод). Повторний виклик для того
+        # самого класу нічого не робить
+        for attribute, value in list(vars(cls).items()):
+            if (attribute.startswith(prefixes) and inspect.isfunction(value)
+                    and not getattr(value, "_latency_wrapped", False)):
+                setattr(cls, attribute, self._wrap(f"{cls.__name__}.{attribute}", value))
+        return cls
+
+    def _wrap(self, name, func):
+        # Як і PyQt для слота без обгортки, зайві позиційні аргументи сигналу
+        # (напр. текст currentTextChanged для load_expenses(self))
+        # відкидаються
+        limit = positional_limit(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if limit is not None:
+                args = args[:limit]
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            self._depth += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                seconds = time.perf_counter() - start
+                self.add(name, seconds * 1000)
+                self._trace(name, "handler", start, seconds)
+                # Повний час - для зовнішнього обробника (вкладені load_*
+                # входять до нього)
+                if self._depth == 0:
+                    self._finish_later(name, start)
+        wrapper._latency_wrapped = True
+        return wrapper
+
+    def _finish_later(self, name, start):
+        self._pending.append((name, start))
+        if not query_runner.is_busy():
+            QTimer.singleShot(0, self._finish_pending)
+
+    def _on_busy_changed(self, busy):
+        if not busy and self._pending:
+            # Після обробки результатів і відмалювання
+            QTimer.singleShot(0, self._finish_pending)
+
+    def _finish_pending(self):
+        if query_runner.is_busy():
+            return
+        now = time.perf_counter()
+        pending, self._pending = self._pending, []
+        for name, start in pending:
+            self.add(f"{name} (повний)", (now - start) * 1000)
+            self._trace(name, "end-to-end", start, now - start)
+
+    def summary(self, name="loop"):
+        # (p50, p95, p99) серії, мс
+        return percentiles(self.series.get(name, ()))
+
+    def report(self):
+        # [(серія, кількість, p50, p95, p99, макс)] - найповільніші за p95 першими
+        rows = []
+        for name, values in self.series.items():
+            p50, p95, p99 = percentiles(values)
+            rows.append((name, len(values), p50, p95, p99, max(values)))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def export_trace(self, path):
+        # Файл трасування з подіями та підсумками перцентилів
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": list(self.events),
+                "displayTimeUnit": "ms",
+                "otherData": {"percentiles_ms": {
+                    name: {"count": count, "p50": p50, "p95": p95, "p99": p99, "max": peak}
+                    for name, count, p50, p95, p99, peak in self.report()}},
+            }, f, ensure_ascii=False)
+        return len(self.events)
+
+
+# Спільний монітор для головного вікна й модулів
+latency_monitor = LatencyMonitor()
+latency_monitor.set_enabled(os.environ.get("AGROFARM_LATENCY", "") not in ("", "0"))
@@ -5,92 +5,32 @@ from PyQt6.QtGui import *
 # Імпорт модулів
 import sys
 import os
+import importlib
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modules.fields import FieldsModule
-from modules.crops import CropsModule
-from modules.expenses import ExpensesModule
-from modules.harvest import HarvestModule
-from modules.reports import ReportsModule
-from database import db
-
-class AddPlantingDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle("Додати план посіву")
-        self.setFixedWidth(400)
-        
-        layout = QFormLayout()
-        
-        # Отримання списків полів і культур
-        fields = db.fetch_all("SELECT id, name FROM fields ORDER BY name")
-        crops = db.fetch_all("SELECT id, name FROM crops ORDER BY name")
-        
-        self.field_combo = QComboBox()
-        for field in fields:
-            self.field_combo.addItem(field[1], field[0])
-        layout.addRow("Поле:", self.field_combo)
-        
-        self.crop_combo = QComboBox()
-        for crop in crops:
-            self.crop_combo.addItem(crop[1], crop[0])
-        layout.addRow("Культура:", self.crop_combo)
-        
-        self.season_combo = QComboBox()
-        self.season_combo.addItems(["2024-2025", "2023-2024", "2022-2023"])
-        layout.addRow("Сезон/Рік:", self.season_combo)
-        
-        self.area_input = QLineEdit()
-        layout.addRow("Площа (га):", self.area_input)
-        
-        self.sowing_date = QDateEdit()
-        self.sowing_date.setCalendarPopup(True)
-        self.sowing_date.setDate(QDate.currentDate())
-        layout.addRow("Дата посіву:", self.sowing_date)
-        
-        self.status_combo = QComboBox()
-        self.status_combo.addItems(["planned", "in_progress", "completed", "cancelled"])
-        layout.addRow("Статус:", self.status_combo)
-        
-        button_layout = QHBoxLayout()
-        save_btn = QPushButton("Зберегти")
-        save_btn.clicked.connect(self.save_planning)
-        cancel_btn = QPushButton("Скасувати")
-        cancel_btn.clicked.connect(self.reject)
-        
-        button_layout.addWidget(save_btn)
-        button_layout.addWidget(cancel_btn)
-        layout.addRow(button_layout)
-        
-        self.setLayout(layout)
-    
-    def save_planning(self):
-        try:
-            area = float(self.area_input.text())
-            
-            db.execute_query(
-                """INSERT INTO planting_plans 
-                   (field_id, crop_id, season_year, planned_area, 
-                    sowing_date, status) 
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (self.field_combo.currentData(),
-                 self.crop_combo.currentData(),
-                 self.season_combo.currentText(),
-                 area,
-                 self.sowing_date.date().toString("yyyy-MM-dd"),
-                 self.status_combo.currentText())
-            )
-            
-            self.accept()
-        except ValueError:
-            QMessageBox.warning(self, "Помилка", "Введіть коректну площу")
+from ui.query_runner import query_runner
+from ui.export_progress import start_export
+from ui.import_progress import start_import
+from ui.search_box import SearchBox
+from ui.latency import latency_monitor
+from import_engine import IMPORTS
+from export_engine import EXPORTS, export_table
 
 class MainWindow(QMainWindow):
+    # Модулі створюються (та імпортуються) лише при першому переході до них:
+    # (назва, модуль Python, клас, атрибут вікна)
+    MODULES = [
+        ("Поля", "modules.fields", "FieldsModule", "fields_module"),
+        ("Культури", "modules.crops", "CropsModule", "crops_module"),
+        ("Витрати", "modules.expenses", "ExpensesModule", "expenses_module"),
+        ("Урожайність", "modules.harvest", "HarvestModule", "harvest_module"),
+        ("Звіти", "modules.reports", "ReportsModule", "reports_module"),
+        ("Планування", "modules.planning", "PlanningModule", "planning_module"),
+    ]
+    
     def __init__(self):
         super().__init__()
+        self.diagnostics = None
         self.init_ui()
         
     def init_ui(self):
@@ -107,6 +47,10 @@ class MainWindow(QMainWindow):
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(title_label)
         
+        self.search_box = SearchBox()
+        self.search_box.result_activated.connect(self.open_record)
+        main_layout.addWidget(self.search_box)
+        
         nav_layout = QHBoxLayout()
         
         self.fields_btn = QPushButton("📌 Поля")
@@ -130,18 +74,8 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(nav_layout)
         
         self.stacked_widget = QStackedWidget()
-        
-        self.fields_module = FieldsModule()
-        self.crops_module = CropsModule()
-        self.expenses_module = ExpensesModule()
-        self.harvest_module = HarvestModule()
-        self.reports_module = ReportsModule()
-        
-        self.stacked_widget.addWidget(self.fields_module)
-        self.stacked_widget.addWidget(self.crops_module)
-        self.stacked_widget.addWidget(self.expenses_module)
-        self.stacked_widget.addWidget(self.harvest_module)
-        self.stacked_widget.addWidget(self.reports_module)
+        for _, _, _, attribute in self.MODULES:
+            setattr(self, attribute, None)
         
         main_layout.addWidget(self.stacked_widget)
         
@@ -150,7 +84,7 @@ class MainWindow(QMainWindow):
         self.expenses_btn.clicked.connect(lambda: self.switch_module(2))
         self.harvest_btn.clicked.connect(lambda: self.switch_module(3))
         self.reports_btn.clicked.connect(lambda: self.switch_module(4))
-        self.planning_btn.clicked.connect(self.show_planning_dialog)
+        self.planning_btn.clicked.connect(lambda: self.switch_module(5))
         
         central_widget.setLayout(main_layout)
         
@@ -158,22 +92,138 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Готово")
         
+        # Індикатор фонових запитів до бази
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.setVisible(False)
+        self.status_bar.addPermanentWidget(self.busy_indicator)
+        query_runner.busy_changed.connect(self.busy_indicator.setVisible)
+        query_runner.error.connect(
+            lambda message: self.status_bar.showMessage(f"Помилка запиту: {message}", 5000))
+        
+        # Затримки GUI-потоку (ui.latency), коли монітор увімкнено
+        self.latency_label = QLabel()
+        self.status_bar.addPermanentWidget(self.latency_label)
+        self.latency_timer = QTimer(self)
+        self.latency_timer.setInterval(1000)
+        self.latency_timer.timeout.connect(self.update_latency)
+        latency_monitor.enabled_changed.connect(self.on_latency_enabled)
+        self.on_latency_enabled(latency_monitor.enabled)
+        
         self.create_menu()
         self.switch_module(0)
     
     def create_menu(self):
         menubar = self.menuBar()
         file_menu = menubar.addMenu("Файл")
+        
+        # Експорт таблиць у Excel/CSV
+        export_menu = file_menu.addMenu("Експорт")
+        for name in EXPORTS:
+            action = QAction(name, self)
+            action.triggered.connect(lambda checked=False, name=name: self.export_table(name))
+            export_menu.addAction(action)
+        
+        # Масовий імпорт витрат і врожаю з CSV/Excel
+        import_menu = file_menu.addMenu("Імпорт")
+        for name in IMPORTS:
+            action = QAction(name, self)
+            action.triggered.connect(lambda checked=False, name=name: start_import(self, name))
+            import_menu.addAction(action)
+        file_menu.addSeparator()
+        
         exit_action = QAction("Вихід", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
+        
+        tools_menu = menubar.addMenu("Сервіс")
+        diagnostics_action = QAction("Діагностика запитів", self)
+        diagnostics_action.triggered.connect(self.show_diagnostics)
+        tools_menu.addAction(diagnostics_action)
+        tools_menu.addSeparator()
+        
+        self.latency_action = QAction("Монітор затримок інтерфейсу", self)
+        self.latency_action.setCheckable(True)
+        self.latency_action.setChecked(latency_monitor.enabled)
+        self.latency_action.toggled.connect(latency_monitor.set_enabled)
+        tools_menu.addAction(self.latency_action)
+        trace_action = QAction("Експорт трасування...", self)
+        trace_action.triggered.connect(self.export_trace)
+        tools_menu.addAction(trace_action)
+    
+    def show_diagnostics(self):
+        # Одне немодальне вікно: профілювання триває, поки працюєш з модулями
+        if self.diagnostics is None:
+            from ui.diagnostics import DiagnosticsDialog
+            self.diagnostics = DiagnosticsDialog(self)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+    
+    def on_latency_enabled(self, enabled):
+        self.latency_label.setVisible(enabled)
+        if enabled:
+            self.latency_timer.start()
+            self.update_latency()
+        else:
+            self.latency_timer.stop()
+    
+    def update_latency(self):
+        p50, p95, p99 = latency_monitor.summary()
+        if p50 is None:
+            self.latency_label.setText("UI: вимірювання...")
+            return
+        text = f"UI: p50 {p50:.0f} / p95 {p95:.0f} / p99 {p99:.0f} мс"
+        # Найповільніший обробник за p95
+        handlers = [row for row in latency_monitor.report() if row[0] != "loop"]
+        if handlers:
+            name, _, _, slowest, _, _ = handlers[0]
+            text += f" | {name}: p95 {slowest:.0f} мс"
+        self.latency_label.setText(text)
+    
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Експорт трасування", os.path.join("reports", "ui_trace.json"),
+            "Trace JSON (*.json)")
+        if not path:
+            return
+        try:
+            count = latency_monitor.export_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Помилка", f"Не вдалося зберегти файл:\n{e}")
+            return
+        self.status_bar.showMessage(f"Трасування збережено: {path} ({count} подій)", 5000)
+    
+    def export_table(self, name):
+        start_export(self, name, lambda path: export_table(name, path))
+    
+    def get_module(self, index):
+        title, module_name, class_name, attribute = self.MODULES[index]
+        module = getattr(self, attribute)
+        if module is None:
+            module_class = getattr(importlib.import_module(module_name), class_name)
+            # Вимірювання load_*/show_* - до створення, щоб врахувати й
+            # завантаження в конструкторі та сигнали, підключені в ньому
+            module = latency_monitor.instrument(module_class)()
+            setattr(self, attribute, module)
+            self.stacked_widget.addWidget(module)
+        return module
     
     def switch_module(self, index):
-        self.stacked_widget.setCurrentIndex(index)
-        modules = ["Поля", "Культури", "Витрати", "Урожайність", "Звіти"]
-        self.status_bar.showMessage(f"Модуль: {modules[index]}")
+        self.stacked_widget.setCurrentWidget(self.get_module(index))
+        self.status_bar.showMessage(f"Модуль: {self.MODULES[index][0]}")
     
-    def show_planning_dialog(self):
-        dialog = AddPlantingDialog(self)
-        if dialog.exec():
-            QMessageBox.information(self, "Успіх", "План посіву додано")
\ No newline at end of file
+    def open_record(self, table, row_id):
+        # Перехід до модуля знайденого запису та виділення рядка, якщо він
+        # уже завантажений у таблицю
+        index = {"fields": 0, "crops": 1, "expenses": 2, "harvest": 3}.get(table)
+        if index is None:
+            return
+        self.switch_module(index)
+        module = self.get_module(index)
+        row = module.model.find_row(row_id)
+        if row >= 0:
+            module.table.selectRow(row)
+            module.table.scrollTo(module.model.index(row, 0))
+        else:
+            self.status_bar.showMessage(f"Запис №{row_id} ще не завантажено в таблицю", 5000)
@@ -0,0 +1,179 @@
+import threading
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from database import db
+from profiler import caller_name, query_source
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+    chunk = pyqtSignal(object, object)
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, func, signals, streaming=False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.func = func
+        self.signals = signals
+        # Потокова задача: func - генератор, кожен елемент передається окремо
+        self.streaming = streaming
+        self.cancelled = False
+        # Джерело запитів задачі для профайлера
+        self.source = None
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def run(self):
+        # Сигнал надсилається завжди, навіть для скасованої задачі:
+        # виконавець тримає посилання на задачу, доки вона не завершиться
+        if self.cancelled:
+            self.signals.finished.emit(self, None)
+            return
+        with self._lock:
+            self._conn = db.get_connection()
+        try:
+            with query_source(self.source):
+                result = self._execute()
+        except Exception as e:
+            if not self.cancelled:
+                traceback.print_exc()
+            self.signals.failed.emit(self, str(e))
+            return
+        finally:
+            with self._lock:
+                self._conn = None
+        self.signals.finished.emit(self, result)
+
+    def _execute(self):
+        if not self.streaming:
+            return self.func()
+        items = self.func()
+        try:
+            for item in items:
+                if self.cancelled:
+                    break
+                self.signals.chunk.emit(self, item)
+        finally:
+            # Закриття генератора одразу після скасування: його
+            # блоки finally звільняють файли й курсори в цьому потоці
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+        return None
+
+    def interrupt(self):
+        # Перериває SQL-запит, що виконується в робочому потоці
+        self.cancelled = True
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+class QueryRunner(QObject):
+    # Виконує функції із запитами до бази в пулі потоків, щоб GUI-потік
+    # не блокувався. Результат передається у GUI-потік через сигнали.
+    busy_changed = pyqtSignal(bool)
+    error = pyqtSignal(str)
+
+    # Кожен робочий потік тримає власне з'єднання з базою, тому пул
+    # невеликий і потоки не завершуються
+    MAX_THREADS = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(self.MAX_THREADS)
+        self._pool.setExpiryTimeout(-1)
+        self._signals = _TaskSignals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.chunk.connect(self._on_chunk)
+        # task -> (on_result, on_error, key, on_chunk)
+        self._tasks = {}
+        self._keys = {}
+        # Скасовані задачі, що ще виконуються в пулі
+        self._cancelled = set()
+
+    def submit(self, func, on_result, on_error=None, key=None, on_chunk=None):
+        # key: новий запит з тим самим ключем скасовує попередній
+        # (наприклад, при швидкій зміні фільтрів).
+        # on_chunk: func - генератор; кожен його елемент передається в
+        # on_chunk у GUI-потоці, а по завершенні викликається on_result(None)
+        if key is not None:
+            self.cancel(key)
+        task = _QueryTask(func, self._signals, streaming=on_chunk is not None)
+        if db.profiler is not None:
+            # Обробник GUI-потоку, що надіслав запит; без профайлера стек не
+            # переглядається
+            task.source = caller_name()
+        self._tasks[task] = (on_result, on_error, key, on_chunk)
+        if key is not None:
+            self._keys[key] = task
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True)
+        self._pool.start(task)
+        return task
+
+    def cancel(self, key):
+        task = self._keys.pop(key, None)
+        if task is None:
+            return
+        if self._pool.tryTake(task):
+            task.cancelled = True
+        else:
+            task.interrupt()
+            self._cancelled.add(task)
+        self._forget(task)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def wait(self, msecs=-1):
+        return self._pool.waitForDone(msecs)
+
+    def shutdown(self):
+        # Скасування всіх запитів перед виходом з програми
+        self._pool.clear()
+        for task in list(self._tasks):
+            task.interrupt()
+        self._pool.waitForDone()
+
+    def _forget(self, task):
+        entry = self._tasks.pop(task, None)
+        if entry is None:
+            return None
+        key = entry[2]
+        if key is not None and self._keys.get(key) is task:
+            del self._keys[key]
+        if not self._tasks:
+            self.busy_changed.emit(False)
+        return entry
+
+    def _on_finished(self, task, result):
+        self._cancelled.discard(task)
+        entry = self._forget(task)
+        if entry is None or task.cancelled:
+            return
+        entry[0](result)
+
+    def _on_chunk(self, task, item):
+        entry = self._tasks.get(task)
+        if entry is None or task.cancelled:
+            return
+        entry[3](item)
+
+    def _on_failed(self, task, message):
+        self._cancelled.discard(task)
+        entry = self._forget(task)
+        if entry is None or task.cancelled:
+            return
+        if entry[1] is not None:
+            entry[1](message)
+        else:
+            self.error.emit(message)
+
+
+# Спільний виконавець запитів для всіх модулів
+query_runner = QueryRunner()
@@ -0,0 +1,71 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from database import db
+from ui.query_runner import query_runner
+
+
+class SearchBox(QWidget):
+    # Глобальний пошук за описами й примітками (FTS5, database.search).
+    # Запит виконується у фоновому потоці після паузи у введенні;
+    # новий запит скасовує попередній.
+    result_activated = pyqtSignal(str, int)
+    
+    DELAY_MS = 250
+    MAX_RESULTS = 50
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("🔍 Пошук в описах і примітках...")
+        self.input.setClearButtonEnabled(True)
+        self.input.textChanged.connect(self.schedule_search)
+        layout.addWidget(self.input)
+        
+        self.results = QListWidget()
+        self.results.setMaximumHeight(180)
+        self.results.setVisible(False)
+        self.results.itemActivated.connect(self.activate_item)
+        layout.addWidget(self.results)
+        
+        self.setLayout(layout)
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DELAY_MS)
+        self.timer.timeout.connect(self.run_search)
+    
+    def schedule_search(self):
+        self.timer.start()
+    
+    def run_search(self):
+        text = self.input.text().strip()
+        if not text:
+            query_runner.cancel((self, "search"))
+            self.show_results([])
+            return
+        query_runner.submit(lambda: db.search(text, self.MAX_RESULTS),
+                            self.show_results, key=(self, "search"))
+    
+    def show_results(self, results):
+        self.results.clear()
+        for table, row_id, title, snippet in results:
+            item = QListWidgetItem(f"{title} — {snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, (table, row_id))
+            self.results.addItem(item)
+        if self.input.text().strip() and not results:
+            self.results.addItem("Нічого не знайдено")
+        self.results.setVisible(self.results.count() > 0)
+    
+    def activate_item(self, item):
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if data:
+            self.result_activated.emit(*data)
+    
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape:
+            self.input.clear()
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,183 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from database import db
+from ui.query_runner import query_runner
+
+
+def default_format(value):
+    return str(value) if value else ""
+
+
+class LazyTableModel(QAbstractTableModel):
+    # Модель таблиці, що підвантажує рядки сторінками під час прокрутки
+    # і форматує комірки лише при відображенні. Сторінки читаються у
+    # фоновому потоці. Першою колонкою запиту має бути id запису.
+    PAGE_SIZE = 500
+
+    def __init__(self, headers, formatters=None, sort_key=None, descending=False, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        # {номер колонки: функція(значення) -> текст}
+        self.formatters = formatters or {}
+        # Ключ сортування рядка (має відповідати ORDER BY запиту);
+        # потрібен для вставки нового рядка на своє місце
+        self.sort_key = sort_key or (lambda row: row[0])
+        self.descending = descending
+        self._query = None
+        self._params = ()
+        self._row_query = None
+        self._rows = []
+        self._has_more = False
+        self._loading = False
+        # Номер поточного запиту: результати, отримані для попередніх
+        # фільтрів (той самий SQL з іншими параметрами), відкидаються
+        self._generation = 0
+
+    def set_query(self, query, params=(), row_query=None):
+        # row_query - той самий запит з фільтрами без сортування, що
+        # закінчується умовою "id = ?"; використовується для оновлення
+        # окремих рядків після змін.
+        # Поточні рядки залишаються на екрані, доки не прийде нова сторінка
+        self._query = query
+        self._params = tuple(params)
+        self._row_query = row_query
+        self._generation += 1
+        self._loading = True
+        query_runner.submit(lambda: self.fetch_page(query, params, 0),
+                            self._on_first_page, self._on_error, key=self)
+
+    def refresh(self):
+        self.set_query(self._query, self._params, self._row_query)
+
+    @staticmethod
+    def fetch_page(query, params, offset):
+        # Виконується у робочому потоці
+        return db.fetch_all(f"{query} LIMIT ? OFFSET ?",
+                            tuple(params) + (LazyTableModel.PAGE_SIZE, offset))
+
+    def _on_first_page(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self._has_more = len(rows) == self.PAGE_SIZE
+        self._loading = False
+        self.endResetModel()
+
+    def _on_error(self, message):
+        self._loading = False
+        query_runner.error.emit(message)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self._rows[index.row()][index.column()]
+        formatter = self.formatters.get(index.column(), default_format)
+        return formatter(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        query, params, offset = self._query, self._params, len(self._rows)
+        query_runner.submit(lambda: self.fetch_page(query, params, offset),
+                            self._on_next_page, self._on_error, key=self)
+
+    def _on_next_page(self, rows):
+        self._loading = False
+        self._has_more = len(rows) == self.PAGE_SIZE
+        if rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def redraw(self):
+        # Перемалювання без перезавантаження (напр. змінилися назви в довідниках)
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self._rows) - 1, len(self.headers) - 1))
+    
+    def row_id(self, row):
+        return self._rows[row][0]
+
+    def find_row(self, row_id):
+        for index, row in enumerate(self._rows):
+            if row[0] == row_id:
+                return index
+        return -1
+
+    def apply_change(self, action, row_id):
+        # Оновлення лише зміненого рядка замість повного перезавантаження
+        if self._query is None:
+            return
+        if self._loading or row_id is None or self._row_query is None:
+            self.refresh()
+            return
+        if action == 'delete':
+            self._remove_row(row_id)
+            return
+        query, params = self._row_query, self._params + (row_id,)
+        generation = self._generation
+        query_runner.submit(lambda: db.fetch_one(query, params),
+                            lambda row: self._on_row_fetched(generation, row_id, row),
+                            self._on_error, key=(self, row_id))
+
+    def _on_row_fetched(self, generation, row_id, row):
+        if generation != self._generation:
+            # Фільтри змінилися, поки рядок завантажувався
+            return
+        self._remove_row(row_id)
+        if row is None:
+            # Запис більше не відповідає фільтрам
+            return
+        position = self._insert_position(row)
+        if position == len(self._rows) and self._has_more:
+            # Рядок за межами завантажених сторінок: прийде з наступною сторінкою
+            return
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, row)
+        self.endInsertRows()
+
+    def _insert_position(self, row):
+        # Двійковий пошук за ключем сортування (рядки впорядковані, як у
+        # ORDER BY): позиція після рядків з рівним ключем, як bisect_right
+        # (bisect з key= потребує Python 3.10+)
+        key = self.sort_key(row)
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            existing = self.sort_key(self._rows[middle])
+            if (existing < key) if self.descending else (existing > key):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _remove_row(self, row_id):
+        index = self.find_row(row_id)
+        if index >= 0:
+            self.beginRemoveRows(QModelIndex(), index, index)
+            del self._rows[index]
+            self.endRemoveRows()
+
+
+def selected_row_id(view):
+    # id запису першого виділеного рядка таблиці або None
+    rows = view.selectionModel().selectedRows() if view.selectionModel() else []
+    if not rows:
+        return None
+    return view.model().row_id(rows[0].row())